@@ -0,0 +1,293 @@
+"""Offline end-to-end benchmark of the scraping service.
+
+Usage (from scraping/):
+    python benchmarks/bench_e2e.py                                  # every scenario, every site kind
+    python benchmarks/bench_e2e.py --scenario scrape --companies 24 --llm-latency 0.8
+    python benchmarks/bench_e2e.py --json results.json              # keep numbers to compare across commits
+
+Sites are served locally (see fixtures.SITE_KINDS), Bedrock is a fake strands
+model with configurable latency, and S3 is an in-memory stand-in, so runs need
+no network or AWS access. Scenarios:
+  discover  fetch_company_site_urls per site kind
+  fetch     page fetching (static tier, per-host frontier, fetch limiter) per site kind
+  chain     chain_summarize over texts of increasing size
+  scrape    scrape_and_summarize for --companies companies at once, spread over the site kinds
+  refresh   incremental scrape_and_summarize of each site kind after a full one, nothing changed
+  resume    scrape_and_summarize of each site kind retried after its last Bedrock call failed
+Reported per row: p50/p95 latency of one unit (a discovery, a page, a summary,
+a company), pages/s, LLM calls and tokens, S3 writes, and peak RSS of the
+process during the scenario.
+
+Per-host pacing is raised to HOST_REQUESTS_PER_SECOND=1000 unless set, so the
+numbers measure the service rather than politeness delays.
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+os.environ.setdefault("S3_BUCKET", "bench-bucket")
+os.environ.setdefault("BEDROCK_MODEL", "bench-model")
+os.environ.setdefault("SUMMARY_CACHE_PATH", "")  # measure the model, not the cache
+os.environ.setdefault("VALIDATOR_STORE_PATH", "")  # every run is a cold crawl
+# a fresh store per run, so nothing resumes from an earlier benchmark
+os.environ.setdefault("CHECKPOINT_PATH", os.path.join(tempfile.mkdtemp(prefix="bench_e2e_"), "checkpoints.sqlite3"))
+os.environ.setdefault("HOST_REQUESTS_PER_SECOND", "1000")
+os.environ.setdefault("HOST_BURST", "1000")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixtures import SITE_KINDS, WORDS, FakeBedrockModel, FakeS3, SiteServer  # noqa: E402
+from fetcher import fetch_pages  # noqa: E402
+
+import main  # noqa: E402
+
+SCENARIOS = ("discover", "fetch", "chain", "scrape", "refresh", "resume")
+
+
+class RssSampler:
+    """Peak resident set size while active, sampled from /proc (ru_maxrss elsewhere, which never goes down)."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def current() -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except OSError:
+            scale = 1 if sys.platform == "darwin" else 1024
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self.peak = self.current()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class Recorder:
+    """Collects one row per scenario and site, with LLM and S3 counters as deltas over the row."""
+
+    def __init__(self, model: FakeBedrockModel, s3: FakeS3, verbose: bool):
+        self.model = model
+        self.s3 = s3
+        self.verbose = verbose
+        self.rows: List[dict] = []
+
+    def quiet(self):
+        return contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(open(os.devnull, "w"))
+
+    @contextlib.asynccontextmanager
+    async def row(self, scenario: str, label: str):
+        stats: Dict[str, object] = {"latencies": [], "pages": 0}
+        before = (self.model.counters(), self.s3.puts)
+        start = time.perf_counter()
+        with RssSampler() as rss, self.quiet():
+            yield stats
+        wall = time.perf_counter() - start
+        counters = {k: v - before[0][k] for k, v in self.model.counters().items()}
+        latencies = stats["latencies"]
+        self.rows.append({
+            "scenario": scenario,
+            "site": label,
+            "n": len(latencies),
+            "p50_s": round(_percentile(latencies, 0.5), 3),
+            "p95_s": round(_percentile(latencies, 0.95), 3),
+            "wall_s": round(wall, 3),
+            "pages": stats["pages"],
+            "pages_per_s": round(stats["pages"] / wall, 1) if wall else 0.0,
+            **counters,
+            "s3_puts": self.s3.puts - before[1],
+            "peak_rss_mb": round(rss.peak / 2**20, 1),
+        })
+        print(_format(self.rows[-1]), flush=True)
+
+
+_COLUMNS = [
+    ("scenario", 9, ""), ("site", 13, ""), ("n", 5, ""), ("p50_s", 8, ".3f"), ("p95_s", 8, ".3f"),
+    ("pages", 6, ""), ("pages_per_s", 11, ".1f"), ("llm_calls", 9, ""), ("llm_input_tokens", 16, ""),
+    ("s3_puts", 7, ""), ("peak_rss_mb", 11, ".1f"),
+]
+
+
+def _format(row: dict) -> str:
+    return " ".join(f"{row[name]:>{width}{fmt}}" for name, width, fmt in _COLUMNS)
+
+
+async def _timed(stats: dict, fn: Callable, *args):
+    start = time.perf_counter()
+    result = await fn(*args)
+    stats["latencies"].append(time.perf_counter() - start)
+    return result
+
+
+async def bench_discover(rec: Recorder, sites: Dict[str, str], args) -> None:
+    for kind, url in sites.items():
+        async with rec.row("discover", kind) as stats:
+            for _ in range(args.repeat):
+                urls = await _timed(stats, main.fetch_company_site_urls, url, args.pages)
+                stats["pages"] += len(urls)
+
+
+async def bench_fetch(rec: Recorder, sites: Dict[str, str], args) -> None:
+    client = main.get_http_client()
+    for kind, url in sites.items():
+        urls = await main.fetch_company_site_urls(url, args.pages)
+        async with rec.row("fetch", kind) as stats:
+            for _ in range(args.repeat):
+                pages = await fetch_pages(
+                    urls, lambda u: main._polite_fetch(client, u), main.fetch_limiter, main.PAGE_TIMEOUT,
+                    pace=main.crawl_frontier.wait, retry=main._backoff_retry, max_retries=main.HOST_MAX_RETRIES,
+                )
+                stats["latencies"].extend(p.elapsed for p in pages)
+                stats["pages"] += sum(1 for p in pages if p.tier)
+
+
+async def bench_chain(rec: Recorder, args) -> None:
+    rng = random.Random(0)
+    for chars in args.chars:
+        text = " ".join(rng.choice(WORDS) for _ in range(chars // 6))[:chars]
+        async with rec.row("chain", f"{chars} chars") as stats:
+            for _ in range(args.repeat):
+                await _timed(stats, main.chain_summarize, text)
+
+
+async def bench_scrape(rec: Recorder, sites: Dict[str, str], args) -> None:
+    # companies are spread round-robin over the site kinds; those on the same kind share a host
+    kinds = list(sites)
+    companies = [sites[kinds[i % len(kinds)]] for i in range(args.companies)]
+
+    async def _one(stats: dict, company: str) -> None:
+        def _on_event(stage: str, data: dict) -> None:
+            if stage == "page" and data.get("tier"):
+                stats["pages"] += 1
+
+        await _timed(stats, main.scrape_and_summarize, company, args.pages, args.strategy, _on_event)
+
+    async with rec.row("scrape", f"{args.companies} cos") as stats:
+        await asyncio.gather(*(_one(stats, c) for c in companies))
+
+
+async def bench_refresh(rec: Recorder, sites: Dict[str, str], args) -> None:
+    for kind, url in sites.items():
+        with rec.quiet():
+            await main.scrape_and_summarize(url, args.pages, args.strategy)  # the stored result to refresh
+        async with rec.row("refresh", kind) as stats:
+
+            def _on_event(stage: str, data: dict) -> None:
+                if stage == "page" and data.get("tier"):
+                    stats["pages"] += 1
+
+            for _ in range(args.repeat):
+                await _timed(stats, main.scrape_and_summarize, url, args.pages, args.strategy, _on_event, True)
+
+
+async def bench_resume(rec: Recorder, sites: Dict[str, str], args) -> None:
+    for kind, url in sites.items():
+        with rec.quiet():
+            calls = rec.model.calls
+            await main.scrape_and_summarize(url, args.pages, args.strategy)  # how many calls a run makes
+            rec.model.fail_at = 2 * rec.model.calls - calls - 1  # the last call of the next run
+            job_id = f"bench-resume-{kind}"  # only job runs are checkpointed
+            try:
+                await main.scrape_and_summarize(url, args.pages, args.strategy, job_id=job_id)
+            except Exception:
+                pass  # the injected failure; its checkpoints stay behind for the run measured below
+        async with rec.row("resume", kind) as stats:
+
+            def _on_event(stage: str, data: dict) -> None:
+                if stage == "page" and data.get("tier"):
+                    stats["pages"] += 1
+
+            await _timed(stats, functools.partial(main.scrape_and_summarize, job_id=job_id),
+                         url, args.pages, args.strategy, _on_event)
+
+
+async def run(args) -> List[dict]:
+    model = FakeBedrockModel(args.llm_latency, args.ms_per_token, args.max_output_tokens)
+    s3 = FakeS3()
+    main.clients.set("bedrock_model", model)
+    main.clients.set("s3", s3)
+
+    async def _no_browser(url: str) -> str:
+        return ""  # fixture pages are server-rendered; nothing should escalate
+
+    main.tiered_fetcher.browser_fetch = _no_browser
+    rec = Recorder(model, s3, args.verbose)
+    kinds = args.sites or list(SITE_KINDS)
+    print(" ".join(f"{name:>{width}}" for name, width, _ in _COLUMNS))
+    with SiteServer(kinds) as server:
+        try:
+            if "discover" in args.scenario:
+                await bench_discover(rec, server.urls, args)
+            if "fetch" in args.scenario:
+                await bench_fetch(rec, server.urls, args)
+            if "chain" in args.scenario:
+                await bench_chain(rec, args)
+            if "scrape" in args.scenario:
+                await bench_scrape(rec, server.urls, args)
+            if "refresh" in args.scenario:
+                await bench_refresh(rec, server.urls, args)
+            if "resume" in args.scenario:
+                await bench_resume(rec, server.urls, args)
+        finally:
+            main.llm_limiter.close()
+            if main.http_client is not None:
+                await main.http_client.aclose()
+    return rec.rows
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--sites", nargs="+", choices=list(SITE_KINDS), help="site kinds to serve (default all)")
+    parser.add_argument("--pages", type=int, default=10, help="pages discovered/fetched per site")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per site in the discover/fetch/chain scenarios")
+    parser.add_argument("--companies", type=int, default=12, help="companies scraped at once in the scrape scenario")
+    parser.add_argument("--strategy", choices=main.SUMMARY_STRATEGIES, default=None)
+    parser.add_argument("--chars", type=int, nargs="+", default=[5000, 20000])
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="fixed seconds per fake Bedrock call")
+    parser.add_argument("--ms-per-token", type=float, default=1.0, help="extra ms per output token")
+    parser.add_argument("--max-output-tokens", type=int, default=400)
+    parser.add_argument("--json", help="also write the rows to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep the service's own log output")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
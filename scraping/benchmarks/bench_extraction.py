@@ -0,0 +1,108 @@
+"""Compare page-text extraction: BeautifulSoup get_text vs the lxml main-content extractor.
+
+Usage (from scraping/):
+    python benchmarks/bench_extraction.py --pages 10 --paragraphs 5 20 80
+    python benchmarks/bench_extraction.py --html-dir saved_pages/   # one site's saved .html files
+
+Synthetic pages share a header menu, cookie banner, sidebar and footer and
+differ only in their article paragraphs, like pages of one company site.
+Reported per approach: parse time per MB of HTML, and how much of the first
+PAGE_TEXT_CHARS characters kept per page is unique article text.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from extraction import extract_pages  # noqa: E402
+
+WORDS = "platform customers analytics cloud revenue growth security partners pricing enterprise".split()
+
+MENU = "".join(f'<li><a href="/{w}">{w.title()} solutions</a></li>' for w in WORDS)
+CHROME_TOP = (
+    f'<header><div class="logo">Acme</div><nav><ul>{MENU}</ul></nav></header>'
+    '<div id="cookie-consent"><p>We use cookies to improve your experience. Accept all?</p></div>'
+)
+CHROME_BOTTOM = (
+    f'<aside><h3>Related</h3><ul>{MENU}</ul></aside>'
+    f'<footer><ul>{MENU}</ul><p>Copyright 2025 Acme Inc. All rights reserved.</p></footer>'
+)
+
+
+def _sentence() -> str:
+    return " ".join(random.choice(WORDS) for _ in range(random.randint(8, 20))).capitalize() + "."
+
+
+def synthetic_page(n: int, paragraphs: int) -> str:
+    body = "".join(f"<p>{' '.join(_sentence() for _ in range(4))}</p>" for _ in range(paragraphs))
+    return (
+        f"<html><head><title>Page {n}</title><style>body {{margin: 0}}</style>"
+        f"<script>window.dataLayer = [];</script></head><body>{CHROME_TOP}"
+        f"<main><article><h1>Article {n}</h1>{body}</article></main>{CHROME_BOTTOM}</body></html>"
+    )
+
+
+def bs4_texts(pages, max_chars):
+    texts = []
+    for url, html in pages:
+        text = BeautifulSoup(html, "html.parser").get_text(separator="\n", strip=True)
+        texts.append((url, text[:max_chars]))
+    return texts
+
+
+def lxml_texts(pages, max_chars):
+    return extract_pages(pages, max_chars)[0]
+
+
+def _unique_share(texts, pages) -> float:
+    """Share of kept characters that come from lines not repeated on every page."""
+    line_sets = [set(t.split("\n")) for _, t in texts]
+    common = set.intersection(*line_sets) if len(line_sets) > 1 else set()
+    kept = sum(len(t) for _, t in texts) or 1
+    return sum(len(line) for _, t in texts for line in t.split("\n") if line not in common) / kept
+
+
+def run(name, fn, pages, max_chars, repeat):
+    mb = sum(len(html.encode("utf-8")) for _, html in pages) / (1024 * 1024)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        texts = fn(pages, max_chars)
+    elapsed = (time.perf_counter() - start) / repeat
+    chars = sum(len(t) for _, t in texts)
+    return name, mb, elapsed * 1000 / mb, chars, _unique_share(texts, pages)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=10, help="synthetic pages per site")
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[5, 20, 80], help="article paragraphs per page")
+    parser.add_argument("--html-dir", help="directory of saved .html pages from one site, instead of synthetic pages")
+    parser.add_argument("--max-chars", type=int, default=2000, help="text kept per page (PAGE_TEXT_CHARS)")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(0)
+    if args.html_dir:
+        files = sorted(Path(args.html_dir).glob("*.htm*"))
+        sites = [("saved", [(f.name, f.read_text(errors="replace")) for f in files])]
+    else:
+        sites = [
+            (f"{p} paragraphs", [(f"page{n}", synthetic_page(n, p)) for n in range(args.pages)])
+            for p in args.paragraphs
+        ]
+
+    print(f"{'site':>15} {'extractor':>10} {'MB':>7} {'ms/MB':>8} {'chars':>8} {'unique':>7}")
+    for label, pages in sites:
+        for name, fn in (("bs4", bs4_texts), ("lxml", lxml_texts)):
+            _, mb, ms_per_mb, chars, unique = run(name, fn, pages, args.max_chars, args.repeat)
+            print(f"{label:>15} {name:>10} {mb:>7.2f} {ms_per_mb:>8.0f} {chars:>8} {unique:>7.0%}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,117 @@
+"""Compare browser fetch profiles: bytes transferred, time to content and text kept.
+
+Usage (from scraping/):
+    python benchmarks/bench_fetch_profiles.py                   # local fixture site
+    python benchmarks/bench_fetch_profiles.py --url https://example.com/about --url https://example.com/
+
+The fixture page carries what slows real company pages down: large images,
+web fonts, a stylesheet, a slow first-party data call that fills in part of
+the text, and third-party analytics served from another host. Each URL is
+loaded once per profile on a fresh page; text is measured with the same lxml
+extractor the pipeline uses.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.async_api import async_playwright  # noqa: E402
+
+from extraction import extract_blocks  # noqa: E402
+from fetch_profiles import PROFILES, FetchProfiles  # noqa: E402
+
+PARAGRAPHS = "".join(f"<p>Paragraph {i} about the platform, its customers and pricing.</p>" for i in range(40))
+
+
+def _fixture_page(third_party: str) -> bytes:
+    images = "".join(f'<img src="/img/{i}.jpg">' for i in range(20))
+    return (
+        "<html><head>"
+        '<link rel="stylesheet" href="/style.css">'
+        '<style>@font-face { font-family: F; src: url(/font.woff2); } body { font-family: F; }</style>'
+        f'<script src="{third_party}/analytics.js"></script>'
+        "</head><body><main><h1>Acme</h1>"
+        f"{PARAGRAPHS}{images}"
+        '<div id="late"></div>'
+        "<script>fetch('/api/late').then(r => r.text()).then(t => { late.textContent = t; });</script>"
+        "</main></body></html>"
+    ).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    third_party = ""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path
+        if path == "/":
+            body, ctype, delay = _fixture_page(self.third_party), "text/html", 0.0
+        elif path.startswith("/img/"):
+            body, ctype, delay = os.urandom(200_000), "image/jpeg", 0.2
+        elif path == "/font.woff2":
+            body, ctype, delay = os.urandom(100_000), "font/woff2", 0.2
+        elif path == "/style.css":
+            body, ctype, delay = b"p { margin: 0 }" * 2000, "text/css", 0.1
+        elif path == "/analytics.js":
+            body, ctype, delay = b"/* tracker */" * 20000, "application/javascript", 0.5
+        elif path == "/api/late":
+            body, ctype, delay = b"Late content rendered by the client.", "text/plain", 1.0
+        else:
+            self.send_error(404)
+            return
+        time.sleep(delay)
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _serve() -> str:
+    # "localhost" and "127.0.0.1" count as different sites, so one server plays both parties
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    port = server.server_address[1]
+    _Handler.third_party = f"http://localhost:{port}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}/"
+
+
+async def run(urls, timeout: float):
+    profiles = FetchProfiles()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        context = await browser.new_context()
+        print(f"{'profile':>9} {'KB':>8} {'requests':>9} {'blocked':>8} {'ttc_s':>7} {'text_chars':>11}  url")
+        for url in urls:
+            for profile in PROFILES.values():
+                page = await context.new_page()
+                try:
+                    r = await profiles.fetch(page, url, timeout, profile)
+                except Exception as e:
+                    print(f"{profile.name:>9} failed: {e}  {url}")
+                    continue
+                finally:
+                    await page.close()
+                chars = sum(len(b) for b in extract_blocks(r.html))
+                print(f"{profile.name:>9} {r.bytes / 1024:>8.0f} {r.requests:>9} {r.blocked:>8} "
+                      f"{r.time_to_content:>7.2f} {chars:>11}  {url}")
+        await browser.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", action="append", help="page to load (repeatable); default is the local fixture")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    asyncio.run(run(args.url or [_serve()], args.timeout))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,114 @@
+"""Import-time budget of the service module.
+
+Usage (from scraping/):
+    python benchmarks/bench_import.py                        # median of 5 cold imports against the default budget
+    python benchmarks/bench_import.py --runs 10 --budget-ms 400 --top 15
+
+Each run imports main in a fresh interpreter under -X importtime with
+S3_BUCKET and BEDROCK_MODEL unset, since configuration is validated when the
+app starts, not on import. Reported: median and max import time of main, the
+whole process, the slowest imports main pulls in, and any dependency that
+should only load on first use (boto3, strands, playwright, bs4) but was
+imported anyway. Each import runs in an empty directory, and any file it
+leaves there (the SQLite stores are opened on first use, not on import) is
+reported. Exits 1 when the median exceeds --budget-ms, a deferred
+dependency shows up or a file is created, so it can gate a build.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Set, Tuple
+
+SCRAPING_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded by the client factories, the browser pool or on first use; never by importing main
+DEFERRED = ("boto3", "botocore", "strands", "playwright", "bs4")
+
+
+def _parse_importtime(stderr: str) -> Tuple[float, Dict[str, float], Set[str]]:
+    """(main cumulative ms, direct imports of main -> cumulative ms, every module imported)."""
+    main_ms, children, modules, pending = 0.0, {}, set(), {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        modules.add(name)
+        if depth == 1:
+            pending[name] = int(cumulative) / 1000
+        elif depth == 0:
+            if name == "main":
+                main_ms, children = int(cumulative) / 1000, dict(pending)
+            pending.clear()
+    return main_ms, children, modules
+
+
+def _cold_import(env: Dict[str, str], cwd: str) -> Tuple[float, float, Dict[str, float], Set[str]]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=cwd, env=env, capture_output=True, text=True,
+    )
+    process_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise SystemExit(f"import main failed:\n{proc.stderr[-2000:]}")
+    main_ms, children, modules = _parse_importtime(proc.stderr)
+    return main_ms, process_ms, children, modules
+
+
+def run(args) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {k: v for k, v in os.environ.items() if k not in ("S3_BUCKET", "BEDROCK_MODEL")}
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [SCRAPING_DIR, env.get("PYTHONPATH")]))
+        env["PYTHONDONTWRITEBYTECODE"] = "1"  # so only files created by main itself show up in tmp
+        _cold_import(env, tmp)  # warm the OS file cache
+        created = set(os.listdir(tmp))
+        main_times: List[float] = []
+        process_times: List[float] = []
+        slowest: Dict[str, float] = {}
+        deferred: Set[str] = set()
+        for _ in range(args.runs):
+            main_ms, process_ms, children, modules = _cold_import(env, tmp)
+            main_times.append(main_ms)
+            process_times.append(process_ms)
+            for name, ms in children.items():
+                slowest[name] = max(slowest.get(name, 0.0), ms)
+            deferred |= {m for m in modules if m.split(".")[0] in DEFERRED}
+        created |= set(os.listdir(tmp))
+
+    median = statistics.median(main_times)
+    print(f"import main: median {median:.0f} ms, max {max(main_times):.0f} ms "
+          f"(process {statistics.median(process_times):.0f} ms) over {args.runs} runs; budget {args.budget_ms:.0f} ms")
+    print("slowest imports of main (max cumulative ms):")
+    for name, ms in sorted(slowest.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {ms:>8.1f}  {name}")
+
+    failed = False
+    if median > args.budget_ms:
+        print(f"FAIL: median import time {median:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if deferred:
+        print(f"FAIL: deferred dependencies imported by main: {', '.join(sorted(deferred))}")
+        failed = True
+    if created:
+        print(f"FAIL: files created by importing main: {', '.join(sorted(created))}")
+        failed = True
+    return 1 if failed else 0
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=800.0, help="most the median import of main may take")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args()
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,103 @@
+"""Compare refine and map-reduce summarization against a fake Bedrock model.
+
+Usage (from scraping/):
+    python benchmarks/bench_summarize.py --chars 10000 20000 50000 --latency 0.5
+
+The fake model sleeps a fixed latency plus a per-output-token cost and returns a
+summary whose length grows with its input up to a cap, which is roughly how the
+real model behaves on these prompts. Input tokens are estimated at 4 chars/token.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+
+os.environ.setdefault("S3_BUCKET", "bench-bucket")
+os.environ.setdefault("BEDROCK_MODEL", "bench-model")
+os.environ.setdefault("SUMMARY_CACHE_PATH", "")  # measure the model, not the cache
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+WORDS = "platform customers analytics cloud revenue growth security partners pricing enterprise".split()
+
+
+class FakeSummarizer:
+    def __init__(self, latency: float, ms_per_output_token: float, max_output_tokens: int):
+        self.latency = latency
+        self.ms_per_output_token = ms_per_output_token
+        self.max_output_tokens = max_output_tokens
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, system_prompt: str, messages: list) -> str:
+        prompt = system_prompt + "".join(part["text"] for m in messages for part in m["content"])
+        in_tokens = len(prompt) // 4
+        out_tokens = min(self.max_output_tokens, max(50, in_tokens // 3))
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += in_tokens
+            self.output_tokens += out_tokens
+        time.sleep(self.latency + out_tokens * self.ms_per_output_token / 1000)
+        return " ".join(random.choice(WORDS) for _ in range(out_tokens))
+
+
+def _corpus(chars: int) -> str:
+    words = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(random.choice(WORDS))
+    return " ".join(words)[:chars]
+
+
+def run(chars: int, strategy: str, args) -> dict:
+    fake = FakeSummarizer(args.latency, args.ms_per_token, args.max_output_tokens)
+    main._run_summarize_agent = fake
+    main.SUMMARY_CONCURRENCY = args.concurrency
+    main.SUMMARY_FAN_IN = args.fan_in
+    if args.chunker == "tokens":
+        budget = main.chunk_token_budget(main.SUMMARY_MODEL_ID, args.chunk_tokens)
+        chunks = [c.text for c in main.chunk_pages([("bench", _corpus(chars))], budget)]
+    else:
+        chunks = main.chunk_text(_corpus(chars))
+    start = time.perf_counter()
+    asyncio.run(main.summarize_chunks(chunks, strategy))
+    return {
+        "chars": chars,
+        "strategy": strategy,
+        "chunks": len(chunks),
+        "wall_s": time.perf_counter() - start,
+        "calls": fake.calls,
+        "input_tokens": fake.input_tokens,
+        "output_tokens": fake.output_tokens,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chars", type=int, nargs="+", default=[5000, 10000, 20000])
+    parser.add_argument("--latency", type=float, default=0.3, help="fixed seconds per LLM call")
+    parser.add_argument("--ms-per-token", type=float, default=1.0, help="extra ms per output token")
+    parser.add_argument("--max-output-tokens", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--fan-in", type=int, default=4)
+    parser.add_argument("--chunker", choices=["chars", "tokens"], default="chars",
+                        help="fixed 1000-char slices or the token-aware chunker")
+    parser.add_argument("--chunk-tokens", type=int, default=main.CHUNK_MAX_TOKENS)
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"{'chars':>8} {'strategy':>11} {'chunks':>7} {'wall_s':>8} {'calls':>6} {'in_tokens':>10} {'out_tokens':>10}")
+    for chars in args.chars:
+        for strategy in main.SUMMARY_STRATEGIES:
+            r = run(chars, strategy, args)
+            print(f"{r['chars']:>8} {r['strategy']:>11} {r['chunks']:>7} {r['wall_s']:>8.2f} "
+                  f"{r['calls']:>6} {r['input_tokens']:>10} {r['output_tokens']:>10}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,297 @@
+"""Offline stand-ins for the outside world, shared by the benchmarks.
+
+* SiteServer: a local HTTP server (in a child process) serving synthetic
+  company sites, one port per site, in the shapes discovery has to handle.
+* FakeBedrockModel: a strands model with configurable latency that counts
+  calls and tokens, so the real Agent code path runs without Bedrock.
+* FakeS3: an in-memory stand-in for the boto3 S3 client calls the service makes.
+"""
+import asyncio
+import functools
+import gzip
+import io
+import multiprocessing
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from botocore.exceptions import ClientError
+from strands.models.model import Model
+
+WORDS = (
+    "platform customers analytics cloud revenue growth security partners pricing enterprise "
+    "integration workflow compliance onboarding support roadmap teams data insights automation"
+).split()
+
+# Site shapes: how the site advertises its pages, and how its pages behave
+SITE_KINDS = {
+    # robots.txt -> sitemap index -> nested index -> gzipped url sets
+    "nested": {"sitemap": "nested"},
+    # robots.txt -> one HTML page of links
+    "html_sitemap": {"sitemap": "html"},
+    # robots.txt -> one URL per line
+    "text_sitemap": {"sitemap": "text"},
+    # no Sitemap: directive; discovery falls back to homepage links
+    "homepage": {"sitemap": None},
+    # pages of several MB each
+    "huge": {"sitemap": "nested", "page_kb": 3000},
+    # every page takes a while to answer
+    "slow": {"sitemap": "nested", "delay": 1.5},
+}
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+@functools.lru_cache(maxsize=256)
+def _page(path: str, page_kb: int) -> bytes:
+    rng = random.Random(path)
+    menu = "".join(f'<li><a href="/products/{w}">{w.title()}</a></li>' for w in WORDS[:8])
+    paragraphs = []
+    size = 0
+    target = page_kb * 1024
+    while size < target:
+        p = f"<p>{_text(rng, rng.randint(20, 60))}</p>"
+        paragraphs.append(p)
+        size += len(p)
+    return (
+        f"<html><head><title>{path}</title></head><body>"
+        f"<header><nav><ul>{menu}</ul></nav></header>"
+        f"<main><h1>{path}</h1>{''.join(paragraphs)}</main>"
+        f"<footer><ul>{menu}</ul><p>Copyright Acme Inc.</p></footer>"
+        "</body></html>"
+    ).encode()
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are written separately; avoid 40 ms delayed-ACK stalls
+    kind: dict = {}
+    pages = 200
+    children = 4
+
+    def log_message(self, *args):
+        pass
+
+    def _url(self, path: str) -> str:
+        return f"http://{self.headers.get('Host')}{path}"
+
+    def _page_paths(self, part: Optional[int] = None) -> List[str]:
+        paths = [f"/pages/{i}" for i in range(self.pages)]
+        if part is None:
+            return paths
+        return paths[part::self.children]
+
+    def _send(self, body: bytes, ctype: str, status: int = 200) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _urlset(self, paths: List[str]) -> bytes:
+        # pages never change, so an incremental refresh can skip them all on <lastmod>
+        entries = "".join(f"<url><loc>{self._url(p)}</loc><lastmod>2024-01-01</lastmod></url>" for p in paths)
+        return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'.encode()
+
+    def _index(self, locs: List[str]) -> bytes:
+        entries = "".join(f"<sitemap><loc>{self._url(p)}</loc></sitemap>" for p in locs)
+        return f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'.encode()
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        sitemap = self.kind.get("sitemap")
+        if path == "/robots.txt":
+            lines = ["User-agent: *", "Disallow: /private/"]
+            if sitemap == "nested":
+                lines.append(f"Sitemap: {self._url('/sitemap_index.xml')}")
+            elif sitemap == "html":
+                lines.append(f"Sitemap: {self._url('/sitemap.html')}")
+            elif sitemap == "text":
+                lines.append(f"Sitemap: {self._url('/sitemap.txt')}")
+            self._send("\n".join(lines).encode(), "text/plain")
+        elif path == "/sitemap_index.xml":
+            self._send(self._index(["/sitemaps/index-a.xml", "/sitemaps/index-b.xml"]), "application/xml")
+        elif path.startswith("/sitemaps/index-"):
+            half = 0 if path.endswith("a.xml") else 1
+            parts = [f"/sitemaps/urls-{i}.xml.gz" for i in range(half, self.children, 2)]
+            self._send(self._index(parts), "application/xml")
+        elif path.startswith("/sitemaps/urls-"):
+            part = int(path.rsplit("-", 1)[1].split(".")[0])
+            self._send(gzip.compress(self._urlset(self._page_paths(part))), "application/x-gzip")
+        elif path == "/sitemap.html":
+            links = "".join(f'<li><a href="{p}">{p}</a></li>' for p in self._page_paths())
+            self._send(f"<html><body><ul>{links}</ul></body></html>".encode(), "text/html")
+        elif path == "/sitemap.txt":
+            self._send("\n".join(self._url(p) for p in self._page_paths()).encode(), "text/plain")
+        elif path == "/":
+            links = "".join(f'<a href="{p}">{p}</a> ' for p in self._page_paths()[:50])
+            self._send(f"<html><body><main><p>{_text(random.Random(0), 60)}</p>{links}</main></body></html>".encode(),
+                       "text/html")
+        elif path.startswith("/pages/") or path.startswith("/products/"):
+            time.sleep(self.kind.get("delay", 0.0))
+            self._send(_page(path, self.kind.get("page_kb", 8)), "text/html; charset=utf-8")
+        else:
+            self._send(b"not found", "text/plain", 404)
+
+
+def _serve(kinds: List[str], sockets: List[socket.socket]) -> None:
+    threads = []
+    for kind, sock in zip(kinds, sockets):
+        handler = type(f"Handler_{kind}", (_SiteHandler,), {"kind": SITE_KINDS[kind]})
+        server = ThreadingHTTPServer(sock.getsockname(), handler, bind_and_activate=False)
+        server.socket = sock  # already listening; see SiteServer.__enter__
+        server.daemon_threads = True
+        t = threading.Thread(target=server.serve_forever, daemon=True)
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+
+
+class SiteServer:
+    """One local HTTP server per site kind, run in a child process so it does not
+    share the benchmark's CPU time (GIL) or memory."""
+
+    def __init__(self, kinds: Optional[List[str]] = None):
+        self.kinds = kinds or list(SITE_KINDS)
+        self.urls: Dict[str, str] = {}
+        self._process: Optional[multiprocessing.Process] = None
+
+    def __enter__(self) -> "SiteServer":
+        sockets = []
+        for kind in self.kinds:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("127.0.0.1", 0))
+            sock.listen(128)  # before forking, so clients can connect as soon as __enter__ returns
+            sockets.append(sock)
+            self.urls[kind] = f"http://127.0.0.1:{sock.getsockname()[1]}"
+        ctx = multiprocessing.get_context("fork")
+        self._process = ctx.Process(target=_serve, args=(self.kinds, sockets), daemon=True)
+        self._process.start()
+        for sock in sockets:
+            sock.close()  # the child owns them now
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+
+
+class FakeBedrockModel(Model):
+    """Streams a canned summary after latency + ms_per_output_token per token.
+
+    Output length grows with the prompt (a third of its tokens) up to
+    max_output_tokens. Tokens are estimated at 4 characters each. Setting
+    fail_at makes the call numbered fail_at (counting from 0) raise instead,
+    once.
+    """
+
+    def __init__(self, latency: float = 0.5, ms_per_output_token: float = 1.0, max_output_tokens: int = 400):
+        self.config = {"model_id": "fake-bedrock"}
+        self.latency = latency
+        self.ms_per_output_token = ms_per_output_token
+        self.max_output_tokens = max_output_tokens
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.fail_at: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> dict:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError("the scraping service does not use structured output")
+        yield  # pragma: no cover
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> AsyncIterator[dict]:
+        prompt = (system_prompt or "") + "".join(
+            block.get("text", "") for m in messages for block in m.get("content", [])
+        )
+        in_tokens = len(prompt) // 4
+        out_tokens = min(self.max_output_tokens, max(50, in_tokens // 3))
+        with self._lock:
+            if self.fail_at is not None and self.calls >= self.fail_at:
+                self.fail_at = None
+                raise RuntimeError("injected Bedrock failure")
+            self.calls += 1
+            self.input_tokens += in_tokens
+            self.output_tokens += out_tokens
+        await asyncio.sleep(self.latency + out_tokens * self.ms_per_output_token / 1000)
+        rng = random.Random(prompt)
+        text = " ".join(rng.choice(WORDS) for _ in range(out_tokens))
+        yield {"messageStart": {"role": "assistant"}}
+        yield {"contentBlockStart": {"start": {}}}
+        yield {"contentBlockDelta": {"delta": {"text": text}}}
+        yield {"contentBlockStop": {}}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+        yield {"metadata": {
+            "usage": {"inputTokens": in_tokens, "outputTokens": out_tokens, "totalTokens": in_tokens + out_tokens},
+            "metrics": {"latencyMs": int(self.latency * 1000)},
+        }}
+
+    def counters(self) -> dict:
+        return {"llm_calls": self.calls, "llm_input_tokens": self.input_tokens, "llm_output_tokens": self.output_tokens}
+
+
+class _Paginator:
+    def __init__(self, s3: "FakeS3"):
+        self.s3 = s3
+
+    def paginate(self, Bucket: str, Prefix: str = ""):
+        keys = sorted(k for (b, k) in self.s3.objects if b == Bucket and k.startswith(Prefix))
+        for i in range(0, len(keys), 1000):
+            yield {"Contents": [{"Key": k, "Size": len(self.s3.objects[(Bucket, k)][0])} for k in keys[i:i + 1000]]}
+
+
+class FakeS3:
+    """In-memory bucket store for the boto3 S3 calls made by the service (thread-safe)."""
+
+    def __init__(self):
+        self.objects: Dict[tuple, tuple] = {}  # (bucket, key) -> (body, content type, last modified, metadata)
+        self.puts = 0
+        self.bytes_put = 0
+        self._lock = threading.Lock()
+
+    def put_object(self, Bucket: str, Key: str, Body, ContentType: str = "", Metadata=None, **kwargs) -> dict:
+        body = Body if isinstance(Body, bytes) else Body.encode("utf-8") if isinstance(Body, str) else Body.read()
+        with self._lock:
+            self.objects[(Bucket, Key)] = (body, ContentType, datetime.now(timezone.utc), dict(Metadata or {}))
+            self.puts += 1
+            self.bytes_put += len(body)
+        return {}
+
+    def _get(self, Bucket: str, Key: str) -> tuple:
+        try:
+            return self.objects[(Bucket, Key)]
+        except KeyError:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject") from None
+
+    def get_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        body, ctype, modified, metadata = self._get(Bucket, Key)
+        return {
+            "Body": io.BytesIO(body), "ContentType": ctype, "LastModified": modified, "ContentLength": len(body),
+            "Metadata": metadata,
+        }
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> dict:
+        body, ctype, modified, metadata = self._get(Bucket, Key)
+        return {"ContentType": ctype, "LastModified": modified, "ContentLength": len(body), "Metadata": metadata}
+
+    def generate_presigned_url(self, operation: str, Params: dict, ExpiresIn: int = 3600) -> str:
+        return f"https://{Params['Bucket']}.s3.local/{Params['Key']}?expires={ExpiresIn}"
+
+    def get_paginator(self, operation: str) -> _Paginator:
+        assert operation == "list_objects_v2", operation
+        return _Paginator(self)
@@ -0,0 +1,184 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:  # playwright itself is imported when the pool starts
+    from playwright.async_api import Browser, BrowserContext, Page
+
+
+class _PooledBrowser:
+    """One long-lived Chromium with a shared context and a stack of idle pages."""
+
+    def __init__(self, browser: "Browser", context: "BrowserContext"):
+        self.browser = browser
+        self.context = context
+        self.idle_pages: List["Page"] = []
+        self.in_use = 0
+        self.served = 0
+        self.retired = False
+        self.crashed = False
+        browser.on("disconnected", lambda _: setattr(self, "crashed", True))
+
+    @property
+    def healthy(self) -> bool:
+        return not self.crashed and self.browser.is_connected()
+
+
+class BrowserPool:
+    """A fixed set of Chromium browsers shared by every fetch in the process.
+
+    Pages are handed out through ``page()`` and returned to the owning browser
+    when the caller is done. ``max_pages`` caps concurrently open pages across
+    the whole pool; a browser is replaced after ``pages_per_browser`` pages or
+    as soon as it is found disconnected. After a failed launch no browser is
+    launched for ``launch_backoff`` seconds (doubling per failure in a row, up
+    to ``max_launch_backoff``); meanwhile pages go to the browsers still
+    running, or ``page()`` raises at once when there are none.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_pages: int = 8,
+        pages_per_browser: int = 200,
+        headless: bool = True,
+        launch_backoff: float = 5.0,
+        max_launch_backoff: float = 60.0,
+    ):
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.headless = headless
+        self.launch_backoff = launch_backoff
+        self.max_launch_backoff = max_launch_backoff
+        self._playwright = None
+        self._slots: List[Optional[_PooledBrowser]] = [None] * self.size
+        self._lock = asyncio.Lock()
+        self._start_lock = asyncio.Lock()
+        self._page_slots = asyncio.Semaphore(self.max_pages)
+        self.recycled = 0
+        self.launch_failures = 0
+        self._failed_launches = 0  # in a row
+        self._launch_error: Optional[Exception] = None
+        self._next_launch = 0.0  # monotonic time before which no launch is attempted
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self._playwright is not None:
+                return
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+            async with self._lock:
+                for i in range(self.size):
+                    await self._replace(i)
+
+    async def close(self) -> None:
+        async with self._lock:
+            for pb in self._slots:
+                if pb is not None:
+                    await self._close_browser(pb)
+            self._slots = [None] * self.size
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def _launch(self) -> _PooledBrowser:
+        browser = await self._playwright.chromium.launch(headless=self.headless)
+        context = await browser.new_context()
+        return _PooledBrowser(browser, context)
+
+    async def _close_browser(self, pb: _PooledBrowser) -> None:
+        try:
+            await pb.browser.close()
+        except Exception as e:
+            print(f"Failed to close browser: {e}")
+
+    async def _replace(self, idx: int) -> _PooledBrowser:
+        """Retire the browser in slot idx, if any, and launch its successor into the slot."""
+        old = self._slots[idx]
+        if old is not None:
+            old.retired = True
+            self._slots[idx] = None
+            if old.in_use == 0:
+                await self._close_browser(old)
+        try:
+            pb = await self._launch()
+        except Exception as e:
+            self.launch_failures += 1
+            self._failed_launches += 1
+            self._launch_error = e
+            backoff = min(self.max_launch_backoff, self.launch_backoff * 2 ** (self._failed_launches - 1))
+            self._next_launch = time.monotonic() + backoff
+            raise
+        self._failed_launches = 0
+        self._slots[idx] = pb
+        if old is not None:
+            self.recycled += 1
+        return pb
+
+    async def _acquire_browser(self) -> _PooledBrowser:
+        async with self._lock:
+            # least-loaded slot; replace it first if it crashed or hit its page budget, unless
+            # a launch failed recently, in which case the next slot with a usable browser is taken
+            for idx in sorted(range(self.size), key=lambda i: self._slots[i].in_use if self._slots[i] else 0):
+                pb = self._slots[idx]
+                if pb is not None and pb.healthy and pb.served < self.pages_per_browser:
+                    break
+                if time.monotonic() >= self._next_launch:
+                    pb = await self._replace(idx)
+                    break
+            else:
+                wait = self._next_launch - time.monotonic()
+                raise RuntimeError(
+                    f"No browser available; last launch failed, next attempt in {wait:.0f}s: {self._launch_error}"
+                )
+            pb.in_use += 1
+            pb.served += 1
+            return pb
+
+    async def _release(self, pb: _PooledBrowser, page: Optional["Page"], reusable: bool) -> None:
+        pb.in_use -= 1
+        if page is not None:
+            if reusable and pb.healthy and not pb.retired and not page.is_closed():
+                try:
+                    await page.goto("about:blank")
+                    pb.idle_pages.append(page)
+                    page = None
+                except Exception:
+                    pass
+            if page is not None and not page.is_closed():
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+        if pb.retired and pb.in_use == 0:
+            await self._close_browser(pb)
+
+    @asynccontextmanager
+    async def page(self):
+        """Lease a page from the pool; it is reset and kept for reuse on clean exit."""
+        if self._playwright is None:
+            await self.start()
+        async with self._page_slots:
+            pb = await self._acquire_browser()
+            page = None
+            reusable = False
+            try:
+                page = pb.idle_pages.pop() if pb.idle_pages else await pb.context.new_page()
+                yield page
+                reusable = True
+            finally:
+                await self._release(pb, page, reusable)
+
+    def stats(self) -> dict:
+        live = [pb for pb in self._slots if pb is not None]
+        return {
+            "browsers": len(live),
+            "pages_in_use": sum(pb.in_use for pb in live),
+            "idle_pages": sum(len(pb.idle_pages) for pb in live),
+            "pages_served": sum(pb.served for pb in live),
+            "recycled": self.recycled,
+            "launch_failures": self.launch_failures,
+        }
@@ -0,0 +1,205 @@
+import asyncio
+import copy
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+
+class CheckpointStore(ABC):
+    """Named steps of unfinished runs, so a retried run can skip what already completed.
+
+    A run is identified by a string such as "scrape/example.com"; each of its
+    steps holds one JSON value, stored zlib-compressed. Steps older than
+    max_age seconds are treated as missing. Calls block; run them in a thread.
+    """
+
+    name = ""
+
+    def __init__(self, max_age: float = 86400):
+        self.max_age = max_age
+        self.saved = 0
+        self.loaded = 0
+        self.cleared = 0
+
+    @abstractmethod
+    def get(self, run: str, step: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def put(self, run: str, step: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, run: str) -> None:
+        """Forget every step of run, once it has finished."""
+
+    def stats(self) -> dict:
+        return {"store": self.name, "saved": self.saved, "loaded": self.loaded, "cleared": self.cleared}
+
+    def close(self) -> None:
+        pass
+
+
+def _encode(value: Any) -> bytes:
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def _decode(body: bytes) -> Any:
+    return json.loads(zlib.decompress(body).decode("utf-8"))
+
+
+class LocalCheckpointStore(CheckpointStore):
+    """Checkpoints in a SQLite file; a retry resumes on the same host (or volume) only."""
+
+    name = "local"
+
+    def __init__(self, path: str, max_age: float = 86400):
+        super().__init__(max_age)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " run TEXT NOT NULL, step TEXT NOT NULL, body BLOB NOT NULL, saved_at REAL NOT NULL,"
+            " PRIMARY KEY (run, step))"
+        )
+
+    def get(self, run: str, step: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, saved_at FROM checkpoints WHERE run = ? AND step = ?", (run, step)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.max_age:
+            return None
+        self.loaded += 1
+        return _decode(row[0])
+
+    def put(self, run: str, step: str, value: Any) -> None:
+        body = _encode(value)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run, step, body, saved_at) VALUES (?, ?, ?, ?)",
+                (run, step, body, now),
+            )
+            self.saved += 1
+            if self.saved % 500 == 0:
+                # runs abandoned for good (never retried) would otherwise stay forever
+                self._conn.execute("DELETE FROM checkpoints WHERE saved_at < ?", (now - self.max_age,))
+
+    def delete(self, run: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM checkpoints WHERE run = ?", (run,))
+            self.cleared += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            runs = self._conn.execute("SELECT COUNT(DISTINCT run) FROM checkpoints").fetchone()[0]
+        return {**super().stats(), "runs": runs}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class S3CheckpointStore(CheckpointStore):
+    """Checkpoints as objects under prefix/<run>/, so a retry can resume on any replica.
+
+    s3 is a callable returning the client, so the client is only built when a
+    checkpoint is first read or written. A lifecycle rule on the prefix can
+    expire runs that are never retried; older steps are ignored regardless.
+    """
+
+    name = "s3"
+
+    def __init__(self, s3: Callable[[], Any], bucket: str, prefix: str = "checkpoints", max_age: float = 86400):
+        super().__init__(max_age)
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, run: str, step: str) -> str:
+        return f"{self.prefix}/{run}/{step}.json.z"
+
+    def get(self, run: str, step: str) -> Optional[Any]:
+        client = self.s3()
+        try:
+            obj = client.get_object(Bucket=self.bucket, Key=self._key(run, step))
+        except client.exceptions.NoSuchKey:
+            return None
+        age = datetime.now(timezone.utc) - obj["LastModified"]
+        if age.total_seconds() > self.max_age:
+            return None
+        value = _decode(obj["Body"].read())
+        self.loaded += 1
+        return value
+
+    def put(self, run: str, step: str, value: Any) -> None:
+        self.s3().put_object(
+            Bucket=self.bucket, Key=self._key(run, step), Body=_encode(value), ContentType="application/octet-stream"
+        )
+        self.saved += 1
+
+    def delete(self, run: str) -> None:
+        client = self.s3()
+        keys = []
+        for page in client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=f"{self.prefix}/{run}/"):
+            keys += [{"Key": obj["Key"]} for obj in page.get("Contents", [])]
+        for i in range(0, len(keys), 1000):
+            client.delete_objects(Bucket=self.bucket, Delete={"Objects": keys[i:i + 1000], "Quiet": True})
+        self.cleared += 1
+
+    def stats(self) -> dict:
+        return {**super().stats(), "bucket": self.bucket, "prefix": self.prefix}
+
+
+class Checkpoint:
+    """The checkpoints of one run in a store, from async code.
+
+    Store calls run in a thread, and a failing store is logged rather than
+    raised: losing a checkpoint only costs redoing that step on a retry. With
+    store None every call is a no-op, so callers need not check whether
+    checkpointing is on. Saves are serialized and copy the value when their
+    turn comes, so the last save of a dict that keeps growing wins.
+    """
+
+    def __init__(self, store: Optional[CheckpointStore], run: str):
+        self.store = store
+        self.run = run
+        self._lock = asyncio.Lock()
+
+    async def load(self, step: str) -> Optional[Any]:
+        if self.store is None:
+            return None
+        try:
+            async with self._lock:  # after any save still in flight
+                return await asyncio.to_thread(self.store.get, self.run, step)
+        except Exception as e:
+            print(f"Failed to load checkpoint {self.run}/{step}: {e}")
+            return None
+
+    async def save(self, step: str, value: Any) -> None:
+        if self.store is None:
+            return
+        async with self._lock:
+            try:
+                # copied here rather than in the thread: the caller may still be adding entries to value
+                snapshot = copy.copy(value)
+                await asyncio.to_thread(self.store.put, self.run, step, snapshot)
+            except Exception as e:
+                print(f"Failed to save checkpoint {self.run}/{step}: {e}")
+
+    async def clear(self) -> None:
+        if self.store is None:
+            return
+        async with self._lock:
+            try:
+                await asyncio.to_thread(self.store.delete, self.run)
+            except Exception as e:
+                print(f"Failed to clear checkpoints of {self.run}: {e}")
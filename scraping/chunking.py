@@ -0,0 +1,132 @@
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, List, Tuple
+
+# Context windows of the Bedrock models we summarize with, matched by substring of the model id
+MODEL_CONTEXT_TOKENS = {
+    "meta.llama3-1-70b-instruct": 128_000,
+    "meta.llama3-3-70b-instruct": 128_000,
+    "meta.llama3-1-8b-instruct": 128_000,
+    "anthropic.claude": 200_000,
+}
+DEFAULT_CONTEXT_TOKENS = 8_000
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n|\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for Llama/Claude style BPE vocabularies (~4 chars per token)."""
+    return math.ceil(len(text) / 4)
+
+
+def chunk_token_budget(model_id: str, max_chunk_tokens: int, reserved_tokens: int = 4096) -> int:
+    """Largest chunk that fits the model's window after reserving room for prompt and output.
+
+    reserved_tokens covers the instructions, the running summary in refine mode
+    and the generated summary itself; max_chunk_tokens is an upper bound so a
+    huge window does not turn into one enormous, low-quality prompt.
+    """
+    context = DEFAULT_CONTEXT_TOKENS
+    for key, tokens in MODEL_CONTEXT_TOKENS.items():
+        if key in (model_id or ""):
+            context = tokens
+            break
+    return max(256, min(max_chunk_tokens, context - reserved_tokens))
+
+
+@dataclass
+class Chunk:
+    text: str
+    tokens: int
+    sources: List[str] = field(default_factory=list)  # page URLs the text came from, in order
+
+
+def _split_units(text: str, max_tokens: int) -> List[str]:
+    """Break text into paragraphs, falling back to sentences and then words for oversized pieces."""
+    units: List[str] = []
+    for para in _PARAGRAPH_RE.split(text):
+        para = para.strip()
+        if not para:
+            continue
+        if estimate_tokens(para) <= max_tokens:
+            units.append(para)
+            continue
+        for sentence in _SENTENCE_RE.split(para):
+            if estimate_tokens(sentence) <= max_tokens:
+                units.append(sentence)
+                continue
+            # a single run-on "sentence" (tables, lists without punctuation): split on words
+            piece: List[str] = []
+            size = 0
+            words: List[str] = []
+            for word in sentence.split():
+                # unbroken runs (base64, minified junk) are cut by characters
+                words.extend(word[i:i + max_tokens * 4] for i in range(0, len(word), max_tokens * 4))
+            for word in words:
+                cost = estimate_tokens(word + " ")
+                if piece and size + cost > max_tokens:
+                    units.append(" ".join(piece))
+                    piece, size = [], 0
+                piece.append(word)
+                size += cost
+            if piece:
+                units.append(" ".join(piece))
+    return units
+
+
+def chunk_pages(pages: Iterable[Tuple[str, str]], max_tokens: int, overlap_tokens: int = 0) -> List[Chunk]:
+    """Pack (url, text) pages into as few chunks of at most max_tokens as possible.
+
+    Chunks break only on paragraph or sentence boundaries (words as a last
+    resort), small pages share a chunk, and every chunk records which pages it
+    covers. A "[Source: url]" line marks where each page starts inside a chunk.
+    With overlap_tokens > 0, each chunk repeats the trailing units of the
+    previous one so context at the boundary is not lost.
+    """
+    chunks: List[Chunk] = []
+    current: List[Tuple[str, str]] = []  # (url, unit) pairs
+    size = 0
+    fresh = 0  # units in current that are not overlap carried from the previous chunk
+
+    def _flush():
+        nonlocal current, size, fresh
+        if not current:
+            return
+        lines: List[str] = []
+        sources: List[str] = []
+        for url, unit in current:
+            if not sources or sources[-1] != url:
+                sources.append(url)
+                lines.append(f"[Source: {url}]")
+            lines.append(unit)
+        text = "\n".join(lines)
+        chunks.append(Chunk(text=text, tokens=estimate_tokens(text), sources=sources))
+        tail: List[Tuple[str, str]] = []
+        tail_size = 0
+        for url, unit in reversed(current):
+            cost = estimate_tokens(unit) + 1
+            if tail_size + cost > overlap_tokens:
+                break
+            tail.insert(0, (url, unit))
+            tail_size += cost
+        current, size, fresh = tail, tail_size, 0
+
+    # leave room for the source marker lines and the overlap carried into each chunk
+    unit_budget = max(32, max_tokens - overlap_tokens - 32)
+    for url, text in pages:
+        marker_cost = estimate_tokens(f"[Source: {url}]\n")
+        for unit in _split_units(text, unit_budget):
+            cost = estimate_tokens(unit) + 1
+            if not current or current[-1][0] != url:
+                cost += marker_cost
+            if fresh and size + cost > max_tokens:
+                _flush()
+                cost = estimate_tokens(unit) + 1 + marker_cost
+            current.append((url, unit))
+            size += cost
+            fresh += 1
+    if fresh:
+        _flush()
+    return chunks
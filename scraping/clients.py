@@ -0,0 +1,67 @@
+import threading
+import time
+from typing import Any, Callable, Dict
+
+
+class ClientRegistry:
+    """Process-wide clients (boto3, Bedrock, on-disk stores) built on first use instead of at import.
+
+    Factories are registered up front and run at most once: on the first
+    ``get``, from any thread (boto3 clients are used from worker threads), or
+    when ``warm`` builds them ahead of the first request. ``set`` installs a
+    ready-made client, such as a stand-in for S3 in benchmarks, and the
+    factory is never called.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._clients: Dict[str, Any] = {}
+        self._build_seconds: Dict[str, float] = {}
+        self._lock = threading.RLock()  # reentrant: a factory may get() the clients it depends on
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        self._factories[name] = factory
+
+    def get(self, name: str) -> Any:
+        if name in self._clients:  # also when the factory returned None (a store that is turned off)
+            return self._clients[name]
+        with self._lock:
+            if name not in self._clients:
+                if name not in self._factories:
+                    raise KeyError(f"No client registered as {name!r}")
+                start = time.perf_counter()
+                self._clients[name] = self._factories[name]()
+                self._build_seconds[name] = time.perf_counter() - start
+            return self._clients[name]
+
+    def set(self, name: str, client: Any) -> None:
+        with self._lock:
+            self._clients[name] = client
+            self._build_seconds.pop(name, None)
+
+    def warm(self, *names: str) -> None:
+        """Build the named clients (all registered ones by default) now rather than on first use."""
+        for name in names or tuple(self._factories):
+            self.get(name)
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._clients = self._clients, {}
+            self._build_seconds.clear()
+        for name, client in clients.items():
+            close = getattr(client, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as e:
+                    print(f"Failed to close client {name}: {e}")
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                name: {
+                    "built": name in self._clients,
+                    "build_s": round(self._build_seconds.get(name, 0.0), 3),
+                }
+                for name in sorted(self._factories.keys() | self._clients.keys())
+            }
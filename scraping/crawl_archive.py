@@ -0,0 +1,66 @@
+import gzip
+import io
+import json
+import tempfile
+from dataclasses import asdict, fields
+from typing import IO, List, Tuple
+
+from fetcher import PageResult
+
+ARCHIVE_FORMAT = "crawl-archive/1"
+
+_PAGE_FIELDS = {f.name for f in fields(PageResult)}
+
+
+class ArchiveWriter:
+    """Serialize one crawl as gzip-compressed JSON lines, a page at a time, into a temporary file.
+
+    The first line is a "crawl" record holding meta (company, site URLs, crawl
+    time); every following line is a "page" record with the raw HTML, response
+    headers and fetch metadata of one PageResult, in the order added. The file stays in memory up to max_memory bytes of compressed output and
+    moves to disk past that, so a large crawl costs disk rather than RAM.
+    Call finish() after the last page for the file to upload, then close().
+    """
+
+    def __init__(self, meta: dict, compresslevel: int = 6, max_memory: int = 8 * 1024 * 1024):
+        self.file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self._gz = gzip.GzipFile(fileobj=self.file, mode="wb", compresslevel=compresslevel, mtime=0)
+        self.pages = 0
+        self._write({"type": "crawl", "format": ARCHIVE_FORMAT, **meta})
+
+    def _write(self, record: dict) -> None:
+        self._gz.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def add(self, page: PageResult) -> None:
+        self._write({"type": "page", **asdict(page)})
+        self.pages += 1
+
+    def finish(self) -> Tuple[IO[bytes], int]:
+        """(file positioned at its start, compressed size)."""
+        self._gz.close()
+        size = self.file.tell()
+        self.file.seek(0)
+        return self.file, size
+
+    def close(self) -> None:
+        self._gz.close()
+        self.file.close()
+
+
+def read_archive(data: bytes) -> Tuple[dict, List[PageResult]]:
+    """Inverse of ArchiveWriter: (crawl meta, pages). Unknown fields are ignored."""
+    meta: dict = {}
+    pages: List[PageResult] = []
+    with gzip.GzipFile(fileobj=io.BytesIO(data), mode="rb") as gz:
+        for line in gz:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            kind = record.pop("type", None)
+            if kind == "crawl":
+                meta = record
+            elif kind == "page":
+                pages.append(PageResult(**{k: v for k, v in record.items() if k in _PAGE_FIELDS}))
+    if meta.get("format") != ARCHIVE_FORMAT:
+        raise ValueError(f"Not a crawl archive (format {meta.get('format')!r}, expected {ARCHIVE_FORMAT!r})")
+    return meta, pages
@@ -0,0 +1,146 @@
+import random
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Set, Tuple
+
+from chunking import estimate_tokens
+
+_WORD_RE = re.compile(r"\w+")
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+PAGE_SAMPLE_CHARS = 50_000  # leading text a page-level signature is computed over
+
+
+def shingles(text: str, size: int = 5) -> Set[int]:
+    """Hashed word n-grams of text (lowercased, punctuation ignored); short texts are one shingle."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {zlib.crc32(" ".join(words[i:i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """MinHash signatures whose agreement estimates the Jaccard similarity of two shingle sets."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    def signature(self, hashes: Set[int]) -> Tuple[int, ...]:
+        if not hashes:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in self._perms)
+
+
+def similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def _band_rows(num_perm: int, threshold: float) -> int:
+    """Rows per LSH band, chosen so pairs a bit below the threshold still become candidates."""
+    for rows in (8, 4, 2, 1):
+        if num_perm % rows == 0 and (rows / num_perm) ** (1 / rows) <= threshold - 0.1:
+            return rows
+    return 1
+
+
+class MinHashIndex:
+    """Locality-sensitive index: finds earlier signatures that are likely above a similarity threshold."""
+
+    def __init__(self, num_perm: int, threshold: float):
+        self.threshold = threshold
+        self.rows = _band_rows(num_perm, threshold)
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        self._signatures: List[Tuple[int, ...]] = []
+
+    def match(self, sig: Tuple[int, ...]) -> int:
+        """Index of an added signature at least threshold-similar to sig, or -1."""
+        checked = set()
+        for band in range(0, len(sig), self.rows):
+            for i in self._buckets.get((band, sig[band:band + self.rows]), ()):
+                if i not in checked:
+                    checked.add(i)
+                    if similarity(sig, self._signatures[i]) >= self.threshold:
+                        return i
+        return -1
+
+    def add(self, sig: Tuple[int, ...]) -> int:
+        i = len(self._signatures)
+        self._signatures.append(sig)
+        for band in range(0, len(sig), self.rows):
+            self._buckets[(band, sig[band:band + self.rows])].append(i)
+        return i
+
+
+@dataclass
+class DedupStats:
+    pages_dropped: int = 0
+    paragraphs_dropped: int = 0
+    tokens_saved: int = 0  # estimated tokens of the text removed
+    duplicates: Dict[str, str] = field(default_factory=dict)  # dropped page url -> the page it repeats
+
+
+def dedupe_pages(
+    pages: Sequence[Tuple[str, List[str]]],
+    threshold: float = 0.8,
+    num_perm: int = 64,
+    shingle_words: int = 5,
+    min_paragraph_words: int = 8,
+    max_chars: int = 0,
+) -> Tuple[List[Tuple[str, List[str]]], DedupStats]:
+    """Drop near-duplicate pages, then near-duplicate paragraphs, from (url, blocks) pairs.
+
+    A page whose text is at least threshold-similar (estimated Jaccard over
+    word shingles) to an earlier page is emptied, so sitemap order decides
+    which copy survives; locale variants, paginated listings and tag pages
+    usually collapse onto one. Paragraphs of at least min_paragraph_words
+    words are then compared across all remaining pages and later
+    near-repeats are dropped. Shorter blocks (headings, labels) are kept.
+
+    Page similarity is judged on the first PAGE_SAMPLE_CHARS characters. With
+    max_chars, only paragraphs that can still fall within the first max_chars
+    characters of a page's kept text are compared; later ones are kept as-is,
+    since the caller cuts them off anyway, and tokens_saved only counts text
+    within that limit.
+    """
+    hasher = MinHasher(num_perm)
+    stats = DedupStats()
+    page_index = MinHashIndex(num_perm, threshold)
+    page_urls: List[str] = []
+    para_index = MinHashIndex(num_perm, threshold)
+    result = []
+    for url, blocks in pages:
+        text = "\n".join(blocks)
+        page_shingles = shingles(text[:PAGE_SAMPLE_CHARS], shingle_words)
+        if page_shingles:
+            sig = hasher.signature(page_shingles)
+            match = page_index.match(sig)
+            if match >= 0:
+                stats.pages_dropped += 1
+                # only what would have been sent: the page's first max_chars characters
+                stats.tokens_saved += estimate_tokens(text[:max_chars] if max_chars else text)
+                stats.duplicates[url] = page_urls[match]
+                result.append((url, []))
+                continue
+            page_index.add(sig)
+            page_urls.append(url)
+        kept = []
+        kept_chars = 0
+        for block in blocks:
+            if max_chars and kept_chars >= max_chars:
+                kept.append(block)
+                continue
+            if len(_WORD_RE.findall(block)) >= min_paragraph_words:
+                sig = hasher.signature(shingles(block, shingle_words))
+                if para_index.match(sig) >= 0:
+                    stats.paragraphs_dropped += 1
+                    stats.tokens_saved += estimate_tokens(block[:max_chars - kept_chars] if max_chars else block)
+                    continue
+                para_index.add(sig)
+            kept.append(block)
+            kept_chars += len(block) + 1
+        result.append((url, kept))
+    return result, stats
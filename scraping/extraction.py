@@ -0,0 +1,251 @@
+import hashlib
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Collection, List, Optional, Sequence, Set, Tuple
+
+import lxml.etree
+import lxml.html
+
+# Never content: dropped before anything else is looked at
+_DROP_TAGS = frozenset((
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "object", "embed",
+    "button", "select", "textarea", "dialog", "nav", "aside",
+))
+_DROP_ROLES = frozenset(("navigation", "banner", "contentinfo", "complementary", "search", "dialog", "alertdialog"))
+# Overlays that are not marked up as such; matched against class and id of elements below <body>
+# that hold at most half the page's text (<body class="modal-open"> or a "gdpr-wrapper" is the page)
+_OVERLAY_RE = re.compile(r"cookie|consent|gdpr|newsletter|popup|modal|breadcrumb", re.IGNORECASE)
+
+# Elements whose start and end break the text into separate blocks
+_BLOCK_TAGS = frozenset((
+    "address", "article", "blockquote", "body", "br", "dd", "div", "dl", "dt", "figcaption", "figure",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "footer", "hr", "li", "main", "ol", "p", "pre",
+    "section", "table", "td", "th", "tr", "ul",
+))
+
+
+@dataclass
+class ExtractionStats:
+    pages: int = 0
+    blocks: int = 0
+    boilerplate_blocks: int = 0
+    chars_in: int = 0  # HTML characters parsed
+    chars_out: int = 0  # text characters kept (block text, before any per-page truncation)
+    boilerplate: Set[str] = field(default_factory=set)  # block_digest of every block dropped as boilerplate
+
+
+def _boilerplate(root) -> List:
+    """Elements to drop, found in one pass over the tree (a chain of XPath unions rescans it per clause)."""
+    found = []
+    page_chars = None
+    for el in root.iter():
+        tag = el.tag
+        if tag in ("html", "body"):
+            continue
+        if tag in _DROP_TAGS:
+            found.append(el)
+            continue
+        attrib = el.attrib
+        if attrib:
+            if attrib.get("role") in _DROP_ROLES or "hidden" in attrib or attrib.get("aria-hidden") == "true":
+                found.append(el)
+                continue
+            if _OVERLAY_RE.search(f"{attrib.get('class', '')} {attrib.get('id', '')}") and not _holds_content(el):
+                if page_chars is None:
+                    page_chars = len(root.text_content())
+                if len(el.text_content()) * 2 <= page_chars:
+                    found.append(el)
+                    continue
+        # page-level header/footer; the ones inside an article usually hold its title and byline
+        if tag in ("header", "footer") and not any(a.tag in ("main", "article") for a in el.iterancestors()):
+            found.append(el)
+    return found
+
+
+def _holds_content(el) -> bool:
+    return el.find(".//main") is not None or el.find(".//article") is not None
+
+
+def _main_content(root):
+    """<main> (or role=main), else a single <article>, else <body>.
+
+    Falls back to <body> when the candidate holds under a quarter of the page's
+    text, which happens when <main> wraps only a hero or an article teaser.
+    """
+    body = root.find("body")
+    if body is None:
+        body = root
+    candidates = root.xpath("//main | //*[@role='main']")
+    if not candidates:
+        articles = root.xpath("//article[not(ancestor::article)]")
+        candidates = articles if len(articles) == 1 else []
+    if not candidates:
+        return body
+    candidate = candidates[0]
+    if len(candidate.text_content()) * 4 < len(body.text_content()):
+        return body
+    return candidate
+
+
+def _text_blocks(el) -> List[str]:
+    parts: List[str] = []
+    for event, node in lxml.etree.iterwalk(el, events=("start", "end")):
+        tag = node.tag if isinstance(node.tag, str) else ""
+        if event == "start":
+            if tag in _BLOCK_TAGS:
+                parts.append("\n")
+            if node.text and tag:
+                parts.append(node.text)
+        else:
+            if tag in _BLOCK_TAGS:
+                parts.append("\n")
+            if node.tail and node is not el:
+                parts.append(node.tail)
+    blocks = []
+    for line in "".join(parts).split("\n"):
+        line = " ".join(line.split())
+        if line:
+            blocks.append(line)
+    return blocks
+
+
+def extract_blocks(html: str, max_chars: int = 0) -> List[str]:
+    """Main-content text of an HTML page as a list of blocks (paragraphs, headings, list items, cells).
+
+    With max_chars, blocks after the first max_chars characters of text are left out.
+    """
+    if not html or not html.strip():
+        return []
+    # parse bytes so documents with an XML encoding declaration are accepted
+    parser = lxml.html.HTMLParser(encoding="utf-8", remove_comments=True, remove_pis=True)
+    try:
+        root = lxml.html.document_fromstring(html.encode("utf-8", errors="replace"), parser=parser)
+    except (lxml.etree.ParserError, ValueError):
+        return []
+    for el in _boilerplate(root):
+        if el.getparent() is not None:
+            el.drop_tree()
+    blocks = _text_blocks(_main_content(root))
+    if max_chars:
+        kept, size = [], 0
+        for block in blocks:
+            if size >= max_chars:
+                break
+            kept.append(block)
+            size += len(block)
+        blocks = kept
+    return blocks
+
+
+def _block_key(block: str) -> str:
+    return block.lower()
+
+
+def block_digest(block: str) -> str:
+    """Short stable hash of a block, so a site's boilerplate can be remembered between crawls."""
+    return hashlib.sha1(_block_key(block).encode("utf-8")).hexdigest()[:16]
+
+
+def text_digest(text: str) -> str:
+    """Hash of a page's extracted text; equal digests mean the summarizer would see the same input."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def strip_repeated_blocks(
+    pages: Sequence[List[str]], min_share: float = 0.5, min_pages: int = 2
+) -> Tuple[List[List[str]], int]:
+    """Drop blocks that appear on at least min_share of a site's pages (menus, footers, banners).
+
+    Each block counts once per page. A page whose every block is repeated
+    elsewhere (e.g. the same page fetched twice) keeps its blocks rather than
+    becoming empty. Returns the stripped pages and the number of blocks dropped.
+    """
+    # pages that yielded nothing (failed fetches) do not count towards the share
+    nonempty = sum(1 for blocks in pages if blocks)
+    if nonempty < min_pages:
+        return [list(blocks) for blocks in pages], 0
+    seen = Counter()
+    for blocks in pages:
+        seen.update({_block_key(b) for b in blocks})
+    threshold = max(min_pages, math.ceil(min_share * nonempty))
+    repeated = {key for key, count in seen.items() if count >= threshold}
+    stripped, dropped = [], 0
+    for blocks in pages:
+        kept = [b for b in blocks if _block_key(b) not in repeated]
+        if not kept:
+            kept = list(blocks)
+        dropped += len(blocks) - len(kept)
+        stripped.append(kept)
+    return stripped, dropped
+
+
+def strip_known_blocks(pages: Sequence[List[str]], digests: Collection[str]) -> Tuple[List[List[str]], int]:
+    """Drop blocks whose block_digest is in digests; like strip_repeated_blocks, no page is emptied."""
+    stripped, dropped = [], 0
+    for blocks in pages:
+        kept = [b for b in blocks if block_digest(b) not in digests]
+        if not kept:
+            kept = list(blocks)
+        dropped += len(blocks) - len(kept)
+        stripped.append(kept)
+    return stripped, dropped
+
+
+def extract_page_blocks(
+    pages: Sequence[Tuple[str, str]], min_share: float = 0.5, boilerplate: Optional[Collection[str]] = None
+) -> Tuple[List[Tuple[str, List[str]]], ExtractionStats]:
+    """(url, html) pairs of one site to (url, blocks): main content with cross-page boilerplate removed.
+
+    boilerplate, when given, is the stats.boilerplate of an earlier extraction
+    of the same site. Those blocks are dropped instead of looking for repeats,
+    which a handful of re-fetched pages are too few to show.
+    """
+    stats = ExtractionStats()
+    blocks = []
+    for url, html in pages:
+        stats.chars_in += len(html)
+        blocks.append((url, extract_blocks(html)))
+    return strip_boilerplate(blocks, min_share, boilerplate, stats)
+
+
+def strip_boilerplate(
+    pages: Sequence[Tuple[str, List[str]]],
+    min_share: float = 0.5,
+    boilerplate: Optional[Collection[str]] = None,
+    stats: Optional[ExtractionStats] = None,
+) -> Tuple[List[Tuple[str, List[str]]], ExtractionStats]:
+    """Cross-page half of extract_page_blocks, for (url, blocks) pairs extracted one page at a time.
+
+    Only the blocks of every page are needed here, not their HTML, so a
+    caller can extract each page as it arrives and let its HTML go.
+    """
+    stats = stats or ExtractionStats()
+    stats.pages = len(pages)
+    before = [page_blocks for _, page_blocks in pages]
+    stats.blocks = sum(len(b) for b in before)
+    if boilerplate is not None:
+        blocks, stats.boilerplate_blocks = strip_known_blocks(before, boilerplate)
+        stats.boilerplate = set(boilerplate)
+    else:
+        blocks, stats.boilerplate_blocks = strip_repeated_blocks(before, min_share=min_share)
+        stats.boilerplate = {
+            block_digest(b) for page_before, page_after in zip(before, blocks)
+            for b in set(page_before) - set(page_after)
+        }
+    stats.chars_out = sum(len(b) for page_blocks in blocks for b in page_blocks)
+    return [(url, page_blocks) for (url, _), page_blocks in zip(pages, blocks)], stats
+
+
+def join_blocks(pages: Sequence[Tuple[str, List[str]]], max_chars: int = 2000) -> List[Tuple[str, str]]:
+    """Join each page's blocks into text limited to max_chars."""
+    return [(url, "\n".join(blocks)[:max_chars]) for url, blocks in pages]
+
+
+def extract_pages(
+    pages: Sequence[Tuple[str, str]], max_chars: int = 2000, min_share: float = 0.5
+) -> Tuple[List[Tuple[str, str]], ExtractionStats]:
+    """(url, html) pairs of one site to (url, text): main content, cross-page boilerplate removed, truncated."""
+    blocks, stats = extract_page_blocks(pages, min_share)
+    return join_blocks(blocks, max_chars), stats
@@ -0,0 +1,247 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:  # playwright itself is imported on the first fetch
+    from playwright.async_api import Page, Route
+
+# Playwright resource types that never contribute text to the rendered page
+NON_TEXT_TYPES = frozenset((
+    "image", "media", "font", "stylesheet", "texttrack", "websocket", "eventsource", "manifest", "other",
+))
+
+# Dropped when the main document is re-served truncated; they describe the original body
+_BODY_HEADERS = frozenset(("content-length", "content-encoding", "transfer-encoding"))
+
+
+@dataclass(frozen=True)
+class FetchProfile:
+    """How a browser fetch trades completeness for latency.
+
+    block_types are aborted outright; with block_third_party, subresources
+    from other sites are aborted too, except those of allow_third_party
+    types (the scripts and API calls a client-rendered page needs). The page is read once wait_until fires
+    ("domcontentloaded" or "load"), after waiting up to idle_cap seconds more
+    for the network to go idle (0 skips that wait). The main document is cut
+    to max_body_bytes before the browser parses it (0 disables the cap); it is
+    still downloaded in full, so the cap bounds parsing, not bytes transferred.
+    """
+
+    name: str
+    block_types: FrozenSet[str] = frozenset()
+    block_third_party: bool = False
+    wait_until: str = "domcontentloaded"
+    idle_cap: float = 0.0
+    max_body_bytes: int = 0
+    allow_third_party: FrozenSet[str] = frozenset()
+
+
+PROFILES: Dict[str, FetchProfile] = {
+    p.name: p
+    for p in (
+        # first-party HTML and scripts only, read as soon as the DOM is built
+        FetchProfile("lean", NON_TEXT_TYPES, True, "domcontentloaded", 0.0, 2 * 1024 * 1024),
+        # as lean, but lets client-side rendering load its bundle and data from other sites (CDNs,
+        # API hosts) and gives it a few seconds to do so
+        FetchProfile(
+            "balanced", NON_TEXT_TYPES, True, "domcontentloaded", 3.0, 5 * 1024 * 1024,
+            allow_third_party=frozenset(("script", "xhr", "fetch")),
+        ),
+        # everything loads, as a regular browser would
+        FetchProfile("full", frozenset(), False, "load", 0.0, 0),
+    )
+}
+
+
+@dataclass
+class ProfileFetch:
+    html: str = ""
+    bytes: int = 0  # response headers and bodies received, as reported by Chromium
+    requests: int = 0
+    blocked: int = 0
+    truncated: bool = False
+    time_to_content: float = 0.0  # navigation start until the page was read
+
+
+@dataclass
+class ProfileStats:
+    pages: int = 0
+    failures: int = 0
+    bytes: int = 0
+    requests: int = 0
+    blocked: int = 0
+    truncated: int = 0
+    time_to_content: float = 0.0
+    _times: List[float] = field(default_factory=list, repr=False)
+
+    def add(self, fetch: ProfileFetch) -> None:
+        self.pages += 1
+        self.bytes += fetch.bytes
+        self.requests += fetch.requests
+        self.blocked += fetch.blocked
+        self.truncated += fetch.truncated
+        self.time_to_content += fetch.time_to_content
+        self._times.append(fetch.time_to_content)
+        del self._times[:-500]  # percentiles over recent pages
+
+    def to_dict(self) -> dict:
+        times = sorted(self._times)
+        return {
+            "pages": self.pages,
+            "failures": self.failures,
+            "bytes": self.bytes,
+            "avg_bytes": self.bytes // self.pages if self.pages else 0,
+            "requests": self.requests,
+            "blocked": self.blocked,
+            "truncated": self.truncated,
+            "avg_time_to_content_s": round(self.time_to_content / self.pages, 3) if self.pages else 0.0,
+            "p95_time_to_content_s": round(times[int(0.95 * (len(times) - 1))], 3) if times else 0.0,
+        }
+
+
+def _site(host: str) -> str:
+    """Rough registrable domain: the last two labels, three under short second-level suffixes (co.uk)."""
+    labels = host.lower().rstrip(".").split(".")
+    keep = 3 if len(labels) >= 3 and len(labels[-1]) == 2 and len(labels[-2]) <= 3 else 2
+    return ".".join(labels[-keep:])
+
+
+def parse_site_profiles(spec: str) -> Dict[str, str]:
+    """"example.com=full,shop.example.org=lean" -> {host: profile name}."""
+    overrides = {}
+    for item in spec.split(","):
+        host, sep, name = item.partition("=")
+        if sep and host.strip() and name.strip():
+            overrides[host.strip().lower()] = name.strip()
+    return overrides
+
+
+class FetchProfiles:
+    """Named browser fetch profiles, a default, per-site overrides, and stats per profile."""
+
+    def __init__(self, default: str = "balanced", site_profiles: Optional[Dict[str, str]] = None):
+        unknown = {default, *(site_profiles or {}).values()} - PROFILES.keys()
+        if unknown:
+            raise ValueError(f"Unknown fetch profile(s) {sorted(unknown)}; expected one of {sorted(PROFILES)}")
+        self.default = default
+        self.site_profiles = site_profiles or {}
+        self._stats: Dict[str, ProfileStats] = {name: ProfileStats() for name in PROFILES}
+
+    def for_url(self, url: str) -> FetchProfile:
+        host = (urlparse(url).hostname or "").lower()
+        # an override for example.com also covers www.example.com and other subdomains
+        while host:
+            if host in self.site_profiles:
+                return PROFILES[self.site_profiles[host]]
+            host = host.partition(".")[2]
+        return PROFILES[self.default]
+
+    async def fetch(self, page: "Page", url: str, timeout: float, profile: Optional[FetchProfile] = None) -> ProfileFetch:
+        """Load url in page under profile (by default the one configured for its site)."""
+        profile = profile or self.for_url(url)
+        try:
+            result = await fetch_with_profile(page, url, profile, timeout)
+        except Exception:
+            self._stats[profile.name].failures += 1
+            raise
+        self._stats[profile.name].add(result)
+        return result
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: s.to_dict() for name, s in self._stats.items()}
+
+
+async def fetch_with_profile(page: "Page", url: str, profile: FetchProfile, timeout: float) -> ProfileFetch:
+    """Navigate page to url with profile's interception and wait strategy, then read its HTML.
+
+    The route handler and listeners are removed again before returning, so
+    pooled pages can be reused under a different profile.
+    """
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+    result = ProfileFetch()
+    site = _site(urlparse(url).hostname or "")
+    sizes: List[asyncio.Task] = []
+    served = set()  # main documents fetched by _fulfill_capped, already counted in result.bytes
+
+    async def _route(route: "Route") -> None:
+        nonlocal site
+        request = route.request
+        if request.is_navigation_request() and request.frame == page.main_frame:
+            # redirects may move the page to another site; judge third parties against where it lands
+            site = _site(urlparse(request.url).hostname or "")
+            if profile.max_body_bytes:
+                await _fulfill_capped(route, profile.max_body_bytes, result, served)
+            else:
+                await route.continue_()
+            return
+        host = urlparse(request.url).hostname or ""
+        if request.resource_type in profile.block_types or (
+            profile.block_third_party and host and _site(host) != site
+            and request.resource_type not in profile.allow_third_party
+        ):
+            result.blocked += 1
+            await route.abort()
+            return
+        await route.continue_()
+
+    def _finished(request) -> None:
+        result.requests += 1
+        if request not in served:
+            sizes.append(asyncio.ensure_future(request.sizes()))
+
+    intercept = bool(profile.block_types or profile.block_third_party or profile.max_body_bytes)
+    if intercept:
+        await page.route("**/*", _route)
+    page.on("requestfinished", _finished)
+    start = time.perf_counter()
+    try:
+        await page.goto(url, wait_until=profile.wait_until, timeout=timeout * 1000)
+        if profile.idle_cap > 0:
+            try:
+                await page.wait_for_load_state("networkidle", timeout=profile.idle_cap * 1000)
+            except PlaywrightTimeoutError:
+                pass  # long-polling or analytics keep the network busy; read what is there
+        result.html = await page.content()
+        result.time_to_content = time.perf_counter() - start
+    finally:
+        page.remove_listener("requestfinished", _finished)
+        if intercept:
+            try:
+                await page.unroute("**/*", _route)
+            except Exception:
+                pass  # page or browser already gone; the pool will not reuse it
+        if sizes:
+            done, pending = await asyncio.wait(sizes, timeout=2.0)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                if not task.cancelled() and task.exception() is None:
+                    s = task.result()
+                    result.bytes += max(0, s.get("responseBodySize", 0)) + max(0, s.get("responseHeadersSize", 0))
+    return result
+
+
+async def _fulfill_capped(route: "Route", max_bytes: int, result: ProfileFetch, served: set) -> None:
+    """Serve the main document ourselves so an oversized body is cut before the browser parses it.
+
+    Playwright's route.fetch only hands over a complete body, so the whole
+    document is still downloaded (and counted in result.bytes); the cap saves
+    parsing and rendering time, not transfer. Documents served this way are
+    added to served, as Chromium only sees the (possibly cut) copy.
+    """
+    try:
+        response = await route.fetch(max_redirects=0)  # the browser follows redirects itself, through this route
+        body = await response.body()
+    except Exception:
+        await route.continue_()
+        return
+    result.bytes += len(body) + sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+    if len(body) > max_bytes:
+        body = body[:max_bytes]
+        result.truncated = True
+    headers = {k: v for k, v in response.headers.items() if k.lower() not in _BODY_HEADERS}
+    served.add(route.request)
+    await route.fulfill(status=response.status, headers=headers, body=body)
@@ -0,0 +1,331 @@
+import asyncio
+import re
+import time
+import zlib
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+import httpx
+
+from validators import ValidatorStore, conditional_headers
+
+STATIC_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style|template|noscript)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPA_ROOT_RE = re.compile(
+    r"<div[^>]*\bid=[\"'](root|app|__next|__nuxt|svelte|main-app)[\"'][^>]*>\s*</div>",
+    re.IGNORECASE,
+)
+_NOSCRIPT_RE = re.compile(r"<noscript\b[^>]*>(.*?)</noscript\s*>", re.IGNORECASE | re.DOTALL)
+_NOSCRIPT_WALL_RE = re.compile(r"(enable|requires?|turn on|need)\s+(your\s+)?javascript", re.IGNORECASE)
+
+
+def _is_text_type(content_type: str) -> bool:
+    """Whether a Content-Type carries text worth extracting (HTML, other text, XML, JSON); "" counts as text."""
+    media = content_type.split(";", 1)[0].strip().lower()
+    return not media or media.startswith("text/") or "xml" in media or "json" in media
+
+
+@dataclass
+class PageResult:
+    url: str
+    html: str = ""
+    tier: str = ""  # "static", "browser" or "revalidated" (304, stored copy reused); empty when nothing was fetched
+    status: Optional[int] = None
+    reason: str = ""  # why the page was escalated to the browser, or why it failed
+    elapsed: float = 0.0
+    headers: Dict[str, str] = field(default_factory=dict)  # response headers of the static fetch
+
+
+class FetchLimiter:
+    """Process-wide cap on in-flight page fetches, plus a cap per host."""
+
+    def __init__(self, concurrency: int = 8, per_host: int = 4):
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self._global = asyncio.Semaphore(self.concurrency)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+        self._waiters: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlparse(url).netloc.lower()
+        sem = self._hosts.get(host)
+        if sem is None:
+            sem = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        self._waiters[host] = self._waiters.get(host, 0) + 1
+        try:
+            # take the host slot first so a busy host never parks global slots
+            async with sem:
+                async with self._global:
+                    yield
+        finally:
+            self._waiters[host] -= 1
+            if self._waiters[host] == 0:
+                del self._waiters[host]
+                del self._hosts[host]
+
+
+async def read_body(resp: httpx.Response, max_bytes: int = 0, gunzip: bool = False) -> Tuple[bytes, bool]:
+    """(body, truncated) of a streamed response, reading no more than max_bytes of it (0: no cap).
+
+    With gunzip, a body that starts with the gzip magic bytes is inflated as
+    it arrives; servers send .gz files without a Content-Encoding, so httpx
+    leaves them compressed. The cap then applies to the inflated size, so a
+    small file that inflates to gigabytes is cut off like any other.
+    """
+    parts: List[bytes] = []
+    size = 0
+    inflater = None
+    first = True
+    async for raw in resp.aiter_bytes():
+        if first and raw:
+            first = False
+            if gunzip and raw[:2] == b"\x1f\x8b":
+                inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        while raw:
+            if inflater is not None:
+                # one byte past the cap is enough to know the body was cut
+                piece = inflater.decompress(raw, max_bytes - size + 1 if max_bytes else 0)
+                raw = inflater.unconsumed_tail
+                if not piece:
+                    break
+            else:
+                piece, raw = raw, b""
+            if max_bytes and size + len(piece) > max_bytes:
+                parts.append(piece[:max_bytes - size])
+                return b"".join(parts), True
+            parts.append(piece)
+            size += len(piece)
+    return b"".join(parts), False
+
+
+def decode_body(resp: httpx.Response, body: bytes) -> str:
+    """Text of a body read with read_body, in the charset the response declares (UTF-8 otherwise)."""
+    try:
+        return body.decode(resp.charset_encoding or "utf-8", errors="replace")
+    except LookupError:  # unknown charset name
+        return body.decode("utf-8", errors="replace")
+
+
+def visible_text_length(html: str) -> int:
+    """Cheap estimate of rendered text size: strip scripts, styles and tags."""
+    text = _TAG_RE.sub(" ", _SCRIPT_STYLE_RE.sub(" ", html))
+    return len(" ".join(text.split()))
+
+
+def needs_browser(html: str, min_text_chars: int = 200) -> str:
+    """Return why a statically fetched page looks client-rendered, or "" if it does not."""
+    for body in _NOSCRIPT_RE.findall(html):
+        if _NOSCRIPT_WALL_RE.search(body):
+            return "noscript wall"
+    if _SPA_ROOT_RE.search(html):
+        return "empty SPA root"
+    if visible_text_length(html) < min_text_chars:
+        return "near-empty body"
+    return ""
+
+
+class TieredFetcher:
+    """Fetch a page with a plain GET and only fall back to the browser when needed.
+
+    Responses are read up to max_bytes (0: no cap) and the HTML of either
+    tier is cut to that many characters, so one huge page cannot take a
+    worker's memory with it; truncated counts the pages that were cut.
+    validators is a ValidatorStore, or a callable returning one (or None),
+    called on the first fetch so the store is not opened on import.
+    """
+
+    def __init__(
+        self,
+        browser_fetch: Callable[[str], Awaitable[str]],
+        min_text_chars: int = 200,
+        validators: Union[ValidatorStore, Callable[[], Optional[ValidatorStore]], None] = None,
+        max_bytes: int = 0,
+    ):
+        self.browser_fetch = browser_fetch
+        self.min_text_chars = min_text_chars
+        self._validators = validators
+        self.max_bytes = max_bytes
+        self.tier_counts: Dict[str, int] = {"static": 0, "browser": 0, "revalidated": 0}
+        self.truncated = 0
+
+    @property
+    def validators(self) -> Optional[ValidatorStore]:
+        if self._validators is not None and not isinstance(self._validators, ValidatorStore):
+            self._validators = self._validators()
+        return self._validators
+
+    async def fetch(self, client: httpx.AsyncClient, url: str, revalidate: bool = True) -> PageResult:
+        start = time.perf_counter()
+        result = PageResult(url=url)
+        # store calls (SQLite, zlib, sha256) run in a thread; a 5 MB page would otherwise stall the loop
+        cached = None
+        if self.validators is not None and revalidate:
+            cached = await asyncio.to_thread(self.validators.get, url)
+        validated_by = None  # headers of a 200 carrying ETag/Last-Modified for the final HTML
+        try:
+            headers = {"User-Agent": STATIC_USER_AGENT, **conditional_headers(cached)}
+            async with client.stream("GET", url, headers=headers) as resp:
+                result.status = resp.status_code
+                result.headers = dict(resp.headers)
+                if resp.status_code == 304 and cached is not None:
+                    # unchanged since last crawl: reuse whatever HTML we kept, static or rendered
+                    html = await asyncio.to_thread(self.validators.touch, url)
+                    if html is None:  # evicted in the meantime
+                        return await self.fetch(client, url, revalidate=False)
+                    result.html, result.tier = html, "revalidated"
+                    self.tier_counts["revalidated"] += 1
+                    result.elapsed = time.perf_counter() - start
+                    return result
+                if resp.status_code == 200:
+                    validated_by = resp.headers
+                content_type = resp.headers.get("content-type", "").lower()
+                if resp.status_code in (404, 410, 429, 503):
+                    # the browser would get the same answer (or be throttled too)
+                    result.reason = f"HTTP {resp.status_code}"
+                    result.elapsed = time.perf_counter() - start
+                    return result
+                if resp.status_code < 400 and not _is_text_type(content_type):
+                    # PDFs, images, downloads: no text to extract, and not worth a browser or a stored copy
+                    result.reason = f"skipped: {content_type.split(';', 1)[0].strip()}"
+                    result.elapsed = time.perf_counter() - start
+                    return result
+                if resp.status_code >= 400:
+                    result.reason = f"HTTP {resp.status_code}"
+                else:
+                    body, truncated = await read_body(resp, self.max_bytes)
+                    text = decode_body(resp, body)
+                    del body
+                    if truncated:
+                        self.truncated += 1
+                        print(f"Truncated {url} at {self.max_bytes} bytes")
+                    if content_type and "html" not in content_type:
+                        # nothing for a browser to render; keep whatever text came back
+                        result.html, result.tier = text, "static"
+                    else:
+                        result.reason = needs_browser(text, self.min_text_chars)
+                        if not result.reason:
+                            result.html, result.tier = text, "static"
+        except Exception as e:
+            result.reason = f"static fetch failed: {e}"
+
+        if not result.tier:
+            result.html = await self.browser_fetch(url)
+            result.tier = "browser" if result.html else ""
+            if self.max_bytes and len(result.html) > self.max_bytes:
+                self.truncated += 1
+                result.html = result.html[:self.max_bytes]
+        if result.tier:
+            self.tier_counts[result.tier] += 1
+            if self.validators is not None and validated_by is not None:
+                await asyncio.to_thread(self.validators.put_response, url, validated_by, result.html)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+
+# Seconds to wait before fetching a page again (0: keep the result), e.g. a host's 429/503 backoff
+RetryDelay = Callable[[PageResult], float]
+
+
+async def _fetch_one(
+    url: str,
+    fetch: Callable[[str], Awaitable[PageResult]],
+    limiter: FetchLimiter,
+    page_timeout: float,
+    on_page: Optional[Callable[[PageResult], None]],
+    pace: Optional[Callable[[str], Awaitable[None]]],
+    retry: Optional[RetryDelay] = None,
+    max_retries: int = 0,
+) -> PageResult:
+    for attempt in range(max_retries + 1):
+        if pace is not None:
+            await pace(url)
+        async with limiter.slot(url):
+            try:
+                result = await asyncio.wait_for(fetch(url), timeout=page_timeout)
+            except asyncio.TimeoutError:
+                print(f"Timed out fetching {url} after {page_timeout}s")
+                result = PageResult(url=url, reason="timeout", elapsed=page_timeout)
+        # the slot is released before waiting out a retry delay, so other hosts can use it meanwhile
+        delay = retry(result) if retry is not None else 0.0
+        if not delay or delay >= page_timeout or attempt == max_retries:
+            break
+        if pace is None:
+            await asyncio.sleep(delay)
+    if on_page is not None:
+        on_page(result)
+    return result
+
+
+async def fetch_pages(
+    urls: List[str],
+    fetch: Callable[[str], Awaitable[PageResult]],
+    limiter: FetchLimiter,
+    page_timeout: float = 30.0,
+    on_page: Optional[Callable[[PageResult], None]] = None,
+    pace: Optional[Callable[[str], Awaitable[None]]] = None,
+    retry: Optional[RetryDelay] = None,
+    max_retries: int = 0,
+) -> List[PageResult]:
+    """Fetch all urls concurrently under limiter; results keep the order of urls.
+
+    Each page gets its own deadline, counted from when it acquires a slot, and
+    comes back empty when it times out so one slow page never holds up the rest.
+    on_page is called with each result as soon as that page finishes. pace(url),
+    if given, is awaited before taking a slot, so per-host politeness delays
+    do not hold slots other hosts could use. A page for which retry(result)
+    returns a delay shorter than page_timeout is fetched again, up to
+    max_retries times, after that delay (through pace, when given).
+    """
+    return list(await asyncio.gather(*(
+        _fetch_one(u, fetch, limiter, page_timeout, on_page, pace, retry, max_retries) for u in urls
+    )))
+
+
+async def iter_pages(
+    urls: List[str],
+    fetch: Callable[[str], Awaitable[PageResult]],
+    limiter: FetchLimiter,
+    page_timeout: float = 30.0,
+    on_page: Optional[Callable[[PageResult], None]] = None,
+    pace: Optional[Callable[[str], Awaitable[None]]] = None,
+    window: int = 8,
+    retry: Optional[RetryDelay] = None,
+    max_retries: int = 0,
+) -> AsyncIterator[Tuple[int, PageResult]]:
+    """fetch_pages as an async generator of (index in urls, result), in the order pages finish.
+
+    At most window pages are fetched or waiting to be taken at a time, and
+    the next one starts as soon as the consumer takes any of them, so a slow
+    page only costs its own deadline and however many urls there are, only
+    that many pages are held. Closing the generator early cancels the fetches
+    still running.
+    """
+    queue = iter(enumerate(urls))
+    running: Dict[asyncio.Future, int] = {}
+
+    def _start() -> None:
+        for index, url in queue:
+            fetching = _fetch_one(url, fetch, limiter, page_timeout, on_page, pace, retry, max_retries)
+            running[asyncio.ensure_future(fetching)] = index
+            if len(running) >= max(1, window):
+                return
+
+    try:
+        _start()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=running.__getitem__):
+                yield running.pop(task), task.result()
+                _start()
+    finally:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
@@ -0,0 +1,207 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from singleflight import SingleFlight
+
+# Fetches a robots.txt: (HTTP status or None on a network error, body)
+RobotsFetch = Callable[[str], Awaitable[Tuple[Optional[int], str]]]
+
+ROBOTS_MAX_BYTES = 500 * 1024  # RFC 9309: crawlers parse at least the first 500 KiB
+BACKOFF_STATUSES = (429, 503)
+
+
+def _host_key(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class HostState:
+    robots: Optional[RobotFileParser] = None
+    robots_text: str = ""
+    robots_expires: float = 0.0
+    crawl_delay: Optional[float] = None
+    tokens: float = 0.0
+    refilled_at: float = 0.0
+    backoff_until: float = 0.0
+    backoff_streak: int = 0  # consecutive 429/503 responses
+    last_used: float = 0.0
+
+
+class CrawlFrontier:
+    """Per-host politeness: cached robots.txt rules, request pacing and backoff.
+
+    robots.txt is fetched once per host and cached for robots_ttl seconds
+    (robots_error_ttl after a failure). Following RFC 9309, a 4xx robots.txt
+    allows everything. A 5xx or unreachable one is usually a transient outage,
+    so rather than disallowing the whole host (and crawling nothing) the host
+    is treated as allowed until robots.txt is retried after robots_error_ttl.
+    Requests to a host are paced by a token bucket of requests_per_second
+    with room for burst requests, or one request per Crawl-delay seconds when
+    robots.txt sets one. A 429 or 503 pauses the whole host for its
+    Retry-After, or for an exponentially growing delay when the header is
+    missing, capped at max_backoff.
+    """
+
+    def __init__(
+        self,
+        fetch_robots: RobotsFetch,
+        user_agent: str = "*",
+        robots_ttl: float = 3600.0,
+        robots_error_ttl: float = 300.0,
+        requests_per_second: float = 2.0,
+        burst: int = 4,
+        max_backoff: float = 300.0,
+        max_crawl_delay: float = 30.0,
+        max_hosts: int = 10000,
+    ):
+        self.fetch_robots = fetch_robots
+        self.user_agent = user_agent
+        self.robots_ttl = robots_ttl
+        self.robots_error_ttl = robots_error_ttl
+        self.requests_per_second = requests_per_second
+        self.burst = max(1, burst)
+        self.max_backoff = max_backoff
+        self.max_crawl_delay = max_crawl_delay
+        self.max_hosts = max_hosts
+        self._hosts: Dict[str, HostState] = {}
+        self._robots_flights = SingleFlight()
+        self.robots_fetches = 0
+        self.robots_errors = 0
+        self.disallowed = 0
+        self.backoffs = 0
+        self.paced_wait = 0.0
+
+    def _state(self, key: str) -> HostState:
+        state = self._hosts.get(key)
+        if state is None:
+            if len(self._hosts) >= self.max_hosts:
+                self._prune()
+            state = self._hosts[key] = HostState(tokens=self.burst, refilled_at=time.monotonic())
+        state.last_used = time.monotonic()
+        return state
+
+    def _prune(self) -> None:
+        # forget the least recently used half; their robots.txt is simply fetched again if needed
+        by_age = sorted(self._hosts, key=lambda k: self._hosts[k].last_used)
+        for key in by_age[:len(by_age) // 2]:
+            del self._hosts[key]
+
+    async def _load_robots(self, key: str) -> None:
+        self.robots_fetches += 1
+        status, text = await self.fetch_robots(f"{key}/robots.txt")
+        state = self._state(key)
+        parser = RobotFileParser(f"{key}/robots.txt")
+        ttl = self.robots_ttl
+        if status is not None and 200 <= status < 300:
+            text = text[:ROBOTS_MAX_BYTES]
+            parser.parse(text.splitlines())
+            delay = parser.crawl_delay(self.user_agent)
+            state.crawl_delay = min(float(delay), self.max_crawl_delay) if delay else None
+        elif status is not None and 400 <= status < 500:
+            text = ""
+            parser.allow_all = True
+            parser.modified()
+        else:
+            text = ""
+            parser.allow_all = True
+            parser.modified()
+            ttl = self.robots_error_ttl
+            self.robots_errors += 1
+        state.robots, state.robots_text = parser, text
+        state.robots_expires = time.monotonic() + ttl
+
+    async def host(self, url: str) -> HostState:
+        """The host's state with robots.txt loaded and fresh."""
+        key = _host_key(url)
+        state = self._state(key)
+        if state.robots is None or state.robots_expires <= time.monotonic():
+            await self._robots_flights.do(key, lambda: self._load_robots(key))
+            state = self._state(key)
+        return state
+
+    def can_fetch(self, url: str) -> bool:
+        """robots.txt verdict from the cache; True while the host's rules have not been loaded."""
+        state = self._hosts.get(_host_key(url))
+        if state is None or state.robots is None:
+            return True
+        return state.robots.can_fetch(self.user_agent, url)
+
+    async def allowed(self, url: str) -> bool:
+        state = await self.host(url)
+        ok = state.robots.can_fetch(self.user_agent, url)
+        if not ok:
+            self.disallowed += 1
+        return ok
+
+    async def wait(self, url: str) -> None:
+        """Sleep until the host may be sent another request, then claim that request."""
+        state = self._state(_host_key(url))
+        now = time.monotonic()
+        if state.crawl_delay:
+            rate, capacity = 1.0 / state.crawl_delay, 1.0
+        else:
+            rate, capacity = self.requests_per_second, float(self.burst)
+        state.tokens = min(capacity, state.tokens + (now - state.refilled_at) * rate)
+        state.refilled_at = now
+        # reserve a token now (the balance may go negative) so concurrent callers queue up in order
+        state.tokens -= 1.0
+        delay = max(-state.tokens / rate if state.tokens < 0 else 0.0, state.backoff_until - now)
+        if delay > 0:
+            self.paced_wait += delay
+            await asyncio.sleep(delay)
+
+    def observe(self, url: str, status: Optional[int], headers: Optional[Mapping[str, str]] = None) -> float:
+        """Record a response; returns the backoff now in force for the host (0 if none)."""
+        state = self._state(_host_key(url))
+        if status not in BACKOFF_STATUSES:
+            if status is not None and status < 500:
+                state.backoff_streak = 0
+            return 0.0
+        self.backoffs += 1
+        state.backoff_streak += 1
+        delay = parse_retry_after((headers or {}).get("retry-after"))
+        if delay is None:
+            delay = 2.0 ** (state.backoff_streak - 1)
+        delay = min(delay, self.max_backoff)
+        state.backoff_until = max(state.backoff_until, time.monotonic() + delay)
+        return delay
+
+    def backoff(self, url: str) -> float:
+        """Seconds left of the host's 429/503 backoff (0 if none)."""
+        state = self._hosts.get(_host_key(url))
+        return max(0.0, state.backoff_until - time.monotonic()) if state is not None else 0.0
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "hosts": len(self._hosts),
+            "hosts_backing_off": sum(1 for s in self._hosts.values() if s.backoff_until > now),
+            "robots_fetches": self.robots_fetches,
+            "robots_errors": self.robots_errors,
+            "disallowed": self.disallowed,
+            "backoffs": self.backoffs,
+            "paced_wait_s": round(self.paced_wait, 3),
+        }
@@ -0,0 +1,128 @@
+import asyncio
+import socket
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+from fetcher import STATIC_USER_AGENT
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that caches getaddrinfo results for ttl seconds.
+
+    Connections are opened to the resolved IP; TLS still uses the request's
+    hostname for SNI and certificate checks because httpcore passes it to
+    start_tls separately.
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, ttl: float = 300.0):
+        self._backend = backend
+        self.ttl = ttl
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._pending: Dict[Tuple[str, int], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def _resolve(self, host: str, port: int) -> List[str]:
+        key = (host, port)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+        # concurrent connects to a new host share one lookup
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+        self.misses += 1
+        pending = self._pending[key] = asyncio.ensure_future(self._lookup(host, port))
+        pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _lookup(self, host: str, port: int) -> List[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            addresses = await self._resolve(host, port)
+        except OSError:
+            addresses = [host]
+        error: Optional[Exception] = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        # every cached address failed; forget them so the next attempt re-resolves
+        self._cache.pop((host, port), None)
+        raise error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class PooledTransport(httpx.AsyncHTTPTransport):
+    """httpx transport with HTTP/2, keep-alive limits and a DNS cache."""
+
+    def __init__(self, dns_ttl: float = 300.0, **kwargs):
+        super().__init__(**kwargs)
+        # httpx does not expose the network backend, so swap it on the pool it built; this and
+        # stats() use httpcore internals, which is why requirements.txt pins httpx and httpcore
+        self.dns = CachingDNSBackend(self._pool._network_backend, ttl=dns_ttl)
+        self._pool._network_backend = self.dns
+
+    def stats(self) -> dict:
+        connections = self._pool.connections
+        return {
+            "connections": len(connections),
+            "idle": sum(1 for c in connections if c.is_idle()),
+            "active": sum(1 for c in connections if not c.is_idle() and not c.is_closed()),
+            "http2": sum(1 for c in connections if "HTTP/2" in c.info()),
+            "max_connections": self._pool._max_connections,
+            "max_keepalive": self._pool._max_keepalive_connections,
+            "queued_requests": sum(1 for r in self._pool._requests if r.connection is None),
+            "dns_cache_hits": self.dns.hits,
+            "dns_cache_misses": self.dns.misses,
+        }
+
+
+def create_http_client(
+    max_connections: int = 100,
+    max_keepalive: int = 20,
+    keepalive_expiry: float = 30.0,
+    http2: bool = True,
+    dns_ttl: float = 300.0,
+    connect_timeout: float = 5.0,
+    read_timeout: float = 20.0,
+) -> httpx.AsyncClient:
+    """The process-wide client: one connection pool shared by discovery and page fetching."""
+    transport = PooledTransport(
+        dns_ttl=dns_ttl,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        ),
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        follow_redirects=True,
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        headers={"User-Agent": STATIC_USER_AGENT},
+    )
+
+
+def http_client_stats(client: Optional[httpx.AsyncClient]) -> Optional[dict]:
+    transport = getattr(client, "_transport", None)
+    return transport.stats() if isinstance(transport, PooledTransport) else None
@@ -0,0 +1,393 @@
+import asyncio
+import functools
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+# Callback the pipeline uses to report progress: (stage, details)
+EventCallback = Callable[[str, dict], None]
+
+# Per-item events (one per page / partial summary); jobs only count these
+ITEM_EVENTS = ("page", "partial_summary")
+
+
+@dataclass
+class Job:
+    company: str
+    strategy: Optional[str] = None
+    force_refresh: bool = False
+    full_refresh: bool = False  # summarize every page rather than updating the stored summary
+    reprocess: bool = False  # summarize a stored crawl archive instead of crawling
+    archive_key: Optional[str] = None  # archive to reprocess; the latest one when None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued -> running -> succeeded | failed, or back to queued for a retry
+    attempts: int = 0
+    stage: str = ""
+    progress: Dict[str, dict] = field(default_factory=dict)
+    s3_url: Optional[str] = None
+    cached: Optional[bool] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Job":
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+
+class QueueFull(Exception):
+    """Raised by a backend when it will not accept more queued jobs."""
+
+
+class JobBackend(ABC):
+    """Where jobs wait and where their state lives.
+
+    The in-memory backend serves a single process; a shared backend (SQS + S3)
+    lets several API replicas enqueue and work the same jobs.
+    """
+
+    @abstractmethod
+    async def enqueue(self, job: Job, delay: float = 0.0) -> None:
+        """Queue job, to become available to workers after delay seconds."""
+
+    @abstractmethod
+    async def dequeue(self) -> Job:
+        ...
+
+    async def ack(self, job: Job) -> None:
+        """Called once a dequeued job has finished, successfully or not."""
+
+    @abstractmethod
+    async def save(self, job: Job) -> None:
+        ...
+
+    @abstractmethod
+    async def load(self, job_id: str) -> Optional[Job]:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+    def close(self) -> None:
+        pass
+
+
+class InMemoryJobBackend(JobBackend):
+    def __init__(self, max_queued: int = 100, retention: int = 1000):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queued))
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.retention = retention
+
+    async def enqueue(self, job: Job, delay: float = 0.0) -> None:
+        if delay > 0:
+            await self.save(job)
+            asyncio.get_running_loop().call_later(delay, self._enqueue_later, job)
+            return
+        try:
+            self._queue.put_nowait(job.id)
+        except asyncio.QueueFull:
+            raise QueueFull(f"{self._queue.qsize()} jobs already queued")
+        await self.save(job)
+
+    def _enqueue_later(self, job: Job) -> None:
+        try:
+            self._queue.put_nowait(job.id)
+        except asyncio.QueueFull:
+            job.status, job.error = "failed", f"{job.error} (retry dropped: queue full)"
+            job.updated_at = time.time()
+
+    async def dequeue(self) -> Job:
+        while True:
+            job = self._jobs.get(await self._queue.get())
+            if job is not None:
+                return job
+
+    async def ack(self, job: Job) -> None:
+        self._queue.task_done()
+
+    async def save(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        self._jobs.move_to_end(job.id)
+        # forget the oldest finished jobs beyond the retention limit
+        excess = len(self._jobs) - self.retention
+        for job_id in [j.id for j in self._jobs.values() if j.finished][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    async def load(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "queued": self._queue.qsize(), "max_queued": self._queue.maxsize}
+
+
+class SQSJobBackend(JobBackend):
+    """Jobs queued on SQS with their state kept as JSON objects in S3.
+
+    Every replica pointed at the same queue and bucket can accept and run jobs.
+    A message is received with visibility_timeout and deleted only after its
+    job finishes. While the job runs, a heartbeat extends the message's
+    visibility and refreshes the job's updated_at every third of that timeout,
+    so a crawl taking longer than the timeout is not handed to a second
+    worker. If the worker dies the heartbeat stops, and the message becomes
+    visible again within visibility_timeout. A received job that has already
+    finished is dropped, and one still running with a fresh heartbeat is put
+    back for later. Long polls run on receivers threads of their own, so idle
+    workers do not hold threads of the default executor.
+    """
+
+    def __init__(
+        self,
+        sqs_client,
+        s3_client,
+        queue_url: str,
+        bucket: str,
+        prefix: str = "jobs",
+        max_queued: int = 100,
+        visibility_timeout: int = 300,
+        receivers: int = 2,
+    ):
+        self.sqs = sqs_client
+        self.s3 = s3_client
+        self.queue_url = queue_url
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_queued = max_queued
+        self.visibility_timeout = max(30, int(visibility_timeout))
+        self.skipped = 0
+        self._receipts: Dict[str, str] = {}
+        self._heartbeats: Dict[str, asyncio.Task] = {}
+        self._save_locks: Dict[str, asyncio.Lock] = {}
+        self._receive_executor = ThreadPoolExecutor(max_workers=max(1, receivers), thread_name_prefix="sqs-receive")
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}/{job_id}.json"
+
+    def _queued(self) -> int:
+        attrs = self.sqs.get_queue_attributes(
+            QueueUrl=self.queue_url, AttributeNames=["ApproximateNumberOfMessages"]
+        )
+        return int(attrs["Attributes"]["ApproximateNumberOfMessages"])
+
+    async def enqueue(self, job: Job, delay: float = 0.0) -> None:
+        queued = await asyncio.to_thread(self._queued)
+        if queued >= self.max_queued:
+            raise QueueFull(f"{queued} jobs already queued")
+        await self.save(job)
+        await asyncio.to_thread(
+            self.sqs.send_message,
+            QueueUrl=self.queue_url,
+            MessageBody=json.dumps({"id": job.id}),
+            DelaySeconds=min(900, max(0, int(delay))),  # SQS allows at most 15 minutes
+        )
+
+    async def dequeue(self) -> Job:
+        loop = asyncio.get_running_loop()
+        while True:
+            resp = await loop.run_in_executor(self._receive_executor, functools.partial(
+                self.sqs.receive_message, QueueUrl=self.queue_url, MaxNumberOfMessages=1, WaitTimeSeconds=20,
+                VisibilityTimeout=self.visibility_timeout,
+            ))
+            for msg in resp.get("Messages", []):
+                receipt = msg["ReceiptHandle"]
+                job = await self.load(json.loads(msg["Body"])["id"])
+                if job is None or job.finished:
+                    # unknown, or a redelivery of a job that finished (e.g. its delete used a stale receipt)
+                    self.skipped += 1
+                    await asyncio.to_thread(self.sqs.delete_message, QueueUrl=self.queue_url, ReceiptHandle=receipt)
+                    continue
+                if job.status == "running" and time.time() - job.updated_at < self.visibility_timeout:
+                    # another worker's heartbeat is still fresh; look again once it would have lapsed
+                    self.skipped += 1
+                    await asyncio.to_thread(
+                        self.sqs.change_message_visibility,
+                        QueueUrl=self.queue_url, ReceiptHandle=receipt, VisibilityTimeout=self.visibility_timeout,
+                    )
+                    continue
+                self._receipts[job.id] = receipt
+                self._heartbeats[job.id] = asyncio.create_task(self._heartbeat(job, receipt))
+                return job
+
+    async def _heartbeat(self, job: Job, receipt: str) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            try:
+                await asyncio.to_thread(
+                    self.sqs.change_message_visibility,
+                    QueueUrl=self.queue_url, ReceiptHandle=receipt, VisibilityTimeout=self.visibility_timeout,
+                )
+                if job.status == "running":
+                    job.updated_at = time.time()
+                    await self.save(job)
+            except Exception as e:
+                print(f"Failed to extend visibility of job {job.id}: {e}")
+
+    async def ack(self, job: Job) -> None:
+        heartbeat = self._heartbeats.pop(job.id, None)
+        if heartbeat is not None:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+        receipt = self._receipts.pop(job.id, None)
+        # a job interrupted mid-run (the replica shutting down) keeps its message, so another
+        # replica takes it over once the heartbeat has lapsed
+        if receipt and job.status != "running":
+            await asyncio.to_thread(self.sqs.delete_message, QueueUrl=self.queue_url, ReceiptHandle=receipt)
+
+    async def save(self, job: Job) -> None:
+        # one write at a time per job, each serializing the job when its turn comes,
+        # so a heartbeat can never land after (and undo) the final status
+        lock = self._save_locks.setdefault(job.id, asyncio.Lock())
+        async with lock:
+            await asyncio.to_thread(
+                self.s3.put_object,
+                Bucket=self.bucket,
+                Key=self._key(job.id),
+                Body=json.dumps(job.to_dict()).encode("utf-8"),
+                ContentType="application/json",
+            )
+        if job.finished and not lock.locked():
+            self._save_locks.pop(job.id, None)
+
+    async def load(self, job_id: str) -> Optional[Job]:
+        try:
+            obj = await asyncio.to_thread(self.s3.get_object, Bucket=self.bucket, Key=self._key(job_id))
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        return Job.from_dict(json.loads(obj["Body"].read()))
+
+    def stats(self) -> dict:
+        return {"backend": "sqs", "queue_url": self.queue_url, "max_queued": self.max_queued,
+                "visibility_timeout": self.visibility_timeout, "skipped": self.skipped}
+
+    def close(self) -> None:
+        self._receive_executor.shutdown(wait=False, cancel_futures=True)
+
+
+class JobWorkerPool:
+    """Runs queued jobs on a fixed number of in-process workers.
+
+    A job that fails is queued again, retry_delay seconds later, until it has
+    been attempted max_attempts times; run is expected to resume from whatever
+    the failed attempt completed. Errors of the types in no_retry (a bad
+    strategy, a missing archive) fail the job at once.
+    """
+
+    def __init__(
+        self,
+        backend: Union[JobBackend, Callable[[], JobBackend]],
+        run: Callable[[Job, EventCallback], Awaitable[Any]],
+        workers: int = 2,
+        max_attempts: int = 1,
+        retry_delay: float = 0.0,
+        no_retry: Tuple[type, ...] = (ValueError, LookupError),
+    ):
+        self._backend = backend  # or a factory, called on first use so building it stays off import
+        self.run = run
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_delay = retry_delay
+        self.no_retry = no_retry
+        self.running = 0
+        self.retries = 0
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def backend(self) -> JobBackend:
+        if not isinstance(self._backend, JobBackend):
+            self._backend = self._backend()
+        return self._backend
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if isinstance(self._backend, JobBackend):
+            self._backend.close()
+
+    async def submit(
+        self,
+        company: str,
+        strategy: Optional[str] = None,
+        force_refresh: bool = False,
+        reprocess: bool = False,
+        archive_key: Optional[str] = None,
+        full_refresh: bool = False,
+    ) -> Job:
+        job = Job(
+            company=company, strategy=strategy, force_refresh=force_refresh, full_refresh=full_refresh,
+            reprocess=reprocess, archive_key=archive_key,
+        )
+        await self.backend.enqueue(job)
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self.backend.dequeue()
+            self.running += 1
+            try:
+                await self._run_one(job)
+            finally:
+                self.running -= 1
+                await self.backend.ack(job)
+
+    async def _run_one(self, job: Job) -> None:
+        pending: List[asyncio.Task] = []
+
+        def on_event(stage: str, data: dict) -> None:
+            if stage in ITEM_EVENTS:
+                counter = job.progress.setdefault(stage, {"count": 0})
+                counter["count"] += 1
+                return
+            job.stage = stage
+            job.progress[stage] = data
+            job.updated_at = time.time()
+            pending.append(asyncio.ensure_future(self.backend.save(job)))
+
+        job.status = "running"
+        job.attempts += 1
+        job.updated_at = time.time()
+        await self.backend.save(job)
+        retry = False
+        try:
+            job.s3_url, job.cached = await self.run(job, on_event)
+            job.status, job.error = "succeeded", None
+        except Exception as e:
+            print(f"Job {job.id} for {job.company} failed (attempt {job.attempts}/{self.max_attempts}): {e}")
+            job.status, job.error = "failed", str(e)
+            retry = job.attempts < self.max_attempts and not isinstance(e, self.no_retry)
+        await asyncio.gather(*pending, return_exceptions=True)
+        job.updated_at = time.time()
+        if retry:
+            job.status = "queued"
+            try:
+                await self.backend.enqueue(job, delay=self.retry_delay)
+                self.retries += 1
+                return
+            except QueueFull as e:
+                job.status, job.error = "failed", f"{job.error} (retry dropped: {e})"
+        await self.backend.save(job)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "retries": self.retries,
+            "max_attempts": self.max_attempts,
+            **self.backend.stats(),
+        }
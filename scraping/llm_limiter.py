@@ -0,0 +1,202 @@
+import asyncio
+import contextvars
+import functools
+import random
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict
+
+# Who an LLM call is made for (e.g. the company being scraped); queued calls are
+# granted round-robin across tenants so one large scrape cannot starve the others
+llm_tenant: contextvars.ContextVar[str] = contextvars.ContextVar("llm_tenant", default="")
+
+# Bedrock error codes that mean "slow down" rather than "this request is wrong"
+_THROTTLE_CODES = frozenset((
+    "ThrottlingException", "throttlingException", "TooManyRequestsException",
+    "ServiceUnavailableException", "ModelNotReadyException",
+))
+
+
+def is_throttling(error: BaseException) -> bool:
+    """True for Bedrock throttling / capacity errors, raw or wrapped by strands."""
+    while error is not None:
+        if type(error).__name__ == "ModelThrottledException":
+            return True
+        response = getattr(error, "response", None)
+        if isinstance(response, dict) and response.get("Error", {}).get("Code") in _THROTTLE_CODES:
+            return True
+        error = error.__cause__
+    return False
+
+
+class TokenBucket:
+    """Refills per_minute units evenly over a minute; holds at most a minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount can be taken (a request larger than the bucket waits for a full one)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+
+class LLMLimiter:
+    """Process-wide gate for blocking LLM calls.
+
+    Calls run on a dedicated thread pool so they never occupy the event loop or
+    the default executor used for S3 and SQLite. Each call waits for:
+      * a concurrency slot; the window grows by one per window of successful
+        calls and halves when the service throttles (AIMD), never below
+        min_concurrency or above max_concurrency;
+      * requests-per-minute and tokens-per-minute buckets (0 disables either).
+    Queued calls are granted round-robin across llm_tenant values. Throttled
+    calls are retried up to max_retries times with full-jitter exponential
+    backoff; other errors propagate immediately.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.limit = float(self.max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="llm")
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._last_decrease = 0.0
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.rate_wait = 0.0
+
+    def _dispatch(self) -> None:
+        while self._waiting and self.in_flight < int(self.limit):
+            tenant, queue = next(iter(self._waiting.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._waiting.move_to_end(tenant)
+            else:
+                del self._waiting[tenant]
+            if waiter.done():  # cancelled while queued
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    async def _acquire_slot(self) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(llm_tenant.get(), deque()).append(waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()  # granted just as we were cancelled
+            raise
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    async def _wait_for_rate(self, tokens: int) -> None:
+        while True:
+            wait = max(
+                self._requests.wait_time(1) if self._requests else 0.0,
+                self._tokens.wait_time(tokens) if self._tokens and tokens else 0.0,
+            )
+            if wait <= 0:
+                break
+            self.rate_wait += wait
+            await asyncio.sleep(wait)
+        if self._requests:
+            self._requests.take(1)
+        if self._tokens and tokens:
+            self._tokens.take(tokens)
+
+    def _on_success(self) -> None:
+        self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+        self._dispatch()
+
+    def _on_throttle(self, started: float) -> None:
+        self.throttled += 1
+        # calls already in flight when the window last shrank report the same overload; count it once
+        if started >= self._last_decrease:
+            self.limit = max(float(self.min_concurrency), self.limit / 2)
+            self._last_decrease = time.monotonic()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def run(self, fn: Callable[..., Any], *args, tokens: int = 0) -> Any:
+        """Run fn(*args) on the LLM executor once capacity allows; tokens is the call's estimated size."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            await self._acquire_slot()
+            started = time.monotonic()
+            try:
+                await self._wait_for_rate(tokens)
+                self.calls += 1
+                result = await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+            except Exception as e:
+                self._release_slot()
+                if not is_throttling(e):
+                    self.failures += 1
+                    raise
+                self._on_throttle(started)
+                if attempt == self.max_retries:
+                    self.failures += 1
+                    raise
+                self.retries += 1
+                delay = self._backoff(attempt)
+                print(f"LLM call throttled ({e}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                self._release_slot()
+                raise
+            self._release_slot()
+            self._on_success()
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queued": sum(len(q) for q in self._waiting.values()),
+            "calls": self.calls,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "failures": self.failures,
+            "rate_wait_s": round(self.rate_wait, 3),
+        }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
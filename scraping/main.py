@@ -2,24 +2,39 @@ import os
 import asyncio
 import json
 import uuid
-from typing import List
+from typing import IO, AsyncIterator, Callable, Dict, List, Optional, Tuple
 import re
-import requests
-from bs4 import BeautifulSoup
-from newspaper import Article
-import boto3
 from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse
-from playwright.async_api import async_playwright
+from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from dotenv import load_dotenv
 import sys
-from strands.agent import Agent
-from strands.models import BedrockModel
 import xml.etree.ElementTree as ET
 import httpx
 from urllib.parse import urljoin, urlparse
-import gzip
-import io
+import zlib
+from contextlib import asynccontextmanager
+from browser_pool import BrowserPool
+from checkpoints import Checkpoint, LocalCheckpointStore, S3CheckpointStore
+from clients import ClientRegistry
+from fetch_profiles import PROFILES, FetchProfiles, parse_site_profiles
+from fetcher import FetchLimiter, PageResult, TieredFetcher, decode_body, iter_pages, read_body
+from chunking import chunk_pages, chunk_token_budget, estimate_tokens
+from extraction import ExtractionStats, extract_blocks, join_blocks, strip_boilerplate, text_digest
+from dedup import DedupStats, dedupe_pages
+from summary_cache import SummaryCache, cache_key
+from singleflight import SingleFlight
+from frontier import BACKOFF_STATUSES, CrawlFrontier
+from pipeline import buffered
+from scheduler import Batch, BatchRunner, CrawlScheduler
+from crawl_archive import ArchiveWriter, read_archive
+from dataclasses import asdict
+from datetime import datetime, timezone
+from validators import ValidatorStore, conditional_headers
+from http_client import create_http_client, http_client_stats
+from llm_limiter import LLMLimiter, llm_tenant
+from telemetry import JsonlSpanExporter, Telemetry
+from jobs import EventCallback, InMemoryJobBackend, Job, JobWorkerPool, QueueFull, SQSJobBackend
 
 load_dotenv()
 
@@ -27,35 +42,240 @@ load_dotenv()
 AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
 S3_BUCKET = os.getenv("S3_BUCKET")
 BEDROCK_MODEL = os.getenv("BEDROCK_MODEL")
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+BROWSER_MAX_PAGES = int(os.getenv("BROWSER_MAX_PAGES", "8"))
+BROWSER_PAGES_PER_BROWSER = int(os.getenv("BROWSER_PAGES_PER_BROWSER", "200"))
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+FETCH_PER_HOST = int(os.getenv("FETCH_PER_HOST", "4"))
+PAGE_TIMEOUT = float(os.getenv("PAGE_TIMEOUT", "30"))
+BROWSER_FETCH_PROFILE = os.getenv("BROWSER_FETCH_PROFILE", "balanced")  # lean | balanced | full
+BROWSER_SITE_PROFILES = os.getenv("BROWSER_SITE_PROFILES", "")  # e.g. "example.com=full,shop.example.org=lean"
+STATIC_MIN_TEXT_CHARS = int(os.getenv("STATIC_MIN_TEXT_CHARS", "200"))
+RESPONSE_MAX_BYTES = int(os.getenv("RESPONSE_MAX_MB", "5")) * 1024 * 1024  # pages, robots.txt, homepage; 0 = no cap
+PIPELINE_BUFFER_PAGES = int(os.getenv("PIPELINE_BUFFER_PAGES", "4"))  # fetched pages waiting for extraction
+PAGE_TEXT_CHARS = int(os.getenv("PAGE_TEXT_CHARS", "2000"))
+PAGE_BLOCK_CHARS = 100_000  # text kept per page at extraction, before boilerplate removal and PAGE_TEXT_CHARS
+BOILERPLATE_MIN_SHARE = float(os.getenv("BOILERPLATE_MIN_SHARE", "0.5"))
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))  # 0 disables near-duplicate removal
+SUMMARY_STRATEGIES = ("refine", "map_reduce")
+SUMMARY_STRATEGY = os.getenv("SUMMARY_STRATEGY", "refine")
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+SUMMARY_FAN_IN = int(os.getenv("SUMMARY_FAN_IN", "4"))
+SUMMARY_MODEL_ID = "us.meta.llama3-1-70b-instruct-v1:0"
+SUMMARY_TEMPERATURE = 0.7
+# Bump whenever the summarization prompts change so cached outputs are not reused
+SUMMARY_PROMPT_VERSION = "1"
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", "summary_cache.sqlite3")  # empty disables the cache
+SUMMARY_CACHE_MAX_MB = int(os.getenv("SUMMARY_CACHE_MAX_MB", "256"))
+SUMMARY_CACHE_MAX_AGE_DAYS = float(os.getenv("SUMMARY_CACHE_MAX_AGE_DAYS", "30"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_MIN_CONCURRENCY = int(os.getenv("LLM_MIN_CONCURRENCY", "1"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))  # 0 = no limit
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))  # 0 = no limit
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "1"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "30"))
+LLM_OUTPUT_TOKENS = 512  # output allowance charged against the tokens-per-minute budget per call
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "8000"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "0"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+DNS_CACHE_TTL = float(os.getenv("DNS_CACHE_TTL", "300"))
+SITEMAP_CONCURRENCY = int(os.getenv("SITEMAP_CONCURRENCY", "4"))
+SITEMAP_MAX_DEPTH = int(os.getenv("SITEMAP_MAX_DEPTH", "3"))
+SITEMAP_MAX_BYTES = int(os.getenv("SITEMAP_MAX_MB", "100")) * 1024 * 1024
+SITEMAP_FALLBACK_BYTES = 2 * 1024 * 1024  # HTML/plaintext sitemaps are parsed whole, up to this size
+SITEMAP_RECORD_LIMIT = 50000  # most sitemap entries remembered for replay on 304 Not Modified
+VALIDATOR_STORE_PATH = os.getenv("VALIDATOR_STORE_PATH", "validators.sqlite3")  # empty disables revalidation
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")  # JSONL file of finished spans, "-" for stdout; empty disables
+VALIDATOR_MAX_AGE_DAYS = float(os.getenv("VALIDATOR_MAX_AGE_DAYS", "30"))
+VALIDATOR_STORE_MAX_MB = int(os.getenv("VALIDATOR_STORE_MAX_MB", "256"))
+RESULT_PREFIX = os.getenv("RESULT_PREFIX", "summaries")
+RESULT_TTL_HOURS = float(os.getenv("RESULT_TTL_HOURS", "24"))
+SCHEDULER_MAX_CRAWLS = int(os.getenv("SCHEDULER_MAX_CRAWLS", "16"))
+SCHEDULER_LOOKUP_CONCURRENCY = int(os.getenv("SCHEDULER_LOOKUP_CONCURRENCY", "8"))
+SCHEDULER_DISCOVER_CONCURRENCY = int(os.getenv("SCHEDULER_DISCOVER_CONCURRENCY", "8"))
+SCHEDULER_FETCH_CONCURRENCY = int(os.getenv("SCHEDULER_FETCH_CONCURRENCY", "4"))
+SCHEDULER_SUMMARIZE_CONCURRENCY = int(os.getenv("SCHEDULER_SUMMARIZE_CONCURRENCY", "4"))
+BATCH_MAX_COMPANIES = int(os.getenv("BATCH_MAX_COMPANIES", "1000"))
+BATCH_PREFIX = os.getenv("BATCH_PREFIX", "batches")
+ROBOTS_USER_AGENT = os.getenv("ROBOTS_USER_AGENT", "*")  # product token matched against robots.txt groups
+ROBOTS_TTL = float(os.getenv("ROBOTS_TTL", "3600"))
+HOST_REQUESTS_PER_SECOND = float(os.getenv("HOST_REQUESTS_PER_SECOND", "2"))
+HOST_BURST = int(os.getenv("HOST_BURST", "4"))
+HOST_MAX_BACKOFF = float(os.getenv("HOST_MAX_BACKOFF", "300"))
+HOST_MAX_RETRIES = int(os.getenv("HOST_MAX_RETRIES", "2"))
+CRAWL_ARCHIVE_ENABLED = os.getenv("CRAWL_ARCHIVE_ENABLED", "true").lower() in ("1", "true", "yes")
+INCREMENTAL_REFRESH = os.getenv("INCREMENTAL_REFRESH", "true").lower() in ("1", "true", "yes")
+INCREMENTAL_MAX_CHANGED_SHARE = float(os.getenv("INCREMENTAL_MAX_CHANGED_SHARE", "0.5"))
+INCREMENTAL_MAX_UPDATES = int(os.getenv("INCREMENTAL_MAX_UPDATES", "10"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_BACKEND = os.getenv("JOB_BACKEND", "memory")  # "memory" or "sqs"
+JOB_QUEUE_URL = os.getenv("JOB_QUEUE_URL")
+JOB_VISIBILITY_TIMEOUT = int(os.getenv("JOB_VISIBILITY_TIMEOUT", "300"))  # seconds; extended while a job runs
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "30"))
+CHECKPOINT_STORE = os.getenv("CHECKPOINT_STORE", "local")  # "local", "s3" or "none"
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "checkpoints.sqlite3")
+CHECKPOINT_PREFIX = os.getenv("CHECKPOINT_PREFIX", "checkpoints")
+CHECKPOINT_MAX_AGE_HOURS = float(os.getenv("CHECKPOINT_MAX_AGE_HOURS", "24"))
+WARM_CLIENTS = os.getenv("WARM_CLIENTS", "true").lower() in ("1", "true", "yes")
+JOB_BACKENDS = ("memory", "sqs")
+CHECKPOINT_STORES = ("local", "s3", "none")
+
+
+def validate_config() -> None:
+    """Reject missing or inconsistent settings; run at app startup so importing this module never fails on them."""
+    problems = []
+    if not S3_BUCKET or not BEDROCK_MODEL:
+        problems.append("Environment variables S3_BUCKET and BEDROCK_MODEL must be set.")
+    if SUMMARY_STRATEGY not in SUMMARY_STRATEGIES:
+        problems.append(f"SUMMARY_STRATEGY must be one of {SUMMARY_STRATEGIES}, got {SUMMARY_STRATEGY!r}.")
+    if JOB_BACKEND not in JOB_BACKENDS:
+        problems.append(f"JOB_BACKEND must be one of {JOB_BACKENDS}, got {JOB_BACKEND!r}.")
+    elif JOB_BACKEND == "sqs" and not JOB_QUEUE_URL:
+        problems.append("JOB_QUEUE_URL must be set when JOB_BACKEND=sqs.")
+    if CHECKPOINT_STORE not in CHECKPOINT_STORES:
+        problems.append(f"CHECKPOINT_STORE must be one of {CHECKPOINT_STORES}, got {CHECKPOINT_STORE!r}.")
+    unknown_profiles = {BROWSER_FETCH_PROFILE, *parse_site_profiles(BROWSER_SITE_PROFILES).values()} - PROFILES.keys()
+    if unknown_profiles:
+        problems.append(
+            f"BROWSER_FETCH_PROFILE and BROWSER_SITE_PROFILES must use profiles {sorted(PROFILES)}, "
+            f"got {sorted(unknown_profiles)}."
+        )
+    if problems:
+        raise ValueError(" ".join(problems))
 
-if not S3_BUCKET or not BEDROCK_MODEL:
-    raise ValueError("Environment variables S3_BUCKET and BEDROCK_MODEL must be set.")
 
 if sys.platform.startswith('win'):
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
-# AWS Clients
-s3_client = boto3.client("s3", region_name=AWS_REGION)
-bedrock_runtime = boto3.client("bedrock-runtime", region_name="us-east-1")
-
-messages = [
-    {
-        "role": "user",
-        "content": [{"text": "Summarize this text for me."}]
-    }
-]
 
 
-# Set up the Bedrock model (define once, not inside functions)
-bedrock_model = BedrockModel(
-    model_id="us.meta.llama3-1-70b-instruct-v1:0",  # ✅ check your model id
-    region_name="us-east-1",
-    temperature=0.7,
+# boto3 and strands dominate import time, so they are imported by these factories, not at module level
+def _aws_client(service: str):
+    import boto3
+
+    return boto3.client(service, region_name=AWS_REGION)
+
+
+def _bedrock_model():
+    from strands.models import BedrockModel
+
+    return BedrockModel(
+        model_id=SUMMARY_MODEL_ID,  # ✅ check your model id
+        region_name="us-east-1",
+        temperature=SUMMARY_TEMPERATURE,
+    )
+
+
+def _summary_cache() -> Optional[SummaryCache]:
+    if not SUMMARY_CACHE_PATH:
+        return None
+    return SummaryCache(
+        SUMMARY_CACHE_PATH,
+        max_bytes=SUMMARY_CACHE_MAX_MB * 1024 * 1024,
+        max_age=SUMMARY_CACHE_MAX_AGE_DAYS * 86400,
+    )
+
+
+def _validator_store() -> Optional[ValidatorStore]:
+    if not VALIDATOR_STORE_PATH:
+        return None
+    return ValidatorStore(
+        VALIDATOR_STORE_PATH, max_age=VALIDATOR_MAX_AGE_DAYS * 86400, max_bytes=VALIDATOR_STORE_MAX_MB * 1024 * 1024
+    )
+
+
+def _checkpoint_store():
+    max_age = CHECKPOINT_MAX_AGE_HOURS * 3600
+    if CHECKPOINT_STORE == "s3":
+        return S3CheckpointStore(lambda: clients.get("s3"), S3_BUCKET, CHECKPOINT_PREFIX, max_age=max_age)
+    if CHECKPOINT_STORE == "local" and CHECKPOINT_PATH:
+        return LocalCheckpointStore(CHECKPOINT_PATH, max_age=max_age)
+    return None
+
+
+# AWS clients, the Bedrock model and the on-disk stores; built on first use (the stores open SQLite
+# files, and importing this module should not), or warmed in the background after startup. The
+# stores are None when disabled.
+clients = ClientRegistry()
+clients.register("s3", lambda: _aws_client("s3"))
+clients.register("sqs", lambda: _aws_client("sqs"))
+clients.register("bedrock_model", _bedrock_model)
+# LLM summaries by content hash, so re-scraping an unchanged site costs no Bedrock calls
+clients.register("summary_cache", _summary_cache)
+# ETag / Last-Modified per URL so repeat crawls can revalidate instead of re-downloading
+clients.register("validator_store", _validator_store)
+# Completed steps of unfinished crawls, so a retry resumes where the failed attempt stopped
+clients.register("checkpoint_store", _checkpoint_store)
+# What each browser fetch blocks and waits for, chosen per site; its names are checked by validate_config
+clients.register("fetch_profiles", lambda: FetchProfiles(BROWSER_FETCH_PROFILE, parse_site_profiles(BROWSER_SITE_PROFILES)))
+
+# Every Bedrock call in the process goes through this: own threads, RPM/TPM buckets, adaptive concurrency
+llm_limiter = LLMLimiter(
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    min_concurrency=LLM_MIN_CONCURRENCY,
+    requests_per_minute=LLM_REQUESTS_PER_MINUTE,
+    tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+    max_retries=LLM_MAX_RETRIES,
+    base_delay=LLM_RETRY_BASE_DELAY,
+    max_delay=LLM_RETRY_MAX_DELAY,
 )
 
+# Spans around every stage and external call; aggregated on /metrics, optionally exported as traces
+telemetry = Telemetry(exporter=JsonlSpanExporter(TRACE_EXPORT_PATH) if TRACE_EXPORT_PATH else None)
+
+# One pooled HTTP client for the process; created in the app lifespan, or lazily on first use
+http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global http_client
+    if http_client is None or http_client.is_closed:
+        http_client = create_http_client(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            http2=HTTP2_ENABLED,
+            dns_ttl=DNS_CACHE_TTL,
+            connect_timeout=HTTP_CONNECT_TIMEOUT,
+            read_timeout=HTTP_READ_TIMEOUT,
+        )
+    return http_client
+
+
+# Shared Chromium pool; started in the app lifespan, or lazily on first fetch
+browser_pool = BrowserPool(
+    size=BROWSER_POOL_SIZE,
+    max_pages=BROWSER_MAX_PAGES,
+    pages_per_browser=BROWSER_PAGES_PER_BROWSER,
+)
+
+# Companies in progress overall and per pipeline stage, shared by one-off scrapes and batches
+crawl_scheduler = CrawlScheduler({
+    "lookup": SCHEDULER_LOOKUP_CONCURRENCY,
+    "crawl": SCHEDULER_MAX_CRAWLS,
+    "discover": SCHEDULER_DISCOVER_CONCURRENCY,
+    "fetch": SCHEDULER_FETCH_CONCURRENCY,
+    "summarize": SCHEDULER_SUMMARIZE_CONCURRENCY,
+})
+
+# Shared across concurrent scrapes so the limits hold for the whole process
+fetch_limiter = FetchLimiter(concurrency=FETCH_CONCURRENCY, per_host=FETCH_PER_HOST)
+
 def chunk_text(text: str, chunk_size: int = 1000) -> List[str]:
     return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
 
-def summarize_chunk(chunk, prev_summary=None):
+async def summarize_chunk(chunk, prev_summary=None) -> str:
+    return await _summarize(*_chunk_prompt(chunk, prev_summary), span_name="llm.summarize_chunk")
+
+
+def _chunk_prompt(chunk, prev_summary=None):
     # system_prompt = "You are a helpful summarization assistant."
     system_prompt = (
         "You are a careful summarization assistant. When given a previous running summary "
@@ -93,11 +313,72 @@ def summarize_chunk(chunk, prev_summary=None):
             }
         ]
 
+    return system_prompt, messages
+
+
+async def merge_summaries(summaries: List[str]) -> str:
+    """Reduce step of map-reduce: fold several partial summaries into one."""
+    return await _summarize(*_merge_prompt(summaries), span_name="llm.merge_summaries")
+
+
+def _merge_prompt(summaries: List[str]):
+    system_prompt = (
+        "You are a careful summarization assistant. You merge partial summaries of different "
+        "parts of the same website into one summary. Keep every distinct key point, remove "
+        "duplicates, and do not invent information that is not in the partial summaries."
+    )
+    parts = "\n\n".join(f"Partial summary {i + 1}:\n{s}" for i, s in enumerate(summaries))
+    messages = [
+        {
+            "role": "user",
+            "content": [{"text": (
+                "Merge the following partial summaries into a single concise summary capturing all key points.\n\n"
+                f"{parts}\n\n"
+                "Your output must be a self-contained summary."
+            )}]
+        }
+    ]
+    return system_prompt, messages
+
+
+def _summary_cache_key(system_prompt: str, messages: list) -> str:
+    return cache_key(SUMMARY_PROMPT_VERSION, SUMMARY_MODEL_ID, SUMMARY_TEMPERATURE, system_prompt, messages)
+
+
+def _prompt_tokens(system_prompt: str, messages: list) -> int:
+    return estimate_tokens(system_prompt + "".join(p["text"] for m in messages for p in m["content"]))
+
+
+async def _summarize(system_prompt: str, messages: list, span_name: str = "llm.summarize") -> str:
+    """Serve an identical prompt from the summary cache, else call Bedrock through llm_limiter."""
+    summary_cache = clients.get("summary_cache")
+    with telemetry.span(span_name, model_id=SUMMARY_MODEL_ID, cache_hit=False) as span:
+        key = _summary_cache_key(system_prompt, messages) if summary_cache is not None else None
+        if key is not None:
+            cached = await asyncio.to_thread(summary_cache.get, key)
+            if cached is not None:
+                span.set(cache_hit=True)
+                return cached
+        prompt_tokens = _prompt_tokens(system_prompt, messages)
+        span.set(input_tokens=prompt_tokens)
+        summary = await llm_limiter.run(
+            _run_summarize_agent, system_prompt, messages, tokens=prompt_tokens + LLM_OUTPUT_TOKENS
+        )
+        span.set(output_tokens=estimate_tokens(summary or ""))
+        if summary and key is not None:
+            await asyncio.to_thread(summary_cache.put, key, summary)
+        return summary
+
+
+def _run_summarize_agent(system_prompt: str, messages: list) -> str:
+    from strands.agent import Agent
+
     summarize_agent = Agent(
         name="summarizeAgent",
-        model=bedrock_model,
+        model=clients.get("bedrock_model"),
         system_prompt=system_prompt,  # must be string, not messages
-        messages=messages
+        messages=messages,
+        retry_strategy=None,  # throttling is retried by llm_limiter, which also backs off concurrency
     )
 
     result = summarize_agent()  # call without extra prompt argument
@@ -105,26 +386,226 @@ def summarize_chunk(chunk, prev_summary=None):
 
 
 
-def chain_summarize(text: str, chunk_size: int = 1000) -> str:
+async def chain_summarize(text: str, chunk_size: int = 1000) -> str:
+    return await refine_summarize(chunk_text(text, chunk_size))
+
+
+async def refine_summarize(chunks: List[str]) -> str:
+    """Refine mode: one running summary, updated chunk by chunk in order."""
     summary = None
-    for chunk in chunk_text(text, chunk_size):
-        summary = summarize_chunk(chunk, summary)
+    for chunk in chunks:
+        summary = await summarize_chunk(chunk, summary)
     return summary
 
-def upload_json_to_s3(data: dict, prefix: str = "summary") -> str:
-    file_name = f"{prefix}_{uuid.uuid4().hex}.json"
-    s3_client.put_object(
-        Bucket=S3_BUCKET,
-        Key=file_name,
-        Body=json.dumps(data, indent=2).encode("utf-8"),
-        ContentType="application/json",
-    )
-    url = s3_client.generate_presigned_url(
-        "get_object",
-        Params={"Bucket": S3_BUCKET, "Key": file_name},
-        ExpiresIn=3600,
-    )
-    return url
+
+async def map_reduce_summarize(
+    chunks: List[str],
+    concurrency: int = 4,
+    fan_in: int = 4,
+    on_partial: Optional[Callable[[int, int, str], None]] = None,
+    completed: Optional[Dict[str, str]] = None,
+) -> str:
+    """Map-reduce mode: summarize chunks in parallel, then merge fan_in at a time.
+
+    The merge tree has depth ceil(log_fan_in(len(chunks))) and no prompt ever
+    carries more than fan_in partial summaries. on_partial(level, index, summary)
+    is called as each map (level 0) or merge (level >= 1) result arrives.
+    completed maps "level:index" to results of an earlier attempt over the
+    same chunks; those calls are not made again.
+    """
+    if not chunks:
+        return None
+    limit = asyncio.Semaphore(max(1, concurrency))
+    fan_in = max(2, fan_in)
+
+    async def _call(level, index, fn, arg):
+        if completed and f"{level}:{index}" in completed:
+            return completed[f"{level}:{index}"]
+        async with limit:
+            summary = await fn(arg)
+        if on_partial is not None:
+            on_partial(level, index, summary)
+        return summary
+
+    partials = await asyncio.gather(*(_call(0, i, summarize_chunk, c) for i, c in enumerate(chunks)))
+    level = 0
+    while len(partials) > 1:
+        level += 1
+        groups = [partials[i:i + fan_in] for i in range(0, len(partials), fan_in)]
+        partials = await asyncio.gather(*(
+            _call(level, i, merge_summaries, g) if len(g) > 1 else asyncio.sleep(0, result=g[0])
+            for i, g in enumerate(groups)
+        ))
+    return partials[0]
+
+
+def _progress_step(kind: str, *inputs) -> str:
+    """Checkpoint step name for LLM progress over exactly these inputs, with the current prompts and model."""
+    return f"{kind}-{cache_key(SUMMARY_PROMPT_VERSION, SUMMARY_MODEL_ID, *inputs)[:16]}"
+
+
+def _resume_point(done: Dict[str, str]):
+    """(latest summary, next chunk index) of a sequential summary checkpointed as {"0:<index>": summary}."""
+    summary, start = None, 0
+    for key, value in done.items():
+        summary, start = value, int(key.split(":")[1]) + 1
+    return summary, start
+
+
+async def summarize_chunks(
+    chunks: List[str],
+    strategy: Optional[str] = None,
+    on_event: Optional[EventCallback] = None,
+    checkpoint: Optional[Checkpoint] = None,
+) -> str:
+    """Summarize chunks with the given strategy ("refine" or "map_reduce").
+
+    Each intermediate summary is reported as a "partial_summary" event. With a
+    checkpoint it is also saved, and a later attempt over the same chunks
+    picks up from the summaries saved before it failed.
+    """
+    strategy = strategy or SUMMARY_STRATEGY
+    if strategy not in SUMMARY_STRATEGIES:
+        raise ValueError(f"Unknown summary strategy {strategy!r}; expected one of {SUMMARY_STRATEGIES}")
+    step = _progress_step("summary", strategy, chunks)
+    done: Dict[str, str] = (await checkpoint.load(step) or {}) if checkpoint is not None else {}
+    if done:
+        _emit(on_event, "checkpoint", status="resumed", step="summarize", partials=len(done))
+    saves: List[asyncio.Future] = []
+
+    def _partial(level: int, index: int, summary: str) -> None:
+        _emit(on_event, "partial_summary", level=level, index=index, summary=summary)
+        if checkpoint is not None:
+            if strategy == "refine":
+                done.clear()  # only the running summary is needed to carry on
+            done[f"{level}:{index}"] = summary
+            saves.append(asyncio.ensure_future(checkpoint.save(step, done)))
+
+    try:
+        if strategy == "map_reduce":
+            return await map_reduce_summarize(
+                chunks, SUMMARY_CONCURRENCY, SUMMARY_FAN_IN, on_partial=_partial, completed=dict(done)
+            )
+        summary, start = _resume_point(done)
+        for i in range(start, len(chunks)):
+            summary = await summarize_chunk(chunks[i], summary)
+            _partial(0, i, summary)
+        return summary
+    finally:
+        # also after a failure: what completed is exactly what the next attempt should skip
+        await asyncio.gather(*saves, return_exceptions=True)
+
+def upload_json_to_s3(
+    data: dict, prefix: str = "summary", key: Optional[str] = None, metadata: Optional[Dict[str, str]] = None
+) -> str:
+    file_name = key or f"{prefix}_{uuid.uuid4().hex}.json"
+    body = json.dumps(data, indent=2).encode("utf-8")
+    with telemetry.span("s3.put", key=file_name, bytes=len(body)):
+        clients.get("s3").put_object(
+            Bucket=S3_BUCKET,
+            Key=file_name,
+            Body=body,
+            ContentType="application/json",
+            Metadata=metadata or {},
+        )
+    return _presigned_url(file_name)
+
+
+def _presigned_url(key: str) -> str:
+    with telemetry.span("s3.presign", key=key):
+        return clients.get("s3").generate_presigned_url(
+            "get_object",
+            Params={"Bucket": S3_BUCKET, "Key": key},
+            ExpiresIn=3600,
+        )
+
+
+def _result_host(company_name: str) -> str:
+    host = urlparse(_normalize_base_url(company_name)).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _result_key(company_name: str) -> str:
+    """Deterministic S3 key for a company's summary, shared by every request for that domain."""
+    return f"{RESULT_PREFIX}/{_result_host(company_name)}.json"
+
+
+def _result_metadata(data: dict) -> Dict[str, str]:
+    """S3 metadata of a stored summary, so freshness checks need only a HEAD; raises when there is no summary."""
+    if not data.get("summary"):
+        raise RuntimeError(f"No summary was produced for {data.get('company_name')}; nothing stored")
+    return {"summary-strategy": data["summary_strategy"]}
+
+
+def _archive_key(company_name: str, crawled_at: datetime) -> str:
+    """S3 key of one crawl's raw-page bundle, next to the summary; keys sort by crawl time.
+
+    Milliseconds keep an incremental crawl right after another from overwriting the archive it builds on.
+    """
+    stamp = f"{crawled_at:%Y%m%dT%H%M%S}{crawled_at.microsecond // 1000:03d}Z"
+    return f"{_archive_prefix(company_name)}{stamp}.jsonl.gz"
+
+
+def _archive_prefix(company_name: str) -> str:
+    """Common prefix of every _archive_key of a company."""
+    return f"{RESULT_PREFIX}/{_result_host(company_name)}.crawl-"
+
+
+def _check_archive_key(company_name: str, archive_key: Optional[str]) -> None:
+    """Raise ValueError unless archive_key is None or one of company_name's crawl archives."""
+    if archive_key is not None and not archive_key.startswith(_archive_prefix(company_name)):
+        raise ValueError(f"Archive {archive_key!r} is not a crawl archive of {company_name}")
+
+
+def _upload_archive(key: str, body: IO[bytes], size: int) -> None:
+    with telemetry.span("s3.put", key=key, bytes=size):
+        clients.get("s3").put_object(
+            Bucket=S3_BUCKET, Key=key, Body=body, ContentLength=size, ContentType="application/gzip"
+        )
+
+
+def _latest_archive_key(company_name: str) -> Optional[str]:
+    prefix = _archive_prefix(company_name)
+    latest = None
+    with telemetry.span("s3.list", prefix=prefix):
+        for page in clients.get("s3").get_paginator("list_objects_v2").paginate(Bucket=S3_BUCKET, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                if latest is None or obj["Key"] > latest:
+                    latest = obj["Key"]
+    return latest
+
+
+def _load_archive(key: str):
+    with telemetry.span("s3.get", key=key) as span:
+        body = clients.get("s3").get_object(Bucket=S3_BUCKET, Key=key)["Body"].read()
+        span.set(bytes=len(body))
+    return read_archive(body)
+
+
+def _fresh_result_url(key: str, strategy: str) -> Optional[str]:
+    """Presigned URL for key if it holds a summary made with strategy and is younger than RESULT_TTL_HOURS, else None.
+
+    Both are read from the object's metadata (see _result_metadata); results stored
+    without it predate that check and may lack a summary, so they count as stale.
+    """
+    from botocore.exceptions import ClientError
+
+    with telemetry.span("s3.head", key=key) as span:
+        try:
+            head = clients.get("s3").head_object(Bucket=S3_BUCKET, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                print(f"Failed to check cached result {key}: {e}")
+                span.fail(e)
+            span.set(found=False)
+            return None
+        span.set(found=True)
+    if head.get("Metadata", {}).get("summary-strategy") != strategy:
+        return None
+    age = datetime.now(timezone.utc) - head["LastModified"]
+    if age.total_seconds() > RESULT_TTL_HOURS * 3600:
+        return None
+    return _presigned_url(key)
 
 def _normalize_base_url(company_name: str) -> str:
     parsed = urlparse(company_name)
@@ -135,21 +616,53 @@ def _normalize_base_url(company_name: str) -> str:
 
 
 async def _fetch_text(client: httpx.AsyncClient, url: str) -> str:
-    try:
-        resp = await client.get(url, timeout=20.0)
-        resp.raise_for_status()
-        # handle gzipped sitemaps explicitly when served with gzip content-type
-        content_type = resp.headers.get("content-type", "").lower()
-        if "application/x-gzip" in content_type or url.endswith(".gz"):
-            try:
-                with gzip.GzipFile(fileobj=io.BytesIO(resp.content)) as gz:
-                    return gz.read().decode("utf-8", errors="ignore")
-            except Exception:
-                return resp.text
-        return resp.text
-    except Exception as e:
-        print(f"Failed to fetch {url}: {e}")
-        return ""
+    return (await _fetch_text_status(client, url))[1]
+
+
+async def _fetch_text_status(client: httpx.AsyncClient, url: str, revalidate: bool = True):
+    """(HTTP status, body) of url, or (None, "") on a network error; "" as body for any failure."""
+    validator_store = clients.get("validator_store")
+    cached = None
+    if validator_store is not None and revalidate:
+        cached = await asyncio.to_thread(validator_store.get, url)
+    status = None
+    with telemetry.span("http.fetch", url=url) as span:
+        try:
+            await crawl_frontier.wait(url)
+            async with client.stream("GET", url, headers=conditional_headers(cached)) as resp:
+                status = resp.status_code
+                span.set(status=status)
+                crawl_frontier.observe(url, status, resp.headers)
+                if resp.status_code == 304 and cached is not None:
+                    span.set(revalidated=True)
+                    text = await asyncio.to_thread(validator_store.touch, url)
+                    if text is None:  # evicted in the meantime
+                        return await _fetch_text_status(client, url, revalidate=False)
+                    return 200, text
+                resp.raise_for_status()
+                # read at most RESPONSE_MAX_BYTES; gzipped files (e.g. sitemap.txt.gz) are inflated as they arrive
+                body, truncated = await read_body(resp, RESPONSE_MAX_BYTES, gunzip=True)
+                span.set(bytes=len(body), truncated=truncated)
+                text = decode_body(resp, body)
+                del body
+            if validator_store is not None:
+                await asyncio.to_thread(validator_store.put_response, url, resp.headers, text)
+            return status, text
+        except Exception as e:
+            print(f"Failed to fetch {url}: {e}")
+            span.fail(e)
+            return status, ""
+
+
+# robots.txt rules, per-host pacing and 429/503 backoff for every request to a company's site
+crawl_frontier = CrawlFrontier(
+    fetch_robots=lambda url: _fetch_text_status(get_http_client(), url),
+    user_agent=ROBOTS_USER_AGENT,
+    robots_ttl=ROBOTS_TTL,
+    requests_per_second=HOST_REQUESTS_PER_SECOND,
+    burst=HOST_BURST,
+    max_backoff=HOST_MAX_BACKOFF,
+)
 
 
 def _same_domain(url: str, base_url: str) -> bool:
@@ -160,6 +673,8 @@ def _same_domain(url: str, base_url: str) -> bool:
 
 
 def _extract_urls_from_html(html: str, base_url: str) -> List[str]:
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, "html.parser")
     urls: List[str] = []
     for a in soup.find_all("a", href=True):
@@ -184,159 +699,1358 @@ def _extract_urls_from_text(text: str) -> List[str]:
     return urls
 
 
-async def _collect_from_sitemap(client: httpx.AsyncClient, sitemap_url: str, base_url: str, limit: int, collected: List[str]) -> None:
-    if len(collected) >= limit:
-        return
-    text = await _fetch_text(client, sitemap_url)
-    if not text:
+class _SitemapCrawl:
+    """Shared state for one discovery run: collected URLs, visited sitemaps and the byte budget."""
+
+    def __init__(self, base_url: str, limit: int, max_bytes: int):
+        self.base_url = base_url
+        self.limit = limit
+        self.bytes_left = max_bytes
+        self.collected: List[str] = []
+        self.lastmod: Dict[str, str] = {}  # page URL -> its sitemap <lastmod>, when given
+        self.seen = set()
+        self.visited = set()
+        self.finished = asyncio.Event()
+        self.partial = False  # a sitemap failed, was cut short or nested too deep to follow
+
+    @property
+    def done(self) -> bool:
+        return self.finished.is_set()
+
+    def add(self, url: str, lastmod: str = "") -> None:
+        if self.done or url in self.seen:
+            return
+        self.seen.add(url)
+        self.collected.append(url)
+        if lastmod:
+            self.lastmod[url] = lastmod
+        if len(self.collected) >= self.limit:
+            self.finished.set()
+
+    def consume(self, n: int) -> bool:
+        """Charge n decompressed bytes to the budget; False once it is exhausted."""
+        self.bytes_left -= n
+        if self.bytes_left < 0:
+            if not self.done:
+                print(f"Sitemap byte budget exhausted for {self.base_url}")
+            self.finished.set()
+            return False
+        return True
+
+
+def _byte_slices(raw: bytes, gunzip, size: int = 65536):
+    """Yield raw (or gunzipped) bytes in pieces of at most size, never inflating a whole chunk at once."""
+    if gunzip is None:
+        for i in range(0, len(raw), size):
+            yield raw[i:i + size]
         return
+    while raw:
+        piece = gunzip.decompress(raw, size)
+        raw = gunzip.unconsumed_tail
+        if piece:
+            yield piece
 
-    # Try XML first
-    try:
-        root = ET.fromstring(text)
-        ns = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
-        # sitemap index
-        sitemap_elems = list(root.findall(".//sm:sitemap/sm:loc", ns))
-        if sitemap_elems:
-            for elem in sitemap_elems:
-                if len(collected) >= limit:
-                    break
-                child_url = elem.text.strip() if elem.text else ""
-                if child_url:
-                    await _collect_from_sitemap(client, child_url, base_url, limit, collected)
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+async def _collect_from_sitemap(
+    client: httpx.AsyncClient,
+    sitemap_url: str,
+    depth: int,
+    crawl: _SitemapCrawl,
+    queue: asyncio.Queue,
+    revalidate: bool = True,
+) -> None:
+    """Stream one sitemap, adding page URLs to crawl and queueing child sitemaps.
+
+    The body is decompressed and parsed incrementally, so memory stays flat for
+    arbitrarily large sitemaps. Bodies that turn out not to be XML are buffered
+    (up to SITEMAP_FALLBACK_BYTES) and parsed as an HTML or plaintext sitemap.
+    When the validator store has the sitemap, it is fetched conditionally and a
+    304 replays the entries recorded last time.
+    """
+    validator_store = clients.get("validator_store")
+    cached = None
+    if validator_store is not None and revalidate:
+        cached = await asyncio.to_thread(validator_store.get, sitemap_url)
+    found_urls: List[str] = []
+    found_sitemaps: List[str] = []
+    found_lastmod: Dict[str, str] = {}
+    complete = True  # False once we stop reading early or record too many entries to store
+
+    def _found(loc: str, is_sitemap: bool, lastmod: str = "") -> None:
+        nonlocal complete
+        if is_sitemap:
+            if depth < SITEMAP_MAX_DEPTH:
+                queue.put_nowait((loc, depth + 1))
+            else:
+                crawl.partial = True
+        elif _same_domain(loc, crawl.base_url) and crawl_frontier.can_fetch(loc):
+            crawl.add(loc, lastmod)
+        else:
             return
-        # urlset
-        url_elems = list(root.findall(".//sm:url/sm:loc", ns))
-        if url_elems:
-            for elem in url_elems:
-                if len(collected) >= limit:
-                    break
-                loc = elem.text.strip() if elem.text else ""
-                if loc and _same_domain(loc, base_url):
-                    collected.append(loc)
+        target = found_sitemaps if is_sitemap else found_urls
+        if len(found_urls) + len(found_sitemaps) < SITEMAP_RECORD_LIMIT:
+            target.append(loc)
+            if lastmod and not is_sitemap:
+                found_lastmod[loc] = lastmod
+        else:
+            complete = False
+
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    is_xml = True
+    entries = 0
+    head: List[bytes] = []  # kept until the first sitemap entry, for the HTML/text fallback
+    head_size = 0
+    gunzip = None
+    first = True
+    resp_headers = None
+    read_bytes = 0
+    with telemetry.span("sitemap.fetch", url=sitemap_url, depth=depth) as span:
+        try:
+            await crawl_frontier.wait(sitemap_url)
+            async with client.stream("GET", sitemap_url, headers=conditional_headers(cached)) as resp:
+                crawl_frontier.observe(sitemap_url, resp.status_code, resp.headers)
+                span.set(status=resp.status_code)
+                if resp.status_code == 304 and cached is not None:
+                    span.set(revalidated=True)
+                    body = await asyncio.to_thread(validator_store.touch, sitemap_url)
+                    if body is None:  # evicted in the meantime
+                        await _collect_from_sitemap(client, sitemap_url, depth, crawl, queue, revalidate=False)
+                        return
+                    recorded = json.loads(body)
+                    lastmods = recorded.get("lastmod", {})
+                    for loc in recorded["sitemaps"]:
+                        _found(loc, True)
+                    for loc in recorded["urls"]:
+                        _found(loc, False, lastmods.get(loc, ""))
+                    if not crawl.done and not recorded["complete"]:
+                        # last time we only read part of it; this run needs more
+                        await _collect_from_sitemap(client, sitemap_url, depth, crawl, queue, revalidate=False)
+                    return
+                resp.raise_for_status()
+                resp_headers = resp.headers
+                async for raw in resp.aiter_bytes():
+                    if first:
+                        first = False
+                        # gzipped sitemaps: trust the magic bytes rather than the name or content type,
+                        # since servers sometimes also set Content-Encoding and httpx has already inflated them
+                        if raw[:2] == b"\x1f\x8b":
+                            gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                    # feed in small slices so a huge network chunk still stops at the limit
+                    for piece in _byte_slices(raw, gunzip):
+                        if not crawl.consume(len(piece)):
+                            break
+                        read_bytes += len(piece)
+                        if not entries and head_size < SITEMAP_FALLBACK_BYTES:
+                            head.append(piece)
+                            head_size += len(piece)
+                        if not is_xml:
+                            continue
+                        try:
+                            parser.feed(piece)
+                            for event, elem in parser.read_events():
+                                if event == "start":
+                                    if root is None:
+                                        root = elem
+                                    continue
+                                name = _local_name(elem.tag)
+                                if name not in ("url", "sitemap"):
+                                    continue
+                                children = {_local_name(c.tag): (c.text or "").strip() for c in elem}
+                                loc = children.get("loc", "")
+                                entries += 1
+                                if loc:
+                                    _found(loc, name == "sitemap", children.get("lastmod", ""))
+                                # drop the finished entry so the tree never grows with the file
+                                elem.clear()
+                                if root is not None and len(root) and root[-1] is elem:
+                                    root.remove(elem)
+                        except ET.ParseError:
+                            is_xml = False
+                        if entries:
+                            head = []
+                        if crawl.done:
+                            break
+                    if crawl.done:
+                        complete = False
+                        break
+                    if not is_xml and (entries or head_size >= SITEMAP_FALLBACK_BYTES):
+                        # malformed part way through a real sitemap, or a large non-XML body
+                        complete = False
+                        crawl.partial = True
+                        break
+            span.set(bytes=read_bytes, entries=entries)
+        except Exception as e:
+            print(f"Failed to fetch {sitemap_url}: {e}")
+            span.fail(e)
+            crawl.partial = True
             return
-    except ET.ParseError:
-        pass
-
-    # If not XML or failed, try HTML extraction
-    html_urls = _extract_urls_from_html(text, base_url)
-    if html_urls:
-        for u in html_urls:
-            if len(collected) >= limit:
-                break
-            collected.append(u)
-        return
 
-    # Finally, treat as plaintext list of URLs
-    text_urls = _extract_urls_from_text(text)
-    for u in text_urls:
-        if len(collected) >= limit:
-            break
-        if _same_domain(u, base_url):
-            collected.append(u)
+    if not entries and not crawl.done:
+        # Not a sitemap: try HTML extraction, then treat as plaintext list of URLs
+        text = b"".join(head).decode("utf-8", errors="ignore")
+        html_urls = _extract_urls_from_html(text, crawl.base_url)
+        for u in html_urls or _extract_urls_from_text(text):
+            _found(u, False)
+
+    if validator_store is not None and resp_headers is not None:
+        await asyncio.to_thread(
+            validator_store.put_response, sitemap_url, resp_headers,
+            json.dumps({"sitemaps": found_sitemaps, "urls": found_urls, "lastmod": found_lastmod, "complete": complete}),
+        )
+
+
+async def _collect_from_sitemaps(
+    client: httpx.AsyncClient, sitemap_urls: List[str], base_url: str, limit: int
+) -> Tuple[List[str], Dict[str, str], bool]:
+    """Walk sitemaps and sitemap indexes breadth-first with SITEMAP_CONCURRENCY fetches in flight.
+
+    Stops as soon as limit URLs are collected, the byte budget is spent, or
+    there are no sitemaps left within SITEMAP_MAX_DEPTH. Returns the URLs, the
+    <lastmod> of those that have one, and whether every sitemap was read to
+    its end without reaching limit, i.e. whether the URLs are all the site lists.
+    """
+    crawl = _SitemapCrawl(base_url, limit, SITEMAP_MAX_BYTES)
+    queue: asyncio.Queue = asyncio.Queue()
+    for sm in sitemap_urls:
+        queue.put_nowait((sm, 0))
+
+    async def worker():
+        while True:
+            sm, depth = await queue.get()
+            try:
+                if not crawl.done and sm not in crawl.visited:
+                    crawl.visited.add(sm)
+                    await _collect_from_sitemap(client, sm, depth, crawl, queue)
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, SITEMAP_CONCURRENCY))]
+    drained = asyncio.create_task(queue.join())
+    finished = asyncio.create_task(crawl.finished.wait())
+    try:
+        await asyncio.wait({drained, finished}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in workers + [drained, finished]:
+            task.cancel()
+        await asyncio.gather(*workers, drained, finished, return_exceptions=True)
+    urls = crawl.collected[:limit]
+    return urls, {u: crawl.lastmod[u] for u in urls if u in crawl.lastmod}, not crawl.done and not crawl.partial
 
 
 async def fetch_company_site_urls(company_name: str, num_urls: int = 10) -> List[str]:
     """Discover up to num_urls pages using robots.txt and sitemaps (XML, HTML, or text)."""
+    return (await discover_site_urls(company_name, num_urls))[0]
+
+
+async def discover_site_urls(company_name: str, num_urls: int = 10) -> Tuple[List[str], Dict[str, str], bool]:
+    """fetch_company_site_urls, plus the sitemap <lastmod> of each page that has one, and whether
+    the URLs are every page the sitemaps list (False for homepage links and capped or partial reads)."""
     base_url = _normalize_base_url(company_name)
     robots_url = f"{base_url}/robots.txt"
 
-    async with httpx.AsyncClient(follow_redirects=True) as client:
-        robots_text = await _fetch_text(client, robots_url)
-        sitemap_links: List[str] = []
-
-        if robots_text:
-            # Prefer explicit Sitemap: directives
-            for line in robots_text.splitlines():
-                if line.lower().startswith("sitemap:"):
-                    link = line.split(":", 1)[1].strip()
-                    if link:
-                        sitemap_links.append(link)
-            # Also fallback to regex for any links containing 'sitemap'
-            if not sitemap_links:
-                sitemap_links = re.findall(r"https?://[^\s'\"]*sitemap[^\s'\"]*", robots_text, flags=re.IGNORECASE)
+    client = get_http_client()
+    # fetched once per host and cached by the frontier, which also applies its Disallow rules
+    robots_text = (await crawl_frontier.host(robots_url)).robots_text
+    sitemap_links: List[str] = []
 
+    if robots_text:
+        # Prefer explicit Sitemap: directives
+        for line in robots_text.splitlines():
+            if line.lower().startswith("sitemap:"):
+                link = line.split(":", 1)[1].strip()
+                if link:
+                    sitemap_links.append(link)
+        # Also fallback to regex for any links containing 'sitemap'
         if not sitemap_links:
-            # No sitemap found; fallback to base_url homepage and HTML crawl for links
-            homepage_html = await _fetch_text(client, base_url)
-            urls = _extract_urls_from_html(homepage_html, base_url)
-            # Deduplicate while preserving order
-            seen = set()
-            deduped = []
-            for u in urls:
-                if u not in seen:
-                    seen.add(u)
-                    deduped.append(u)
-                if len(deduped) >= num_urls:
-                    break
-            return deduped or [base_url]
-
-        collected: List[str] = []
-        for sm in sitemap_links:
-            if len(collected) >= num_urls:
-                break
-            await _collect_from_sitemap(client, sm, base_url, num_urls, collected)
+            sitemap_links = re.findall(r"https?://[^\s'\"]*sitemap[^\s'\"]*", robots_text, flags=re.IGNORECASE)
 
-        # Deduplicate and cap
+    if not sitemap_links:
+        # No sitemap found; fallback to base_url homepage and HTML crawl for links
+        homepage_html = await _fetch_text(client, base_url) if crawl_frontier.can_fetch(base_url) else ""
+        urls = [u for u in _extract_urls_from_html(homepage_html, base_url) if crawl_frontier.can_fetch(u)]
+        # Deduplicate while preserving order
         seen = set()
-        result: List[str] = []
-        for u in collected:
+        deduped = []
+        for u in urls:
             if u not in seen:
                 seen.add(u)
-                result.append(u)
-            if len(result) >= num_urls:
+                deduped.append(u)
+            if len(deduped) >= num_urls:
                 break
-        return result or [base_url]
+        return deduped or [base_url], {}, False
+
+    result, lastmod, complete = await _collect_from_sitemaps(client, sitemap_links, base_url, num_urls)
+    return result or [base_url], lastmod, complete and bool(result)
 
 async def fetch_page_content(url: str) -> str:
-    """Fetch full HTML using Playwright for individual articles."""
+    """Fetch rendered HTML with a pooled Playwright page under the site's fetch profile."""
+    fetch_profiles = clients.get("fetch_profiles")
+    profile = fetch_profiles.for_url(url)
+    with telemetry.span("browser.fetch", url=url, profile=profile.name) as span:
+        try:
+            # the browser's request counts against the host's pace like the static one before it
+            await crawl_frontier.wait(url)
+            async with browser_pool.page() as page:
+                fetched = await fetch_profiles.fetch(page, url, PAGE_TIMEOUT, profile)
+            span.set(bytes=fetched.bytes, html_bytes=len(fetched.html), requests=fetched.requests,
+                     blocked=fetched.blocked, time_to_content=round(fetched.time_to_content, 3))
+            return fetched.html
+        except Exception as e:
+            print(f"Failed to fetch {url}: {e}")
+            span.fail(e)
+            return ""
+
+tiered_fetcher = TieredFetcher(
+    browser_fetch=fetch_page_content,
+    min_text_chars=STATIC_MIN_TEXT_CHARS,
+    validators=lambda: clients.get("validator_store"),
+    max_bytes=RESPONSE_MAX_BYTES,
+)
+
+
+async def _polite_fetch(client: httpx.AsyncClient, url: str) -> PageResult:
+    """Tiered fetch that honours robots.txt and records a 429/503 as backoff for the host (see _backoff_retry)."""
+    with telemetry.span("page.fetch", url=url) as span:
+        if not await crawl_frontier.allowed(url):
+            span.set(reason="disallowed by robots.txt")
+            return PageResult(url=url, reason="disallowed by robots.txt")
+        result = await tiered_fetcher.fetch(client, url)
+        span.set(tier=result.tier, status=result.status, bytes=len(result.html), reason=result.reason)
+        crawl_frontier.observe(url, result.status, result.headers)
+        return result
+
+
+def _backoff_retry(result: PageResult) -> float:
+    """A page answered 429/503 is fetched again once its host's backoff has passed (retry of iter_pages)."""
+    return crawl_frontier.backoff(result.url) if result.status in BACKOFF_STATUSES else 0.0
+
+
+class _CrawledPages:
+    """Pages of one crawl reduced to their text blocks as they arrived; their HTML is not kept.
+
+    pages are the fetch results with html emptied, blocks the matching
+    (url, blocks) pairs and chars_in the HTML characters that were parsed.
+    Pages are added as they finish; sort() puts them back in sitemap order.
+    id names this crawl in the checkpoints of the steps that follow it.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:16]
+        self.pages: List[PageResult] = []
+        self.blocks: List[Tuple[str, List[str]]] = []
+        self.chars_in = 0
+        self.archive_error: Optional[Exception] = None
+        self._order: List[int] = []
+
+    def add(self, page: PageResult, blocks: List[str], index: int) -> None:
+        self.chars_in += len(page.html)
+        page.html = ""
+        self.pages.append(page)
+        self.blocks.append((page.url, blocks))
+        self._order.append(index)
+
+    def sort(self) -> None:
+        """Pages in the order of their index, which boilerplate and duplicate removal depend on."""
+        ranked = sorted(zip(self._order, self.pages, self.blocks), key=lambda item: item[0])
+        self._order = [i for i, _, _ in ranked]
+        self.pages = [p for _, p, _ in ranked]
+        self.blocks = [b for _, _, b in ranked]
+
+    def to_checkpoint(self) -> dict:
+        return {"id": self.id, "pages": [asdict(p) for p in self.pages], "blocks": self.blocks,
+                "chars_in": self.chars_in}
+
+    @classmethod
+    def from_checkpoint(cls, data: dict) -> "_CrawledPages":
+        crawled = cls()
+        crawled.id = data["id"]
+        known = PageResult.__dataclass_fields__
+        crawled.pages = [PageResult(**{k: v for k, v in p.items() if k in known}) for p in data["pages"]]
+        crawled.blocks = [(url, blocks) for url, blocks in data["blocks"]]
+        crawled.chars_in = data["chars_in"]
+        crawled._order = list(range(len(crawled.pages)))
+        return crawled
+
+    def merged(self, other: "_CrawledPages", order: List[str]) -> "_CrawledPages":
+        """Both crawls in one, pages sorted into the order of the urls in order."""
+        merged = _CrawledPages()
+        rank = {url: i for i, url in enumerate(order)}
+        pairs = sorted(zip(self.pages + other.pages, self.blocks + other.blocks),
+                       key=lambda pair: rank.get(pair[0].url, len(rank)))
+        merged.pages = [p for p, _ in pairs]
+        merged.blocks = [b for _, b in pairs]
+        merged._order = list(range(len(pairs)))
+        merged.chars_in = self.chars_in + other.chars_in
+        merged.archive_error = self.archive_error or other.archive_error
+        return merged
+
+
+async def _extract_stage(
+    pages: AsyncIterator[Tuple[int, PageResult]], archive: Optional[ArchiveWriter] = None
+) -> _CrawledPages:
+    """Take (index, page) pairs as pages finish: archive each one, extract its text blocks, then let its HTML go.
+
+    Only what is needed across pages (boilerplate, duplicates) waits for the
+    whole crawl, and that works on text blocks capped at PAGE_BLOCK_CHARS a page.
+    Pages are sorted back into index order once the last one is in.
+    """
+    crawled = _CrawledPages()
+    async for index, page in pages:
+        if archive is not None and crawled.archive_error is None:
+            try:
+                await asyncio.to_thread(archive.add, page)
+            except Exception as e:
+                crawled.archive_error = e
+        blocks = await asyncio.to_thread(extract_blocks, page.html, PAGE_BLOCK_CHARS) if page.html else []
+        crawled.add(page, blocks, index)
+    crawled.sort()
+    return crawled
+
+
+def _extract_texts(crawled: _CrawledPages, boilerplate=None):
+    blocks, extraction = strip_boilerplate(crawled.blocks, BOILERPLATE_MIN_SHARE, boilerplate)
+    extraction.chars_in = crawled.chars_in
+    # taken before near-duplicate removal, which depends on the other pages crawled with this one
+    digests = {url: text_digest(text) for url, text in join_blocks(blocks, PAGE_TEXT_CHARS) if text}
+    dedup = DedupStats()
+    if DEDUP_THRESHOLD > 0:
+        blocks, dedup = dedupe_pages(blocks, threshold=DEDUP_THRESHOLD, max_chars=PAGE_TEXT_CHARS)
+    return join_blocks(blocks, PAGE_TEXT_CHARS), extraction, dedup, digests
+
+
+def _extracted_to_checkpoint(page_texts, extraction: ExtractionStats, dedup: DedupStats, digests) -> dict:
+    return {
+        "page_texts": page_texts,
+        "extraction": {**asdict(extraction), "boilerplate": sorted(extraction.boilerplate)},
+        "dedup": asdict(dedup),
+        "digests": digests,
+    }
+
+
+def _extracted_from_checkpoint(data: dict):
+    extraction = ExtractionStats(**{**data["extraction"], "boilerplate": set(data["extraction"]["boilerplate"])})
+    page_texts = [(url, text) for url, text in data["page_texts"]]
+    return page_texts, extraction, DedupStats(**data["dedup"]), data["digests"]
+
+
+def _job_checkpoint(kind: str, company_name: str, job_id: Optional[str]) -> Checkpoint:
+    """Checkpoints of a job's scrape or reprocess run, keyed by job so runs never share them; off outside jobs."""
+    store = clients.get("checkpoint_store") if job_id else None
+    return Checkpoint(store, f"{kind}/{_result_host(company_name)}/{job_id}")
+
+
+def _emit(on_event: Optional[EventCallback], stage: str, **data) -> None:
+    if on_event is not None:
+        on_event(stage, data)
+
+
+def _load_previous_result(company_name: str) -> Optional[dict]:
+    """The stored summary JSON of a company, or None when there is none (or it cannot be read)."""
+    from botocore.exceptions import ClientError
+
+    key = _result_key(company_name)
+    with telemetry.span("s3.get", key=key) as span:
+        try:
+            body = clients.get("s3").get_object(Bucket=S3_BUCKET, Key=key)["Body"].read()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                print(f"Failed to load previous result {key}: {e}")
+                span.fail(e)
+            span.set(found=False)
+            return None
+        span.set(found=True, bytes=len(body))
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            await page.goto(url, timeout=30000)
-            content = await page.content()
-            await browser.close()
-            return content
-    except Exception as e:
-        print(f"Failed to fetch {url}: {e}")
-        return ""
+        return json.loads(body)
+    except ValueError as e:
+        print(f"Ignoring unreadable previous result {key}: {e}")
+        return None
+
+
+def _full_refresh_reason(previous: Optional[dict], strategy: str) -> Optional[str]:
+    """Why previous cannot be updated incrementally into a strategy summary, or None when it can."""
+    if previous is None:
+        return "no stored result"
+    if not previous.get("summary"):
+        return "stored result has no summary"
+    if previous.get("summary_strategy") != strategy:
+        return "summary strategy changed"
+    if "boilerplate" not in previous:
+        return "stored result has no page digests"
+    if previous.get("prompt_version") != SUMMARY_PROMPT_VERSION or previous.get("model_id") != SUMMARY_MODEL_ID:
+        return "prompt version or model changed"
+    if (previous.get("incremental") or {}).get("updates", 0) >= INCREMENTAL_MAX_UPDATES:
+        return f"{INCREMENTAL_MAX_UPDATES} incremental updates since the last full summary"
+    return None
+
+
+class _RefreshPlan:
+    """What an incremental refresh fetches, and what changed compared to the stored result.
+
+    Pages whose sitemap <lastmod> matches the stored one are skipped. The
+    rest are fetched, and diff() compares the digest of their extracted text
+    against the stored digest. Pages now answering 404/410 count as removed.
+    So do stored pages missing from the sitemaps, but only when discovery
+    read every sitemap through (listed_all); otherwise they may just have
+    fallen outside the pages discovered this time, and are kept as they were.
+    """
+
+    def __init__(self, previous: dict, site_urls: List[str], lastmod: Dict[str, str], listed_all: bool = False):
+        self.previous = previous
+        self.stored = {p["url"]: p for p in previous.get("pages", []) if p.get("url")}
+        self.skipped = [u for u in site_urls if self._unmodified(u, lastmod.get(u))]
+        skipped = set(self.skipped)
+        self.to_fetch = [u for u in site_urls if u not in skipped]
+        missing = [u for u in self.stored if u not in set(site_urls)]
+        self.removed = missing if listed_all else []
+        self.kept = [] if listed_all else missing  # not rediscovered; their stored text still stands
+        self.total = len(site_urls) + len(missing)
+        self.new: List[str] = []
+        self.changed: List[str] = []
+        self.unavailable: List[str] = []  # fetched without text; the stored text still stands
+        self.pages: Dict[str, PageResult] = {}
+        self.page_texts: List[Tuple[str, str]] = []
+        self.digests: Dict[str, str] = {}
+        self.extraction = None
+        self.dedup = None
+
+    def _unmodified(self, url: str, lastmod: Optional[str]) -> bool:
+        stored = self.stored.get(url)
+        return bool(lastmod and stored and stored.get("digest") and stored.get("lastmod") == lastmod)
+
+    def diff(self, crawled: _CrawledPages) -> None:
+        """Strip the stored site boilerplate from the fetched pages and sort them into new/changed/unchanged."""
+        self.pages = {p.url: p for p in crawled.pages}
+        self.page_texts, self.extraction, self.dedup, self.digests = _extract_texts(
+            crawled, boilerplate=set(self.previous.get("boilerplate", []))
+        )
+        for p in crawled.pages:
+            stored = self.stored.get(p.url)
+            digest = self.digests.get(p.url)
+            if digest is None:
+                if stored is not None and p.status in (404, 410):
+                    self.removed.append(p.url)
+                else:
+                    self.unavailable.append(p.url)
+            elif stored is None or not stored.get("digest"):
+                self.new.append(p.url)
+            elif stored["digest"] != digest:
+                self.changed.append(p.url)
+
+    @property
+    def changed_share(self) -> float:
+        return (len(self.new) + len(self.changed) + len(self.removed)) / max(1, self.total)
+
+    def change(self, url: str) -> str:
+        if url in self.skipped or url in self.kept:
+            return "skipped"
+        for label, urls in (("new", self.new), ("changed", self.changed),
+                            ("removed", self.removed), ("unavailable", self.unavailable)):
+            if url in urls:
+                return label
+        return "unchanged"
+
+
+async def _crawl_site_pages(
+    client: httpx.AsyncClient,
+    urls: List[str],
+    on_event: Optional[EventCallback],
+    archive: Optional[ArchiveWriter] = None,
+) -> _CrawledPages:
+    """Fetch stage feeding the extract stage through a queue of PIPELINE_BUFFER_PAGES pages.
+
+    FETCH_CONCURRENCY pages are fetched at a time and handed on as they finish,
+    so a slow page never holds up the others, and the HTML held for a crawl
+    stays within a few dozen pages of RESPONSE_MAX_BYTES each, however large
+    the site.
+    """
+    pages = iter_pages(
+        urls,
+        lambda u: _polite_fetch(client, u),
+        fetch_limiter,
+        PAGE_TIMEOUT,
+        pace=crawl_frontier.wait,
+        retry=_backoff_retry,
+        max_retries=HOST_MAX_RETRIES,
+        on_page=lambda p: _emit(
+            on_event, "page", url=p.url, tier=p.tier, status=p.status,
+            bytes=len(p.html), latency=round(p.elapsed, 3), reason=p.reason,
+        ),
+        window=FETCH_CONCURRENCY,
+    )
+    return await _extract_stage(buffered(pages, PIPELINE_BUFFER_PAGES), archive)
+
+
+async def scrape_and_summarize(
+    company_name: str,
+    num_pages: int = 5,
+    strategy: Optional[str] = None,
+    on_event: Optional[EventCallback] = None,
+    incremental: bool = False,
+    job_id: Optional[str] = None,
+):
+    """Crawl a company's site and upload its summary JSON; returns the presigned URL.
+
+    With incremental, a stored summary is updated with the pages that are new
+    or changed since it was made, instead of summarizing every page again.
+    A crawl run for a job (job_id) is checkpointed under that job, so the
+    job's retry resumes where a failed attempt stopped; other crawls are not
+    checkpointed.
+    """
+    if strategy and strategy not in SUMMARY_STRATEGIES:
+        raise ValueError(f"Unknown summary strategy {strategy!r}; expected one of {SUMMARY_STRATEGIES}")
+
+    # Bedrock capacity is shared round-robin between companies being scraped at the same time
+    llm_tenant.set(_result_key(company_name))
+
+    # Each step waits for a slot of its stage in crawl_scheduler
+    with telemetry.span("scrape", company=company_name, strategy=strategy or SUMMARY_STRATEGY, incremental=incremental):
+        async with crawl_scheduler.stage("crawl"):
+            return await _scrape_and_summarize(company_name, num_pages, strategy, on_event, incremental, job_id)
+
+
+async def _scrape_and_summarize(
+    company_name: str,
+    num_pages: int,
+    strategy: Optional[str],
+    on_event: Optional[EventCallback],
+    incremental: bool = False,
+    job_id: Optional[str] = None,
+) -> str:
+    # Discovery, the fetched pages and every partial summary are checkpointed as they complete,
+    # so a retry after a failure (a throttled Bedrock call, an evicted worker) resumes from there
+    checkpoint = _job_checkpoint("scrape", company_name, job_id)
+    previous = None
+    if incremental:
+        previous = await asyncio.to_thread(_load_previous_result, company_name)
+        reason = _full_refresh_reason(previous, strategy or SUMMARY_STRATEGY)
+        if reason is not None:
+            _emit(on_event, "incremental", status="full", reason=reason)
+            previous = None
 
-async def scrape_and_summarize(company_name: str, num_pages: int = 5):
     # Step 1: Get URLs from the company's sitemap (robots.txt)
-    site_urls = await fetch_company_site_urls(company_name, num_pages)  # returns list of URLs
-    print("site_urls", site_urls)
+    discovered = await checkpoint.load("discover")
+    if discovered is not None and discovered.get("num_pages") == num_pages:
+        site_urls, lastmod = discovered["site_urls"], discovered["lastmod"]
+        listed_all = discovered.get("listed_all", False)
+        _emit(on_event, "checkpoint", status="resumed", step="discover")
+    else:
+        async with crawl_scheduler.stage("discover"):
+            _emit(on_event, "discover", status="running")
+            with telemetry.span("stage.discover") as span:
+                # URLs, their sitemap <lastmod>, and whether they are every page the sitemaps list
+                site_urls, lastmod, listed_all = await discover_site_urls(company_name, num_pages)
+                span.set(pages=len(site_urls))
+        if site_urls:
+            await checkpoint.save("discover", {
+                "num_pages": num_pages, "site_urls": site_urls, "lastmod": lastmod, "listed_all": listed_all,
+            })
+    _emit(on_event, "discover", status="done", urls=site_urls)
+    plan = _RefreshPlan(previous, site_urls, lastmod, listed_all) if previous is not None else None
 
-    # Step 2: Scrape content from each URL
-    website_texts = ""
-    for url in site_urls:
-        page_html = await fetch_page_content(url)  # fetch HTML for each URL
-        page_soup = BeautifulSoup(page_html, "html.parser")
-        main_text = page_soup.get_text(separator="\n", strip=True)
-        website_texts += main_text[:2000] + "\n\n"  # limit each page's text to 2000 chars
+    # Step 2: Fetch, extract and archive the pages, unless an earlier attempt got that far with the
+    # same URLs and the same stored result to refresh
+    base = previous.get("generated_at") if previous is not None else None
+    fetched = await checkpoint.load("pages")
+    if fetched is not None and fetched.get("base") == base and fetched.get("site_urls") == site_urls:
+        crawled = _CrawledPages.from_checkpoint(fetched)
+        archive_key = fetched["archive_key"]
+        if not fetched["incremental"]:
+            plan = None
+        elif plan is not None:
+            await asyncio.to_thread(plan.diff, crawled)
+        _emit(on_event, "checkpoint", status="resumed", step="fetch", pages=len(crawled.pages))
+    else:
+        crawled, plan, archive_key = await _fetch_and_archive(company_name, site_urls, lastmod, plan, on_event)
+        await checkpoint.save("pages", {
+            **crawled.to_checkpoint(), "base": base, "site_urls": site_urls,
+            "incremental": plan is not None, "archive_key": archive_key,
+        })
+
+    async with crawl_scheduler.stage("summarize"):
+        if plan is not None:
+            s3_url = await _update_summary(company_name, site_urls, lastmod, plan, on_event, archive_key, checkpoint)
+        else:
+            s3_url = await _summarize_pages(
+                company_name, site_urls, crawled, strategy, on_event, archive_key, lastmod, checkpoint
+            )
+    await checkpoint.clear()
+    return s3_url
+
+
+async def _fetch_and_archive(
+    company_name: str,
+    site_urls: List[str],
+    lastmod: Dict[str, str],
+    plan: Optional[_RefreshPlan],
+    on_event: Optional[EventCallback],
+):
+    """(pages reduced to text, refresh plan or None when the whole site is to be summarized, archive key)."""
+    # Keep the raw pages so extraction and prompts can be re-run later without recrawling; each page
+    # is written to the archive as it is fetched. An incremental crawl only holds the pages it fetched
+    # and points at the archive it builds on.
+    archive = None
+    archive_key = plan.previous.get("crawl_archive") if plan is not None else None
+    if CRAWL_ARCHIVE_ENABLED and site_urls:
+        crawled_at = datetime.now(timezone.utc)
+        meta = {"company_name": company_name, "site_urls": site_urls, "crawled_at": crawled_at.isoformat(),
+                "lastmod": lastmod}
+        if plan is not None:
+            meta["base_archive"] = plan.previous.get("crawl_archive")
+        archive = ArchiveWriter(meta)
+
+    try:
+        # Scrape content from each URL (concurrently, in sitemap order) and reduce every page to
+        # its main-content text as it arrives. Plain HTTP first; Chromium only for pages that look
+        # client-rendered. An incremental refresh skips pages whose sitemap <lastmod> is unchanged.
+        client = get_http_client()
+        to_fetch = plan.to_fetch if plan is not None else site_urls
+        async with crawl_scheduler.stage("fetch"):
+            _emit(on_event, "fetch", status="running", pages=len(to_fetch))
+            with telemetry.span("stage.fetch") as span:
+                crawled = await _crawl_site_pages(client, to_fetch, on_event, archive)
+                if plan is not None:
+                    await asyncio.to_thread(plan.diff, crawled)
+                    _emit(on_event, "incremental", status="diff", skipped=len(plan.skipped), new=len(plan.new),
+                          changed=len(plan.changed), removed=len(plan.removed), unavailable=len(plan.unavailable))
+                    if plan.changed_share > INCREMENTAL_MAX_CHANGED_SHARE:
+                        # too much moved to patch the summary; summarize the whole site again
+                        _emit(on_event, "incremental", status="full",
+                              reason=f"{plan.changed_share:.0%} of pages new, changed or removed")
+                        rest = await _crawl_site_pages(client, plan.skipped, on_event, archive)
+                        crawled = crawled.merged(rest, site_urls)
+                        plan = None
+                pages = crawled.pages
+                span.set(pages=sum(1 for p in pages if p.tier), bytes=crawled.chars_in)
+        _emit(on_event, "fetch", status="done", pages=len(pages), fetched=sum(1 for p in pages if p.tier))
 
-    # Step 3: Summarize all collected website text
-    final_summary = chain_summarize(website_texts)
-    print("final_summaryjfdjwfbjekrbfj0000", final_summary)
+        if archive is not None:
+            with telemetry.span("stage.archive") as span:
+                try:
+                    if crawled.archive_error is not None:
+                        raise crawled.archive_error
+                    if archive.pages:
+                        key = _archive_key(company_name, crawled_at)
+                        body, size = await asyncio.to_thread(archive.finish)
+                        await asyncio.to_thread(_upload_archive, key, body, size)
+                        archive_key = key
+                        _emit(on_event, "archive", key=key, bytes=size)
+                except Exception as e:
+                    print(f"Failed to archive crawl of {company_name}: {e}")
+                    span.fail(e)
+                    archive_key = None
+    finally:
+        if archive is not None:
+            archive.close()
+
+    return crawled, plan, archive_key
+
+
+def _page_record(p: PageResult, digest: Optional[str], lastmod: Optional[str], duplicate_of: Optional[str]) -> dict:
+    return {"url": p.url, "tier": p.tier, "status": p.status, "reason": p.reason,
+            "duplicate_of": duplicate_of, "digest": digest, "lastmod": lastmod}
+
+
+async def _summarize_pages(
+    company_name: str,
+    site_urls: List[str],
+    crawled: _CrawledPages,
+    strategy: Optional[str],
+    on_event: Optional[EventCallback],
+    archive_key: Optional[str],
+    lastmod: Optional[Dict[str, str]] = None,
+    checkpoint: Optional[Checkpoint] = None,
+) -> str:
+    """Steps after fetching: strip boilerplate, dedup, chunk, summarize and upload the summary JSON."""
+    # Main content only, minus blocks repeated across the site's pages (menus, footers, banners)
+    # and near-duplicate pages/paragraphs; each page's text is then limited to PAGE_TEXT_CHARS
+    pages = crawled.pages
+    step = f"extract-{crawled.id}"
+    extracted = await checkpoint.load(step) if checkpoint is not None else None
+    _emit(on_event, "extract", status="running")
+    with telemetry.span("stage.extract", pages=len(pages), resumed=extracted is not None) as span:
+        if extracted is not None:
+            page_texts, extraction, dedup, digests = _extracted_from_checkpoint(extracted)
+        else:
+            page_texts, extraction, dedup, digests = await asyncio.to_thread(_extract_texts, crawled)
+        span.set(blocks=extraction.blocks, chars=extraction.chars_out, pages_dropped=dedup.pages_dropped)
+    if extracted is not None:
+        _emit(on_event, "checkpoint", status="resumed", step="extract")
+    elif checkpoint is not None:
+        await checkpoint.save(step, _extracted_to_checkpoint(page_texts, extraction, dedup, digests))
+    _emit(on_event, "extract", status="done", blocks=extraction.blocks,
+          boilerplate_blocks=extraction.boilerplate_blocks, chars=extraction.chars_out)
+    _emit(on_event, "dedup", pages_dropped=dedup.pages_dropped,
+          paragraphs_dropped=dedup.paragraphs_dropped, tokens_saved=dedup.tokens_saved)
+    if not any(text for _, text in page_texts):
+        # e.g. every page failed or was skipped; storing an empty summary would serve it as fresh
+        raise RuntimeError(f"No page text extracted for {company_name} from {len(pages)} pages; nothing stored")
+
+    # Step 3: Summarize all collected website text, packed into as few model-sized chunks as possible
+    chunks = chunk_pages(
+        page_texts,
+        max_tokens=chunk_token_budget(SUMMARY_MODEL_ID, CHUNK_MAX_TOKENS),
+        overlap_tokens=CHUNK_OVERLAP_TOKENS,
+    )
+    _emit(on_event, "summarize", status="running", chunks=len(chunks))
+    with telemetry.span("stage.summarize", chunks=len(chunks), strategy=strategy or SUMMARY_STRATEGY):
+        final_summary = await summarize_chunks(
+            [c.text for c in chunks], strategy, on_event=on_event, checkpoint=checkpoint
+        )
+    _emit(on_event, "summarize", status="done", chunks=len(chunks))
 
     # Step 4: Save to S3 and return URL
+    lastmod = lastmod or {}
     data_to_save = {
         "company_name": company_name,
         "summary": final_summary,
-        "site_urls": site_urls  # include URLs for reference
+        "summary_strategy": strategy or SUMMARY_STRATEGY,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "site_urls": site_urls,  # include URLs for reference
+        "pages": [
+            _page_record(p, digests.get(p.url), lastmod.get(p.url), dedup.duplicates.get(p.url))
+            for p in pages
+        ],
+        "chunks": [{"sources": c.sources, "tokens": c.tokens} for c in chunks],
+        "extraction": {"blocks": extraction.blocks, "boilerplate_blocks": extraction.boilerplate_blocks},
+        "dedup": {
+            "pages_dropped": dedup.pages_dropped,
+            "paragraphs_dropped": dedup.paragraphs_dropped,
+            "tokens_saved": dedup.tokens_saved,
+        },
+        "crawl_archive": archive_key,
+        # what an incremental refresh needs to tell changed pages from unchanged ones
+        "prompt_version": SUMMARY_PROMPT_VERSION,
+        "model_id": SUMMARY_MODEL_ID,
+        "boilerplate": sorted(extraction.boilerplate),
+        "incremental": None,
     }
-    s3_url = upload_json_to_s3(data_to_save)
+    _emit(on_event, "upload", status="running")
+    with telemetry.span("stage.upload"):
+        s3_url = await asyncio.to_thread(
+            upload_json_to_s3, data_to_save, key=_result_key(company_name), metadata=_result_metadata(data_to_save)
+        )
+    _emit(on_event, "upload", status="done")
     return s3_url
 
 
+def _update_prompt(summary: str, chunk: str, removed: List[str]):
+    system_prompt = (
+        "You are a careful summarization assistant. You keep the summary of a company's website "
+        "up to date as its pages change, rewriting only what the changes affect."
+    )
+    parts = [f"Current summary of the website:\n{summary}"]
+    if removed:
+        parts.append("These pages have been removed from the website:\n" + "\n".join(removed))
+    if chunk:
+        parts.append(f"Current text of new or updated pages:\n{chunk}")
+    parts.append(
+        "Task: Produce the UPDATED summary. (1) Keep every point the changes do not affect,"
+        " (2) replace information the updated pages contradict or supersede, (3) add new key points,"
+        " (4) drop points that only the removed pages supported, and (5) remove duplicates."
+        " Output only the summary."
+    )
+    messages = [{"role": "user", "content": [{"text": "\n\n".join(parts)}]}]
+    return system_prompt, messages
+
+
+async def _update_summary(
+    company_name: str,
+    site_urls: List[str],
+    lastmod: Dict[str, str],
+    plan: _RefreshPlan,
+    on_event: Optional[EventCallback],
+    archive_key: Optional[str],
+    checkpoint: Optional[Checkpoint] = None,
+) -> str:
+    """Incremental counterpart of _summarize_pages: the stored summary is updated with changed pages only."""
+    previous = plan.previous
+    fresh = set(plan.new) | set(plan.changed)
+    texts = [(url, text) for url, text in plan.page_texts if url in fresh and text]
+    chunks = chunk_pages(
+        texts,
+        max_tokens=chunk_token_budget(SUMMARY_MODEL_ID, CHUNK_MAX_TOKENS),
+        overlap_tokens=CHUNK_OVERLAP_TOKENS,
+    )
+    summary = previous["summary"]
+    if chunks or plan.removed:
+        _emit(on_event, "summarize", status="running", chunks=len(chunks))
+        step = _progress_step("update", summary, [c.text for c in chunks], plan.removed)
+        done = (await checkpoint.load(step) or {}) if checkpoint is not None else {}
+        if done:
+            _emit(on_event, "checkpoint", status="resumed", step="summarize", partials=len(done))
+            summary, start = _resume_point(done)
+        else:
+            start = 0
+        with telemetry.span("stage.summarize", chunks=len(chunks), strategy="update"):
+            # the removed pages are named once, alongside the first chunk of new text
+            for i, chunk in enumerate(chunks or [None]):
+                if i < start:
+                    continue
+                summary = await _summarize(
+                    *_update_prompt(summary, chunk.text if chunk else "", plan.removed if i == 0 else []),
+                    span_name="llm.update_summary",
+                )
+                _emit(on_event, "partial_summary", level=0, index=i, summary=summary)
+                if checkpoint is not None:
+                    await checkpoint.save(step, {f"0:{i}": summary})
+        _emit(on_event, "summarize", status="done", chunks=len(chunks))
+    else:
+        _emit(on_event, "summarize", status="skipped", reason="no page changed")
+
+    records = []
+    for url in site_urls:
+        change = plan.change(url)
+        stored = plan.stored.get(url, {"url": url})
+        if url in plan.pages:
+            p = plan.pages[url]
+            record = _page_record(p, plan.digests.get(url), lastmod.get(url), plan.dedup.duplicates.get(url))
+            if change == "unavailable" and stored.get("digest"):
+                record["digest"] = stored["digest"]  # its text is still part of the summary
+        else:
+            record = {**stored, "lastmod": lastmod.get(url)}
+        records.append({**record, "change": change})
+    for url in plan.kept:
+        records.append({**plan.stored[url], "change": "skipped"})
+
+    data_to_save = {
+        **previous,
+        "summary": summary,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "site_urls": site_urls,
+        "pages": records,
+        "chunks": [{"sources": c.sources, "tokens": c.tokens} for c in chunks],
+        "extraction": {"blocks": plan.extraction.blocks, "boilerplate_blocks": plan.extraction.boilerplate_blocks},
+        "dedup": {
+            "pages_dropped": plan.dedup.pages_dropped,
+            "paragraphs_dropped": plan.dedup.paragraphs_dropped,
+            "tokens_saved": plan.dedup.tokens_saved,
+        },
+        "crawl_archive": archive_key,
+        "incremental": {
+            "base_generated_at": previous.get("generated_at"),
+            "updates": (previous.get("incremental") or {}).get("updates", 0) + 1,
+            "fetched": len(plan.to_fetch),
+            "skipped": len(plan.skipped),
+            "new": plan.new,
+            "changed": plan.changed,
+            "removed": plan.removed,
+        },
+    }
+    _emit(on_event, "upload", status="running")
+    with telemetry.span("stage.upload"):
+        s3_url = await asyncio.to_thread(
+            upload_json_to_s3, data_to_save, key=_result_key(company_name), metadata=_result_metadata(data_to_save)
+        )
+    _emit(on_event, "upload", status="done")
+    return s3_url
+
+
+def _load_archive_chain(key: str):
+    """(meta, pages) of a crawl archive, completed from the archives an incremental crawl was based on."""
+    meta, pages = _load_archive(key)
+    site_urls = meta.get("site_urls", [])
+    by_url = {p.url: p for p in pages}
+    base = meta.get("base_archive")
+    seen = {key}
+    while base and base not in seen and any(u not in by_url for u in site_urls):
+        seen.add(base)
+        base_meta, base_pages = _load_archive(base)
+        for p in base_pages:
+            by_url.setdefault(p.url, p)
+        base = base_meta.get("base_archive")
+    if seen != {key}:
+        pages = [by_url[u] for u in site_urls if u in by_url]
+    else:
+        # pages are archived as they finish fetching, not in sitemap order
+        rank = {u: i for i, u in enumerate(site_urls)}
+        pages.sort(key=lambda p: rank.get(p.url, len(rank)))
+    return meta, pages
+
+
+async def reprocess_company(
+    company_name: str,
+    archive_key: Optional[str] = None,
+    strategy: Optional[str] = None,
+    on_event: Optional[EventCallback] = None,
+    job_id: Optional[str] = None,
+) -> str:
+    """Re-run extraction and summarization from a stored crawl (the latest one by default); no crawling.
+
+    With job_id, summaries are checkpointed for the job's retry, as in scrape_and_summarize.
+    """
+    if strategy and strategy not in SUMMARY_STRATEGIES:
+        raise ValueError(f"Unknown summary strategy {strategy!r}; expected one of {SUMMARY_STRATEGIES}")
+    # the summary is stored under company_name, so it must be rebuilt from that company's own crawl
+    _check_archive_key(company_name, archive_key)
+    llm_tenant.set(_result_key(company_name))
+    checkpoint = _job_checkpoint("reprocess", company_name, job_id)
+    with telemetry.span("reprocess", company=company_name, strategy=strategy or SUMMARY_STRATEGY):
+        key = archive_key or await asyncio.to_thread(_latest_archive_key, company_name)
+        if key is None:
+            raise LookupError(f"No crawl archive stored for {company_name}")
+        meta, pages = await asyncio.to_thread(_load_archive_chain, key)
+        _emit(on_event, "archive", key=key, pages=len(pages), crawled_at=meta.get("crawled_at"))
+
+        async def _archived():
+            # handed over one at a time, so each page's HTML is freed once it has been extracted
+            index = 0
+            while pages:
+                yield index, pages.pop(0)
+                index += 1
+
+        async with crawl_scheduler.stage("summarize"):
+            crawled = await _extract_stage(_archived())
+            crawled.id = cache_key(key)[:16]  # the same archive always extracts to the same text
+            s3_url = await _summarize_pages(
+                company_name, meta.get("site_urls", []), crawled, strategy, on_event, key, meta.get("lastmod"),
+                checkpoint,
+            )
+        await checkpoint.clear()
+        return s3_url
+
+
+# Concurrent requests for the same company share one crawl
+scrape_flights = SingleFlight()
+
+
+async def get_company_summary_url(
+    company_name: str,
+    strategy: Optional[str] = None,
+    force_refresh: bool = False,
+    on_event: Optional[EventCallback] = None,
+    full_refresh: bool = False,
+    job_id: Optional[str] = None,
+):
+    """Return (presigned URL, cached) for a company, crawling only when the stored result is stale.
+
+    A stale result is refreshed incrementally (INCREMENTAL_REFRESH) unless
+    full_refresh asks for every page to be summarized again; full_refresh
+    also implies force_refresh. job_id checkpoints the crawl for that job's
+    retries (see scrape_and_summarize).
+    """
+    key = _result_key(company_name)
+    if not force_refresh and not full_refresh:
+        # a slot per check, so a large batch cannot fill the default executor with S3 lookups
+        async with crawl_scheduler.stage("lookup"):
+            url = await asyncio.to_thread(_fresh_result_url, key, strategy or SUMMARY_STRATEGY)
+        if url:
+            _emit(on_event, "cache", status="hit")
+            return url, True
+    if scrape_flights.in_flight(key):
+        # progress events go to whoever started the crawl
+        _emit(on_event, "cache", status="joined in-flight crawl")
+    url = await scrape_flights.do(
+        key,
+        lambda: scrape_and_summarize(
+            company_name, strategy=strategy, on_event=on_event, incremental=INCREMENTAL_REFRESH and not full_refresh,
+            job_id=job_id,
+        ),
+    )
+    return url, False
+
+
+async def reprocess_summary_url(
+    company_name: str,
+    archive_key: Optional[str] = None,
+    strategy: Optional[str] = None,
+    on_event: Optional[EventCallback] = None,
+    job_id: Optional[str] = None,
+) -> str:
+    """Presigned URL of a summary rebuilt from a crawl archive; shares the in-flight slot with crawls."""
+    return await scrape_flights.do(
+        _result_key(company_name),
+        lambda: reprocess_company(
+            company_name, archive_key=archive_key, strategy=strategy, on_event=on_event, job_id=job_id
+        ),
+    )
+
+
+def _build_job_backend():
+    # JOB_BACKEND and JOB_QUEUE_URL were checked by validate_config at startup
+    if JOB_BACKEND == "sqs":
+        return SQSJobBackend(
+            clients.get("sqs"), clients.get("s3"), JOB_QUEUE_URL, S3_BUCKET, max_queued=JOB_QUEUE_SIZE,
+            visibility_timeout=JOB_VISIBILITY_TIMEOUT, receivers=JOB_WORKERS,
+        )
+    return InMemoryJobBackend(max_queued=JOB_QUEUE_SIZE)
+
+
+async def _run_job(job: Job, on_event: EventCallback):
+    if job.reprocess:
+        url = await reprocess_summary_url(
+            job.company, job.archive_key, strategy=job.strategy, on_event=on_event, job_id=job.id
+        )
+        return url, False
+    return await get_company_summary_url(
+        job.company, strategy=job.strategy, force_refresh=job.force_refresh, on_event=on_event,
+        full_refresh=job.full_refresh, job_id=job.id,
+    )
+
+
+# The backend (and with SQS, its boto3 clients) is built when the pool is first used
+# Failed jobs are retried, and each retry resumes from the failed attempt's checkpoints
+job_pool = JobWorkerPool(
+    _build_job_backend,
+    run=_run_job,
+    workers=JOB_WORKERS,
+    max_attempts=JOB_MAX_ATTEMPTS,
+    retry_delay=JOB_RETRY_DELAY,
+)
+
+
+async def _run_batch_company(company: str, strategy: Optional[str], force_refresh: bool) -> dict:
+    _, cached = await get_company_summary_url(company, strategy=strategy, force_refresh=force_refresh)
+    return {"key": _result_key(company), "cached": cached}
+
+
+async def _write_batch_manifest(batch: Batch) -> str:
+    key = f"{BATCH_PREFIX}/{batch.id}.jsonl"
+    body = batch.manifest()
+    with telemetry.span("s3.put", key=key, bytes=len(body)):
+        await asyncio.to_thread(
+            clients.get("s3").put_object, Bucket=S3_BUCKET, Key=key, Body=body, ContentType="application/x-ndjson"
+        )
+    return key
+
+
+batch_runner = BatchRunner(run=_run_batch_company, write_manifest=_write_batch_manifest)
+
+
+
+def _warm_clients() -> None:
+    """Build the S3 client, Bedrock model and stores, and import strands, so the first scrape does not pay for them."""
+    try:
+        import strands.agent  # noqa: F401
+
+        clients.warm("s3", "bedrock_model", "summary_cache", "validator_store", "checkpoint_store")
+    except Exception as e:
+        print(f"Failed to warm clients, they will be built on first use: {e}")
+
 
 # FastAPI App
-app = FastAPI(title="Scraper-Summarizer API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    validate_config()
+    get_http_client()
+    await browser_pool.start()
+    await job_pool.start()
+    warming = asyncio.create_task(asyncio.to_thread(_warm_clients)) if WARM_CLIENTS else None
+    try:
+        yield
+    finally:
+        if warming is not None:
+            await asyncio.gather(warming, return_exceptions=True)
+        await job_pool.stop()
+        await batch_runner.stop()
+        await browser_pool.close()
+        llm_limiter.close()
+        if http_client is not None:
+            await http_client.aclose()
+        clients.close()  # AWS clients and the SQLite stores
+        telemetry.close()
+
+
+app = FastAPI(title="Scraper-Summarizer API", lifespan=lifespan)
 
 @app.get("/scrape")
-async def scrape_endpoint(company: str = Query(..., description="Company name to scrape")):
+async def scrape_endpoint(
+    company: str = Query(..., description="Company name to scrape"),
+    strategy: Optional[str] = Query(None, description="Summary strategy: refine or map_reduce"),
+    force_refresh: bool = Query(False, description="Ignore a fresh cached result and crawl again"),
+    full_refresh: bool = Query(False, description="Crawl again and summarize every page, not just changed ones"),
+):
+    if strategy and strategy not in SUMMARY_STRATEGIES:
+        return JSONResponse({"error": f"Unknown summary strategy {strategy!r}"}, status_code=400)
+    try:
+        s3_url, cached = await get_company_summary_url(
+            company, strategy=strategy, force_refresh=force_refresh, full_refresh=full_refresh
+        )
+        return {"s3_url": s3_url, "cached": cached}
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+@app.get("/scrape/stream")
+async def scrape_stream_endpoint(
+    company: str = Query(..., description="Company name to scrape"),
+    strategy: Optional[str] = Query(None, description="Summary strategy: refine or map_reduce"),
+    force_refresh: bool = Query(False, description="Ignore a fresh cached result and crawl again"),
+    full_refresh: bool = Query(False, description="Crawl again and summarize every page, not just changed ones"),
+):
+    """Server-sent events version of /scrape: progress as it happens, then a result or error event."""
+    if strategy and strategy not in SUMMARY_STRATEGIES:
+        return JSONResponse({"error": f"Unknown summary strategy {strategy!r}"}, status_code=400)
+    events: asyncio.Queue = asyncio.Queue()
+
+    def on_event(stage: str, data: dict) -> None:
+        events.put_nowait((stage, data))
+
+    async def run():
+        try:
+            s3_url, cached = await get_company_summary_url(
+                company, strategy=strategy, force_refresh=force_refresh, on_event=on_event, full_refresh=full_refresh
+            )
+            on_event("result", {"s3_url": s3_url, "cached": cached})
+        except Exception as e:
+            on_event("error", {"error": str(e)})
+        finally:
+            events.put_nowait(None)
+
+    task = asyncio.create_task(run())
+
+    async def stream():
+        try:
+            while True:
+                item = await events.get()
+                if item is None:
+                    break
+                stage, data = item
+                yield f"event: {stage}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            # client disconnected early; a crawl shared with other callers keeps running
+            task.cancel()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class ReprocessRequest(BaseModel):
+    company: str
+    archive_key: Optional[str] = None
+    strategy: Optional[str] = None
+
+
+@app.post("/reprocess")
+async def reprocess_endpoint(request: ReprocessRequest):
+    """Rebuild a company's summary from its stored crawl archive without fetching any pages."""
+    if request.strategy and request.strategy not in SUMMARY_STRATEGIES:
+        return JSONResponse({"error": f"Unknown summary strategy {request.strategy!r}"}, status_code=400)
     try:
-        s3_url = await scrape_and_summarize(company)
-        return {"s3_url": s3_url}
+        _check_archive_key(request.company, request.archive_key)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    try:
+        s3_url = await reprocess_summary_url(request.company, request.archive_key, strategy=request.strategy)
+        return {"s3_url": s3_url, "cached": False}
+    except LookupError as e:
+        return JSONResponse({"error": str(e)}, status_code=404)
     except Exception as e:
         return JSONResponse({"error": str(e)}, status_code=500)
+
+
+class JobRequest(BaseModel):
+    company: str
+    strategy: Optional[str] = None
+    force_refresh: bool = False
+    full_refresh: bool = False
+    reprocess: bool = False
+    archive_key: Optional[str] = None
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: JobRequest):
+    if request.strategy and request.strategy not in SUMMARY_STRATEGIES:
+        return JSONResponse({"error": f"Unknown summary strategy {request.strategy!r}"}, status_code=400)
+    try:
+        _check_archive_key(request.company, request.archive_key)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+    try:
+        job = await job_pool.submit(
+            request.company,
+            strategy=request.strategy,
+            force_refresh=request.force_refresh,
+            full_refresh=request.full_refresh,
+            reprocess=request.reprocess,
+            archive_key=request.archive_key,
+        )
+    except QueueFull as e:
+        return JSONResponse({"error": f"Job queue is full: {e}"}, status_code=429, headers={"Retry-After": "30"})
+    return {"job_id": job.id, "status": job.status}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await job_pool.backend.load(job_id)
+    if job is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+    return job.to_dict()
+
+
+class BatchRequest(BaseModel):
+    companies: List[str]
+    strategy: Optional[str] = None
+    force_refresh: bool = False
+
+
+@app.post("/batches", status_code=202)
+async def create_batch(request: BatchRequest):
+    if request.strategy and request.strategy not in SUMMARY_STRATEGIES:
+        return JSONResponse({"error": f"Unknown summary strategy {request.strategy!r}"}, status_code=400)
+    companies = [c.strip() for c in request.companies if c.strip()]
+    if not companies or len(companies) > BATCH_MAX_COMPANIES:
+        return JSONResponse(
+            {"error": f"A batch takes between 1 and {BATCH_MAX_COMPANIES} companies"}, status_code=400
+        )
+    batch = batch_runner.submit(companies, strategy=request.strategy, force_refresh=request.force_refresh)
+    return {"batch_id": batch.id, "status": batch.status, "companies": len(companies)}
+
+
+@app.get("/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    batch = batch_runner.get(batch_id)
+    if batch is None:
+        return JSONResponse({"error": "Batch not found"}, status_code=404)
+    body = batch.summary()
+    if batch.manifest_key:
+        body["manifest_url"] = await asyncio.to_thread(_presigned_url, batch.manifest_key)
+    body["results"] = batch.results
+    return body
+
+
+def _store_stats() -> dict:
+    """Stats of the local stores; they open on first use and count their rows in SQLite, so run this in a thread."""
+    return {
+        name: store.stats() if store is not None else None
+        for name, store in (
+            ("summary_cache", clients.get("summary_cache")),
+            ("validators", clients.get("validator_store")),
+            ("checkpoints", clients.get("checkpoint_store")),
+        )
+    }
+
+
+@app.get("/stats")
+async def stats_endpoint():
+    store_stats = await asyncio.to_thread(_store_stats)
+    return {
+        "jobs": job_pool.stats(),
+        "batches": batch_runner.stats(),
+        "scheduler": crawl_scheduler.stats(),
+        "http_pool": http_client_stats(http_client),
+        "browser_pool": browser_pool.stats(),
+        "fetch_profiles": clients.get("fetch_profiles").stats(),
+        "page_tiers": tiered_fetcher.tier_counts,
+        "pages_truncated": tiered_fetcher.truncated,
+        "frontier": crawl_frontier.stats(),
+        "llm": llm_limiter.stats(),
+        **store_stats,
+        "clients": clients.stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus text format: span latency histograms and counters, plus every numeric /stats value as a gauge."""
+    return PlainTextResponse(
+        telemetry.render(gauges=await stats_endpoint()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -0,0 +1,43 @@
+import asyncio
+from typing import AsyncIterator, TypeVar
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+async def buffered(source: AsyncIterator[T], maxsize: int) -> AsyncIterator[T]:
+    """Run source in a task of its own, at most maxsize items ahead of the consumer.
+
+    Connects two pipeline stages through a bounded queue: the stage before
+    keeps working while the one after is busy, but blocks once maxsize items
+    are waiting, so a slow stage caps how much the earlier ones hold in
+    memory. An error in source is raised to the consumer; a consumer that
+    stops early cancels source.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, maxsize))
+
+    async def _produce():
+        try:
+            async for item in source:
+                await queue.put((item, None))
+        except Exception as e:
+            await queue.put((_DONE, e))
+        else:
+            await queue.put((_DONE, None))
+
+    producer = asyncio.ensure_future(_produce())
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+        aclose = getattr(source, "aclose", None)
+        if aclose is not None:
+            await aclose()
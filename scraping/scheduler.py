@@ -0,0 +1,180 @@
+import asyncio
+import contextvars
+import json
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+# Which batch a crawl belongs to ("" for one-off requests); stage slots are
+# granted round-robin across tenants so a large batch cannot starve the rest
+scheduler_tenant: contextvars.ContextVar[str] = contextvars.ContextVar("scheduler_tenant", default="")
+
+
+class FairSlots:
+    """Counting semaphore whose waiters are served round-robin by tenant, FIFO within a tenant."""
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.in_use = 0
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+
+    def _dispatch(self) -> None:
+        while self._waiting and self.in_use < self.limit:
+            tenant, queue = next(iter(self._waiting.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._waiting.move_to_end(tenant)
+            else:
+                del self._waiting[tenant]
+            if waiter.done():  # cancelled while queued
+                continue
+            self.in_use += 1
+            waiter.set_result(None)
+
+    def _release(self) -> None:
+        self.in_use -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tenant: str = ""):
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiting.setdefault(tenant, deque()).append(waiter)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release()  # granted just as we were cancelled
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "in_use": self.in_use, "queued": sum(len(q) for q in self._waiting.values())}
+
+
+class CrawlScheduler:
+    """Process-wide concurrency limits per pipeline stage, shared by one-off scrapes and batches.
+
+    Each stage ("lookup" for the stored-result check, "crawl" for a whole
+    company, then "discover", "fetch", "summarize") has its own limit, so while some companies are being
+    summarized others are already discovering or fetching. Waiting work is
+    interleaved across scheduler_tenant values.
+    """
+
+    def __init__(self, limits: Dict[str, int]):
+        self._stages = {name: FairSlots(limit) for name, limit in limits.items()}
+
+    def stage(self, name: str):
+        return self._stages[name].slot(scheduler_tenant.get())
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: slots.stats() for name, slots in self._stages.items()}
+
+
+@dataclass
+class Batch:
+    companies: List[str]
+    strategy: Optional[str] = None
+    force_refresh: bool = False
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued -> running -> succeeded (every company tried; see results) | failed
+    results: List[Optional[dict]] = field(default_factory=list)  # one entry per company, in input order
+    manifest_key: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    def summary(self) -> dict:
+        done = [r for r in self.results if r is not None]
+        return {
+            "batch_id": self.id,
+            "status": self.status,
+            "companies": len(self.companies),
+            "completed": len(done),
+            "failed": sum(1 for r in done if r["status"] == "failed"),
+            "cached": sum(1 for r in done if r.get("cached")),
+            "manifest_key": self.manifest_key,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def manifest(self) -> bytes:
+        """JSON lines, one per company in input order: company, S3 key, status, cached, error."""
+        return b"".join(json.dumps(r).encode("utf-8") + b"\n" for r in self.results if r is not None)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class BatchRunner:
+    """Runs batches of companies through the crawl scheduler and writes a manifest per batch.
+
+    Every company of every batch is started at once; the scheduler's stage
+    limits decide how much of that work actually runs, from the first S3 lookup on, so throughput follows
+    the configured limits rather than the number of open client connections.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[str, Optional[str], bool], Awaitable[Dict[str, Any]]],
+        write_manifest: Callable[[Batch], Awaitable[str]],
+        retention: int = 200,
+    ):
+        self.run = run
+        self.write_manifest = write_manifest
+        self.retention = retention
+        self._batches: "OrderedDict[str, Batch]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, companies: List[str], strategy: Optional[str] = None, force_refresh: bool = False) -> Batch:
+        batch = Batch(companies=list(companies), strategy=strategy, force_refresh=force_refresh)
+        batch.results = [None] * len(batch.companies)
+        self._batches[batch.id] = batch
+        excess = len(self._batches) - self.retention
+        for batch_id in [b.id for b in self._batches.values() if b.id not in self._tasks][:max(0, excess)]:
+            del self._batches[batch_id]
+        self._tasks[batch.id] = asyncio.create_task(self._run_batch(batch))
+        return batch
+
+    def get(self, batch_id: str) -> Optional[Batch]:
+        return self._batches.get(batch_id)
+
+    async def _run_one(self, batch: Batch, index: int) -> None:
+        company = batch.companies[index]
+        try:
+            result = await self.run(company, batch.strategy, batch.force_refresh)
+            batch.results[index] = {"company": company, "status": "succeeded", **result}
+        except Exception as e:
+            print(f"Batch {batch.id}: {company} failed: {e}")
+            batch.results[index] = {"company": company, "status": "failed", "error": str(e)}
+        batch.updated_at = time.time()
+
+    async def _run_batch(self, batch: Batch) -> None:
+        scheduler_tenant.set(batch.id)
+        batch.status = "running"
+        try:
+            await asyncio.gather(*(self._run_one(batch, i) for i in range(len(batch.companies))))
+            batch.manifest_key = await self.write_manifest(batch)
+            batch.status = "succeeded"
+        except Exception as e:
+            print(f"Batch {batch.id} failed: {e}")
+            batch.status, batch.error = "failed", str(e)
+        finally:
+            batch.updated_at = time.time()
+            self._tasks.pop(batch.id, None)
+
+    async def stop(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks = {}
+
+    def stats(self) -> dict:
+        return {"running": len(self._tasks), "retained": len(self._batches)}
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+def cache_key(*parts) -> str:
+    """Content address for an LLM call: sha256 over everything that changes its output."""
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """On-disk LRU cache of LLM outputs with size and age based eviction.
+
+    Backed by a single SQLite file so it survives restarts and can be shared by
+    the worker threads that run Bedrock calls. Entries older than max_age
+    seconds are treated as misses; when the stored values exceed max_bytes the
+    least recently used entries are dropped. A SQLite error (a locked database
+    shared by several workers, a full disk) is logged and counted in errors:
+    get() then reports a miss and put() stores nothing, so a failing cache
+    never fails the summary it was caching.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, max_age: float = 30 * 86400):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS summaries_accessed ON summaries (accessed_at)")
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self._get(key)
+        except sqlite3.Error as e:
+            self._failed("read", e)
+            return None
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, size, created_at FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, size, created_at = row
+            if now - created_at > self.max_age:
+                self._conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                self._bytes -= size
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE summaries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        try:
+            self._put(key, value)
+        except sqlite3.Error as e:
+            self._failed("write", e)
+
+    def _failed(self, op: str, e: sqlite3.Error) -> None:
+        self.errors += 1
+        print(f"Summary cache {op} failed ({self.path}): {e}")
+
+    def _put(self, key: str, value: str) -> None:
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM summaries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._bytes += size - (old[0] if old else 0)
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        expired = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries WHERE created_at < ?", (now - self.max_age,)
+        ).fetchone()
+        if expired[0]:
+            self._conn.execute("DELETE FROM summaries WHERE created_at < ?", (now - self.max_age,))
+            self.evictions += expired[0]
+            self._bytes -= expired[1]
+        while self._bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM summaries ORDER BY accessed_at LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                self._bytes -= size
+                self.evictions += 1
+                if self._bytes <= self.max_bytes:
+                    break
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "entries": entries,
+            "bytes": self._bytes,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
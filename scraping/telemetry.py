@@ -0,0 +1,210 @@
+import asyncio
+import contextvars
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Innermost open span of the current task/thread; child spans and exported traces link to it
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("telemetry_span", default=None)
+
+# Seconds; covers a cached S3 presign (sub-ms) up to a slow company crawl
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Numeric span attributes summed into per-span counters on /metrics
+COUNTED_ATTRIBUTES = ("bytes", "input_tokens", "output_tokens", "pages")
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    start: float = 0.0  # epoch seconds
+    duration: float = 0.0
+    status: str = "ok"  # ok | error | cancelled
+    error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def fail(self, error: BaseException) -> None:
+        """Mark the span failed for an error the caller handles instead of raising."""
+        self.status, self.error = "error", f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration": round(self.duration, 6),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram keyed by label values, in the Prometheus layout."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # labels -> bucket counts..., +Inf, sum
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self, name: str, label_names: Tuple[str, ...]) -> List[str]:
+        lines = []
+        for labels, series in sorted(self._series.items()):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(label_names, labels))
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{name}_bucket{{{base},le="{bound:g}"}} {count:g}')
+            lines.append(f'{name}_bucket{{{base},le="+Inf"}} {series[-2]:g}')
+            lines.append(f"{name}_sum{{{base}}} {series[-1]:.6f}")
+            lines.append(f"{name}_count{{{base}}} {series[-2]:g}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class JsonlSpanExporter:
+    """Appends finished spans as JSON lines to path ("-" for stdout)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None if path == "-" else open(path, "a", buffering=1, encoding="utf-8")
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            if self._file is None:
+                print(line)
+            else:
+                self._file.write(line + "\n")
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class Telemetry:
+    """Timing spans for pipeline stages and external calls, aggregated for /metrics.
+
+    ``with telemetry.span("s3.put", bytes=n) as span:`` times the block,
+    nests under whatever span is open in the same task or thread, and marks
+    the span as an error if the block raises. Every finished span feeds a
+    latency histogram labelled by span name and status; the numeric
+    attributes in COUNTED_ATTRIBUTES and ``cache_hit=True`` also feed
+    counters. Attributes such as URLs never become labels, so the metric
+    series stay bounded. When an exporter is set, every finished span is also
+    handed to it as a trace record.
+    """
+
+    def __init__(self, namespace: str = "scraper", buckets=DEFAULT_BUCKETS, exporter=None):
+        self.namespace = namespace
+        self.exporter = exporter
+        self._lock = threading.Lock()
+        self._latency = Histogram(buckets)
+        self._counters: Dict[Tuple[str, str], float] = {}  # (counter, span name) -> total
+        self.spans = 0
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any):
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent is not None else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent is not None else None,
+            attributes=attributes,
+            start=time.time(),
+        )
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except asyncio.CancelledError:
+            span.status = "cancelled"  # e.g. discovery stopping its workers once it has enough URLs
+            raise
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            _current_span.reset(token)
+            self._finish(span)
+
+    def current(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def _finish(self, span: Span) -> None:
+        with self._lock:
+            self.spans += 1
+            self._latency.observe((span.name, span.status), span.duration)
+            for key in COUNTED_ATTRIBUTES:
+                value = span.attributes.get(key)
+                if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+                    self._counters[(key, span.name)] = self._counters.get((key, span.name), 0) + value
+            if span.attributes.get("cache_hit") is True:
+                self._counters[("cache_hits", span.name)] = self._counters.get(("cache_hits", span.name), 0) + 1
+        if self.exporter is not None:
+            try:
+                self.exporter.export(span)
+            except Exception as e:
+                print(f"Failed to export span {span.name}: {e}")
+
+    def render(self, gauges: Optional[Dict[str, Any]] = None) -> str:
+        """Prometheus text exposition of span metrics, plus gauges flattened from a nested stats dict."""
+        ns = self.namespace
+        lines = [
+            f"# HELP {ns}_span_duration_seconds Duration of pipeline stages and external calls.",
+            f"# TYPE {ns}_span_duration_seconds histogram",
+        ]
+        with self._lock:
+            lines += self._latency.render(f"{ns}_span_duration_seconds", ("span", "status"))
+            counters = sorted(self._counters.items())
+        for counter in sorted({c for (c, _), _ in counters}):
+            metric = f"{ns}_span_{counter}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines += [f'{metric}{{span="{_escape(span)}"}} {value:g}' for (c, span), value in counters if c == counter]
+        if gauges:
+            for path, value in _flatten(gauges):
+                metric = f"{ns}_{'_'.join(path)}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {float(value):g}")
+        return "\n".join(lines) + "\n"
+
+    def close(self) -> None:
+        if self.exporter is not None and hasattr(self.exporter, "close"):
+            self.exporter.close()
+
+
+def _flatten(stats: Dict[str, Any], prefix: Tuple[str, ...] = ()):
+    """(path, value) for every numeric leaf of a nested stats dict; names are made metric-safe."""
+    for key, value in stats.items():
+        path = prefix + ("".join(c if c.isalnum() else "_" for c in str(key)).lower(),)
+        if isinstance(value, dict):
+            yield from _flatten(value, path)
+        elif isinstance(value, bool):
+            yield path, int(value)
+        elif isinstance(value, (int, float)) and math.isfinite(value):
+            yield path, value
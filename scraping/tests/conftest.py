@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the service modules are top-level (import main, import extraction), as in the Dockerfile
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
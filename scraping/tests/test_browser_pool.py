@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from browser_pool import BrowserPool
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def on(self, event, handler):
+        pass
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self):
+        return object()
+
+    async def close(self):
+        self.connected = False
+
+
+class FakeChromium:
+    def __init__(self):
+        self.launches = 0
+        self.fail = False
+
+    async def launch(self, headless=True):
+        self.launches += 1
+        if self.fail:
+            raise RuntimeError("chromium is gone")
+        return FakeBrowser()
+
+
+class FakePlaywright:
+    def __init__(self):
+        self.chromium = FakeChromium()
+
+
+def test_failed_relaunch_backs_off_and_is_not_counted():
+    async def go():
+        pool = BrowserPool(size=1, pages_per_browser=1, launch_backoff=60)
+        pool._playwright = playwright = FakePlaywright()
+        await pool._release(await pool._acquire_browser(), None, False)  # uses up the page budget
+
+        playwright.chromium.fail = True
+        with pytest.raises(RuntimeError, match="chromium is gone"):
+            await pool._acquire_browser()
+        with pytest.raises(RuntimeError, match="next attempt"):
+            await pool._acquire_browser()  # inside the backoff: no new launch
+        assert playwright.chromium.launches == 2
+        assert pool.stats()["recycled"] == 0
+        assert pool.stats()["launch_failures"] == 1
+
+        playwright.chromium.fail = False
+        pool._next_launch = 0.0
+        await pool._acquire_browser()
+        assert playwright.chromium.launches == 3
+
+    asyncio.run(go())
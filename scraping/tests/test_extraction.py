@@ -0,0 +1,28 @@
+from extraction import extract_blocks
+
+ARTICLE = "".join(f"<p>Paragraph {i} of the article about our products and services.</p>" for i in range(6))
+BANNER = '<div class="cookie-banner"><p>We use cookies to improve your experience.</p></div>'
+
+
+def _blocks(html: str):
+    blocks = extract_blocks(html)
+    assert any(b.startswith("Paragraph 0") for b in blocks), blocks
+    return blocks
+
+
+def test_body_with_modal_class_is_kept():
+    _blocks(f'<html><body class="modal-open"><div>{ARTICLE}</div></body></html>')
+
+
+def test_body_with_cookie_banner_class_is_kept():
+    blocks = _blocks(f'<html><body class="has-cookie-banner">{BANNER}<div>{ARTICLE}</div></body></html>')
+    assert not any("cookies" in b for b in blocks)
+
+
+def test_page_wrapper_matching_overlay_names_is_kept():
+    blocks = _blocks(f'<html><body><div id="gdpr-wrapper">{BANNER}<div>{ARTICLE}</div></div></body></html>')
+    assert not any("cookies" in b for b in blocks)
+
+
+def test_aspnet_form_wrapper_is_kept():
+    _blocks(f'<html><body><form id="form1" method="post"><div>{ARTICLE}</div><button>Go</button></form></body></html>')
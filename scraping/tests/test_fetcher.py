@@ -0,0 +1,60 @@
+import asyncio
+import sqlite3
+
+import httpx
+
+from fetcher import TieredFetcher
+from validators import ValidatorStore
+
+HTML = "<html><body><main>" + "<p>Real page text about the company.</p>" * 20 + "</main></body></html>"
+
+
+def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path == "/report.pdf":
+        return httpx.Response(
+            200, content=b"%PDF-1.4\n" + b"\x00binary" * 500,
+            headers={"Content-Type": "application/pdf", "ETag": '"pdf"'},
+        )
+    return httpx.Response(200, text=HTML, headers={"Content-Type": "text/html; charset=utf-8", "ETag": '"html"'})
+
+
+async def _fetch(fetcher: TieredFetcher, url: str):
+    async with httpx.AsyncClient(transport=httpx.MockTransport(_handler)) as client:
+        return await fetcher.fetch(client, url)
+
+
+def test_non_text_content_is_skipped(tmp_path):
+    browser_calls = []
+
+    async def browser_fetch(url):
+        browser_calls.append(url)
+        return ""
+
+    store = ValidatorStore(str(tmp_path / "validators.sqlite3"))
+    fetcher = TieredFetcher(browser_fetch, validators=store)
+
+    pdf = asyncio.run(_fetch(fetcher, "https://example.com/report.pdf"))
+    assert pdf.html == "" and pdf.tier == "" and pdf.reason == "skipped: application/pdf"
+    assert store.get("https://example.com/report.pdf") is None
+    assert not browser_calls
+
+    page = asyncio.run(_fetch(fetcher, "https://example.com/about"))
+    assert page.tier == "static" and "Real page text" in page.html
+    assert store.get("https://example.com/about") is not None
+    store.close()
+
+
+def test_failing_validator_store_does_not_fail_the_fetch(tmp_path):
+    store = ValidatorStore(str(tmp_path / "validators.sqlite3"))
+
+    class LockedConnection:
+        def execute(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    store._conn, conn = LockedConnection(), store._conn
+    fetcher = TieredFetcher(lambda url: asyncio.sleep(0, result=""), validators=store)
+    page = asyncio.run(_fetch(fetcher, "https://example.com/about"))
+    assert page.tier == "static" and "Real page text" in page.html
+    assert store.errors == 2  # the validator lookup and the write after the fetch
+    store._conn = conn
+    store.close()
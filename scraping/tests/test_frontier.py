@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from fetcher import FetchLimiter, PageResult, fetch_pages
+from frontier import BACKOFF_STATUSES, CrawlFrontier
+
+
+async def _robots_503(url):
+    return 503, ""
+
+
+async def _robots_down(url):
+    return None, ""
+
+
+def test_unreachable_robots_allows_and_is_retried():
+    async def go():
+        for fetch_robots in (_robots_503, _robots_down):
+            frontier = CrawlFrontier(fetch_robots, robots_error_ttl=0.0)
+            assert await frontier.allowed("https://a.com/x")
+            assert await frontier.allowed("https://a.com/y")
+            assert frontier.robots_fetches == 2 and frontier.robots_errors == 2
+
+    asyncio.run(go())
+
+
+def test_backoff_wait_releases_the_fetch_slot():
+    async def go():
+        frontier = CrawlFrontier(lambda url: asyncio.sleep(0, result=(404, "")))
+        limiter = FetchLimiter(concurrency=1, per_host=1)
+        finished = {}
+        busy_calls = []
+
+        async def fetch(url):
+            if url.startswith("https://busy.com") and not busy_calls:
+                busy_calls.append(url)
+                result = PageResult(url=url, status=429, headers={"retry-after": "1"})
+            else:
+                result = PageResult(url=url, status=200, html="<p>ok</p>", tier="static")
+            frontier.observe(url, result.status, result.headers)
+            finished[url] = time.monotonic()
+            return result
+
+        def retry(result):
+            return frontier.backoff(result.url) if result.status in BACKOFF_STATUSES else 0.0
+
+        start = time.monotonic()
+        pages = await fetch_pages(
+            ["https://busy.com/a", "https://other.com/b"], fetch, limiter, page_timeout=5.0,
+            pace=frontier.wait, retry=retry, max_retries=2,
+        )
+        assert [p.status for p in pages] == [200, 200]
+        assert finished["https://other.com/b"] - start < 0.5  # not stuck behind busy.com's backoff
+        assert finished["https://busy.com/a"] - start >= 0.9
+
+    asyncio.run(go())
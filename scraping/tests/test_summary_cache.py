@@ -0,0 +1,20 @@
+import sqlite3
+
+from summary_cache import SummaryCache
+
+
+def test_sqlite_errors_are_misses(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.sqlite3"))
+    cache.put("k", "summary")
+    assert cache.get("k") == "summary"
+
+    class LockedConnection:
+        def execute(self, *args):
+            raise sqlite3.OperationalError("database is locked")
+
+    cache._conn, conn = LockedConnection(), cache._conn
+    cache.put("k2", "other")  # does not raise
+    assert cache.get("k") is None
+    assert cache.errors == 2
+    cache._conn = conn
+    cache.close()
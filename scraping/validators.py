@@ -0,0 +1,163 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class Validator:
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+    fetched_at: float
+
+
+def content_hash(body: str) -> str:
+    return hashlib.sha256(body.encode("utf-8", errors="ignore")).hexdigest()
+
+
+def conditional_headers(v: Optional[Validator]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since headers for a stored validator, or {} if there is none."""
+    headers: Dict[str, str] = {}
+    if v is None:
+        return headers
+    if v.etag:
+        headers["If-None-Match"] = v.etag
+    if v.last_modified:
+        headers["If-Modified-Since"] = v.last_modified
+    return headers
+
+
+class ValidatorStore:
+    """Per-URL HTTP validators plus the content they validated, for conditional re-fetches.
+
+    Stores ETag, Last-Modified, a content hash and the (zlib-compressed) body or
+    extracted content of every response that carried a validator, so a later
+    304 Not Modified can reuse it without downloading anything. get() reads
+    only the validators; the body is read by touch(), on a 304. Entries older
+    than max_age seconds are dropped, and when the stored bodies exceed
+    max_bytes the least recently validated entries are evicted. Calls block;
+    run them in a thread. A SQLite error (a locked database shared by several
+    workers, a full disk) is logged and counted in errors, and the call acts
+    as if nothing were stored: get() and touch() return None, put() stores
+    nothing. A failing store costs a full download, never the fetch.
+    """
+
+    def __init__(self, path: str, max_age: float = 30 * 86400, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.not_modified = 0
+        self.stored = 0
+        self.evictions = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS validators ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, content_hash TEXT NOT NULL,"
+            " body BLOB NOT NULL, fetched_at REAL NOT NULL, size INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(validators)")}
+        if "size" not in columns:  # a store written before the byte budget
+            self._conn.execute("ALTER TABLE validators ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE validators SET size = length(body)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS validators_fetched ON validators (fetched_at)")
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM validators").fetchone()[0]
+
+    def _failed(self, op: str, e: sqlite3.Error) -> None:
+        self.errors += 1
+        print(f"Validator store {op} failed ({self.path}): {e}")
+
+    def get(self, url: str) -> Optional[Validator]:
+        try:
+            return self._get(url)
+        except sqlite3.Error as e:
+            self._failed("read", e)
+            return None
+
+    def _get(self, url: str) -> Optional[Validator]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_hash, fetched_at FROM validators WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or time.time() - row[3] > self.max_age:
+            return None
+        return Validator(url, *row)
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], body: str) -> None:
+        """Remember body for url; skipped when the response carried no validator."""
+        if not etag and not last_modified:
+            return
+        try:
+            self._put(url, etag, last_modified, body)
+        except sqlite3.Error as e:
+            self._failed("write", e)
+
+    def _put(self, url: str, etag: Optional[str], last_modified: Optional[str], body: str) -> None:
+        digest = content_hash(body)
+        compressed = zlib.compress(body.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM validators WHERE url = ?", (url,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO validators (url, etag, last_modified, content_hash, body, fetched_at, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, digest, compressed, now, len(compressed)),
+            )
+            self._bytes += len(compressed) - (old[0] if old else 0)
+            self.stored += 1
+            if self.stored % 500 == 0:
+                self._drop(self._conn.execute(
+                    "SELECT url, size FROM validators WHERE fetched_at < ?", (now - self.max_age,)
+                ).fetchall())
+            while self._bytes > self.max_bytes:
+                rows = self._conn.execute("SELECT url, size FROM validators ORDER BY fetched_at LIMIT 100").fetchall()
+                if not rows:
+                    break
+                self._drop(rows, until_within_budget=True)
+
+    def _drop(self, rows, until_within_budget: bool = False) -> None:
+        for url, size in rows:
+            self._conn.execute("DELETE FROM validators WHERE url = ?", (url,))
+            self._bytes -= size
+            self.evictions += 1
+            if until_within_budget and self._bytes <= self.max_bytes:
+                break
+
+    def put_response(self, url: str, headers, body: str) -> None:
+        self.put(url, headers.get("etag"), headers.get("last-modified"), body)
+
+    def touch(self, url: str) -> Optional[str]:
+        """Record a 304: the stored entry is confirmed fresh as of now. Returns its body, or None if
+        it was evicted since get() (or cannot be read), in which case the caller has to fetch url
+        again unconditionally."""
+        try:
+            return self._touch(url)
+        except sqlite3.Error as e:
+            self._failed("read", e)
+            return None
+
+    def _touch(self, url: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM validators WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE validators SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self.not_modified += 1
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM validators").fetchone()[0]
+        return {"entries": entries, "bytes": self._bytes, "not_modified": self.not_modified, "stored": self.stored,
+                "evictions": self.evictions, "errors": self.errors}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()